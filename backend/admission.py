@@ -0,0 +1,163 @@
+import asyncio
+import math
+import os
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, Optional
+
+from instrumentation import stage
+
+DEFAULT_MAX_INFLIGHT = int(os.getenv("ANALYSIS_MAX_INFLIGHT", "32"))
+DEFAULT_MAX_QUEUE = int(os.getenv("ANALYSIS_MAX_QUEUE", "64"))
+# The interview UI's normal pace, and the slowest pace it is ever asked for
+DEFAULT_FRAME_INTERVAL_MS = float(os.getenv("ANALYSIS_FRAME_INTERVAL_MS", "2000"))
+DEFAULT_MAX_FRAME_INTERVAL_MS = float(os.getenv("ANALYSIS_MAX_FRAME_INTERVAL_MS", "10000"))
+# Share of the estimated capacity the clients are paced to use
+DEFAULT_TARGET_LOAD = float(os.getenv("ANALYSIS_TARGET_LOAD", "0.8"))
+
+SERVICE_SMOOTHING = 0.2
+
+
+class AdmissionRejected(Exception):
+    """Raised when the wait queue is full; ``retry_after`` is in seconds."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Too many frames waiting for analysis")
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Bounded in-flight limit for frame analysis, with pacing hints for clients.
+
+    At most ``max_inflight`` frames are analyzed at once and up to
+    ``max_queue`` more wait their turn in arrival order; anything beyond
+    that is rejected straight away. Service time is a moving average over
+    admitted frames.
+
+    ``next_interval_ms`` is the frame interval to suggest to every client.
+    The estimated capacity is ``max_inflight / service time`` frames per
+    second. That capacity, scaled by ``target_load``, is shared between the
+    sessions seen recently, and each gets at least the time the current
+    queue needs to drain. The interval never drops below the UI's normal
+    pace, so hints only slow clients down, and never exceeds
+    ``max_interval_ms``.
+
+    Only used from the event loop, so there is no locking.
+    """
+
+    def __init__(
+        self,
+        max_inflight: int = DEFAULT_MAX_INFLIGHT,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        interval_ms: float = DEFAULT_FRAME_INTERVAL_MS,
+        max_interval_ms: float = DEFAULT_MAX_FRAME_INTERVAL_MS,
+        target_load: float = DEFAULT_TARGET_LOAD,
+        clock=time.monotonic,
+    ):
+        if max_inflight < 1:
+            raise ValueError("max_inflight must be at least 1")
+        self.max_inflight = max_inflight
+        self.max_queue = max_queue
+        self.interval = interval_ms / 1000.0
+        self.max_interval = max(max_interval_ms / 1000.0, self.interval)
+        self.target_load = target_load
+        self.clock = clock
+        # A session counts as active until it has been quiet for two of the slowest intervals
+        self.session_window = 2 * self.max_interval
+        self._inflight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._sessions: "OrderedDict[str, float]" = OrderedDict()
+        self._service: Optional[float] = None
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = 0
+
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    def active_sessions(self) -> int:
+        cutoff = self.clock() - self.session_window
+        while self._sessions and next(iter(self._sessions.values())) < cutoff:
+            self._sessions.popitem(last=False)
+        return len(self._sessions)
+
+    def _touch(self, session_key: Optional[str]):
+        if session_key is not None:
+            self._sessions.pop(session_key, None)
+            self._sessions[session_key] = self.clock()
+
+    def next_interval_ms(self) -> int:
+        interval = self.interval
+        if self._service:
+            share = max(self.active_sessions(), 1) * self._service / (self.max_inflight * self.target_load)
+            drain = len(self._waiters) * self._service / self.max_inflight
+            interval = max(interval, share, drain)
+        return int(min(interval, self.max_interval) * 1000)
+
+    def retry_after(self) -> int:
+        return max(1, math.ceil(self.next_interval_ms() / 1000))
+
+    async def acquire(self, session_key: Optional[str] = None):
+        self._touch(session_key)
+        if self._inflight < self.max_inflight and not self._waiters:
+            self._inflight += 1
+            self.admitted += 1
+            return
+        if len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            raise AdmissionRejected(self.retry_after())
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.queued += 1
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just before the cancel; pass it on
+                self._release()
+            else:
+                self._waiters.remove(waiter)
+            raise
+        self.admitted += 1
+
+    def _release(self):
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # Hand the slot straight to the next frame in line
+                waiter.set_result(None)
+                return
+        self._inflight -= 1
+
+    def release(self, service_seconds: float):
+        if self._service is None:
+            self._service = service_seconds
+        else:
+            self._service += SERVICE_SMOOTHING * (service_seconds - self._service)
+        self._release()
+
+    @asynccontextmanager
+    async def admit(self, session_key: Optional[str] = None):
+        """Hold one analysis slot for the body of the ``async with``."""
+        with stage('admission_wait'):
+            await self.acquire(session_key)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.release(time.perf_counter() - start)
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            'inflight': self._inflight,
+            'queue_depth': len(self._waiters),
+            'max_inflight': self.max_inflight,
+            'max_queue': self.max_queue,
+            'active_sessions': self.active_sessions(),
+            'service_ms': round(self._service * 1000, 3) if self._service is not None else None,
+            'next_frame_ms': self.next_interval_ms(),
+            'admitted': self.admitted,
+            'queued': self.queued,
+            'rejected': self.rejected,
+        }
@@ -0,0 +1,122 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached, object_session
+
+DEFAULT_MAX_ENTRIES = int(os.getenv("AUTH_CACHE_SIZE", "4096"))
+DEFAULT_TTL = float(os.getenv("AUTH_CACHE_TTL", "60"))
+
+CacheKey = Tuple[str, Optional[float]]
+
+
+class UserCache:
+    """Bounded TTL cache of verified token ``(sub, exp)`` to user column snapshot.
+
+    The token signature is still checked on every request; only the user
+    lookup is cached. An entry never outlives its token, and ``watch`` drops
+    a user's entries whenever that user row is updated or deleted through
+    the ORM. Bulk ``query.update()`` calls bypass those events and should
+    call ``invalidate`` themselves.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, ttl: float = DEFAULT_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[CacheKey, Tuple[float, Dict]]" = OrderedDict()
+        self._keys_by_sub: Dict[str, Set[CacheKey]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _drop(self, key: CacheKey):
+        # Must be called with self._lock held
+        self._entries.pop(key, None)
+        keys = self._keys_by_sub.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_sub[key[0]]
+
+    def get(self, model, db: Session, sub: str, exp: Optional[float]):
+        """Return the cached user attached to ``db`` without querying, or None."""
+        key = (sub, exp)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < time.time():
+                self._drop(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            values = entry[1]
+
+        user = model(**values)
+        make_transient_to_detached(user)
+        # Attach to the request session so relationships still lazy-load
+        return db.merge(user, load=False)
+
+    def set(self, sub: str, exp: Optional[float], user):
+        expires_at = time.time() + self.ttl
+        if exp is not None:
+            expires_at = min(expires_at, exp)
+        values = {attr.key: getattr(user, attr.key) for attr in inspect(user).mapper.column_attrs}
+        key = (sub, exp)
+        with self._lock:
+            self._entries[key] = (expires_at, values)
+            self._entries.move_to_end(key)
+            self._keys_by_sub.setdefault(sub, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate(self, sub: str):
+        with self._lock:
+            for key in list(self._keys_by_sub.get(sub, ())):
+                self._drop(key)
+            self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_sub.clear()
+
+    def watch(self, model, sub_attribute: str = 'email'):
+        """Invalidate on ORM updates/deletes of ``model``, and again once they commit."""
+        def changed(mapper, connection, target):
+            subs = {getattr(target, sub_attribute)}
+            # A changed email invalidates tokens issued for the old one too
+            subs.update(inspect(target).attrs[sub_attribute].history.deleted or ())
+            for sub in subs:
+                self.invalidate(sub)
+            session = object_session(target)
+            if session is not None:
+                session.info.setdefault('auth_cache_invalidate', set()).update(subs)
+
+        def committed(session):
+            # Requests that refilled the cache between flush and commit saw old data
+            for sub in session.info.pop('auth_cache_invalidate', ()):
+                self.invalidate(sub)
+
+        def rolled_back(session):
+            session.info.pop('auth_cache_invalidate', None)
+
+        event.listen(model, 'after_update', changed)
+        event.listen(model, 'after_delete', changed)
+        event.listen(Session, 'after_commit', committed)
+        event.listen(Session, 'after_rollback', rolled_back)
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'invalidations': self.invalidations,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
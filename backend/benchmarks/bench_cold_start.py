@@ -0,0 +1,86 @@
+"""Cold-start timing for the API process.
+
+Each run starts a fresh interpreter that imports ``main``, runs the startup
+handlers and polls the readiness check until it passes. It reports the time
+spent importing, time to ready, and whether OpenCV and TensorFlow ended up
+loaded. Runs cover three configurations:
+
+- "warm-up": the default; the model loads and warms up at startup
+- "lazy": EMOTION_WARMUP=0; the model loads on the first frame instead
+- "import-only": only imports ``emotion_analysis`` and ``inference_batcher``
+
+Each child gets a throwaway SQLite database.
+
+    python benchmarks/bench_cold_start.py [--runs 5]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r'''
+import asyncio, json, sys, time
+start = time.perf_counter()
+if sys.argv[1] == "import-only":
+    import emotion_analysis, inference_batcher
+    result = {"import_s": time.perf_counter() - start}
+else:
+    import main
+    result = {"import_s": time.perf_counter() - start}
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(main.app.router.startup())
+    while loop.run_until_complete(main.readiness()).status_code != 200:
+        time.sleep(0.005)
+    result["ready_s"] = time.perf_counter() - start
+    loop.run_until_complete(main.app.router.shutdown())
+result["cv2"] = "cv2" in sys.modules
+result["tensorflow"] = "tensorflow" in sys.modules
+print("RESULT " + json.dumps(result))
+'''
+
+MODES = {
+    'warm-up': {'EMOTION_WARMUP': '1'},
+    'lazy': {'EMOTION_WARMUP': '0'},
+    'import-only': {},
+}
+
+
+def run_child(mode: str, workdir: str, index: int) -> dict:
+    env = dict(os.environ, **MODES[mode])
+    env['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, f'{mode}-{index}.db')}"
+    env.setdefault('VISION_WORKERS', '0')
+    env.setdefault('TF_CPP_MIN_LOG_LEVEL', '3')
+    completed = subprocess.run(
+        [sys.executable, '-c', CHILD, mode],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    line = next(line for line in completed.stdout.splitlines() if line.startswith('RESULT '))
+    return json.loads(line[len('RESULT '):])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--modes', nargs='+', choices=list(MODES), default=list(MODES))
+    args = parser.parse_args()
+
+    print(f"median of {args.runs} runs")
+    print(f"{'mode':>12} {'import s':>9} {'ready s':>9} {'cv2':>5} {'tf':>5}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for mode in args.modes:
+            results = [run_child(mode, workdir, i) for i in range(args.runs)]
+            imported = statistics.median(r['import_s'] for r in results)
+            ready = statistics.median(r['ready_s'] for r in results) if 'ready_s' in results[0] else None
+            print(
+                f"{mode:>12} {imported:>9.3f} {'-' if ready is None else f'{ready:.3f}':>9} "
+                f"{str(results[0]['cv2']):>5} {str(results[0]['tensorflow']):>5}"
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""Prompt-build time and size against interview length.
+
+Compares the old string-concatenating context builder with ContextBuilder,
+replaying an interview turn by turn the way the generate endpoint sees it.
+
+    python benchmarks/bench_context_builder.py [--turns 10 50 200 1000] [--budget 1500]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from question_context import ContextBuilder, estimate_tokens  # noqa: E402
+
+PROFILE = {'experience': '5 years', 'skills': ['Python', 'SQL', 'Kubernetes'], 'role': 'Backend Engineer'}
+STATE = {'confidence': 'medium', 'anxiety': 'low', 'nervousness': 'low'}
+
+
+def make_turn(i: int) -> dict:
+    return {
+        'question': f"Question {i}: how would you design a rate limiter for service {i} under bursty load?",
+        'answer': ' '.join(f"word{i}_{j}" for j in range(60)),
+    }
+
+
+def legacy_build(previous_qa):
+    context = f"Candidate Profile: {PROFILE}\nCurrent Emotional State: {STATE}\n"
+    if previous_qa:
+        context += "\nPrevious Q&A:\n"
+        for qa in previous_qa:
+            context += f"Q: {qa['question']}\nA: {qa['answer']}\n"
+    return context
+
+
+def replay(build, turns: int):
+    """Build the prompt after every turn; return (last build seconds, total seconds, last prompt)."""
+    history = []
+    total = last = 0.0
+    prompt = ''
+    for i in range(turns):
+        history.append(make_turn(i))
+        start = time.perf_counter()
+        prompt = build(list(history))
+        last = time.perf_counter() - start
+        total += last
+    return last, total, prompt
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--turns', type=int, nargs='+', default=[10, 50, 200, 1000])
+    parser.add_argument('--budget', type=int, default=1500)
+    args = parser.parse_args()
+
+    print(f"{'turns':>6} {'builder':>8} {'last ms':>9} {'total ms':>10} {'tokens':>8}")
+    for turns in args.turns:
+        builder = ContextBuilder(token_budget=args.budget)
+        for name, build in (
+            ('legacy', legacy_build),
+            ('budget', lambda qa: builder.build(PROFILE, STATE, qa)),
+        ):
+            last, total, prompt = replay(build, turns)
+            print(f"{turns:>6} {name:>8} {last * 1000:>9.3f} {total * 1000:>10.1f} {estimate_tokens(prompt):>8}")
+        print(f"{'':>6} {'':>8} summary cache: {builder.stats()}")
+
+
+if __name__ == '__main__':
+    main()
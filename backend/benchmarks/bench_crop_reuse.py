@@ -0,0 +1,119 @@
+"""Hit rate and accuracy drift of crop reuse against always running inference.
+
+Replays a recorded clip (or a synthetic one) at the interview frame rate.
+Every sampled frame's face crop is inferred, and the scores are compared
+with what a CropCache would have returned for each --max-diff threshold. It
+reports the reuse rate, the mean and worst score drift, how often the top
+emotion still matches, and the inference time saved. The clip's own
+timestamps drive the staleness window.
+
+    python benchmarks/bench_crop_reuse.py --video interview.mp4 [--fps 0.5] [--max-diff 0.01 0.02 0.04]
+
+Scores come from the model in EMOTION_MODEL_PATH. Without one, a
+deterministic pixel-statistics stand-in is used, so drift numbers are only
+indicative until a real model is configured.
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from emotion_analysis import EMOTIONS, MODEL_PATH, CropCache, EmotionAnalyzer, FaceTracker  # noqa: E402
+from video_stream import FrameReader  # noqa: E402
+
+
+class PixelStatsModel:
+    """Deterministic stand-in: scores follow the crop's brightness in a few face regions."""
+
+    def predict(self, faces: np.ndarray) -> np.ndarray:
+        regions = faces.reshape(len(faces), 4, 12, 4, 12).mean(axis=(2, 4)).reshape(len(faces), 16)
+        weights = np.random.default_rng(0).normal(size=(16, len(EMOTIONS)))
+        logits = (regions - regions.mean(axis=1, keepdims=True)) @ weights * 2
+        exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+        return exp / exp.sum(axis=1, keepdims=True)
+
+
+def synthetic_clip(frames: int, interval: float, seed: int = 0):
+    """A mostly still drawn face with sensor noise, small head moves and an expression change now and then."""
+    rng = np.random.default_rng(seed)
+    for index in range(frames):
+        frame = np.full((480, 640, 3), 90, dtype=np.uint8)
+        dx, dy = (int(v) for v in rng.integers(-3, 4, size=2))
+        cx, cy, r = 320 + dx, 240 + dy, 120
+        cv2.ellipse(frame, (cx, cy), (int(r * 0.8), r), 0, 0, 360, (170, 190, 225), -1)
+        for side in (-1, 1):
+            eye = (cx + side * r // 3, cy - r // 4)
+            cv2.ellipse(frame, eye, (r // 7, r // 12), 0, 0, 360, (250, 250, 250), -1)
+            cv2.circle(frame, eye, r // 16, (40, 30, 30), -1)
+        smiling = (index // 8) % 3 == 1
+        mouth = (r // 3, r // 5 if smiling else r // 16)
+        cv2.ellipse(frame, (cx, cy + r // 2), mouth, 0, 0, 180, (60, 60, 150), -1)
+        noise = rng.normal(0, 3, size=frame.shape)
+        yield index * interval, index, np.clip(frame + noise, 0, 255).astype(np.uint8)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--video', default=None, help='recorded clip; a synthetic clip is used when omitted')
+    parser.add_argument('--fps', type=float, default=0.5, help='sampled frames per second (the UI sends one every 2s)')
+    parser.add_argument('--frames', type=int, default=120, help='length of the synthetic clip')
+    parser.add_argument('--max-diff', type=float, nargs='+', default=[0.005, 0.01, 0.02, 0.04])
+    parser.add_argument('--max-age', type=float, default=6.0)
+    args = parser.parse_args()
+
+    analyzer = EmotionAnalyzer()
+    if MODEL_PATH is None:
+        analyzer.model = PixelStatsModel()
+    tracker = FaceTracker()
+
+    reader = FrameReader(args.video, target_fps=args.fps).start() if args.video else None
+    clip = iter(reader) if reader is not None else synthetic_clip(args.frames, 1.0 / args.fps)
+
+    crops, scores, timestamps = [], [], []
+    infer_seconds = 0.0
+    for timestamp, _, frame in clip:
+        face = analyzer.preprocess_image(frame, tracker)
+        if face is None:
+            continue
+        start = time.perf_counter()
+        scores.append(analyzer.predict_batch(face)[0])
+        infer_seconds += time.perf_counter() - start
+        crops.append(face)
+        timestamps.append(timestamp)
+    if reader is not None:
+        reader.stop()
+    if not crops:
+        print("no faces found in the clip")
+        return
+    infer_ms = infer_seconds / len(crops) * 1000
+
+    print(f"{len(crops)} frames with a face, inference {infer_ms:.2f}ms each, staleness window {args.max_age:.0f}s")
+    print(f"{'max diff':>9} {'reused':>8} {'mean drift':>11} {'max drift':>10} {'top match':>10} {'saved ms':>9}")
+    for max_diff in args.max_diff:
+        now = [0.0]
+        cache = CropCache(max_diff=max_diff, max_age=args.max_age, clock=lambda: now[0])
+        drift, matches, reused = [], 0, 0
+        for timestamp, face, truth in zip(timestamps, crops, scores):
+            now[0] = timestamp
+            cached = cache.lookup(face)
+            if cached is None:
+                cache.store(face, dict(zip(EMOTIONS, truth.tolist())))
+                served = truth
+            else:
+                reused += 1
+                served = np.array([cached[emotion] for emotion in EMOTIONS])
+            drift.append(float(np.abs(served - truth).max()))
+            matches += int(np.argmax(served) == np.argmax(truth))
+        print(
+            f"{max_diff:>9.3f} {reused / len(crops):>7.1%} {np.mean(drift):>11.4f} {np.max(drift):>10.4f} "
+            f"{matches / len(crops):>9.1%} {reused * infer_ms:>9.1f}"
+        )
+
+
+if __name__ == '__main__':
+    main()
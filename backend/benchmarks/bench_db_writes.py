@@ -0,0 +1,135 @@
+"""Concurrent write load test: default sync engine vs tuned sync and async engines.
+
+Each writer commits small transactions into ``emotion_data``, the way live
+interviews save samples. It compares three setups:
+
+- "before": a plain engine like the one database.py used to create
+- "sync": make_engine, with a pool plus WAL, synchronous=NORMAL and busy_timeout
+- "async": make_async_engine
+
+It reports commits per second, p50/p99 commit latency and failed commits.
+Against SQLite the default target is a throwaway file. Point --url at
+Postgres to load-test that instead.
+
+    python benchmarks/bench_db_writes.py [--writers 16] [--commits 50] [--url sqlite:///...]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import models  # noqa: E402
+from database import is_sqlite, make_async_engine, make_engine  # noqa: E402
+
+TABLE = models.EmotionData.__table__
+
+
+def make_row(writer: int, i: int) -> dict:
+    return {
+        'interview_id': writer,
+        'timestamp': datetime.utcnow(),
+        'emotion_data': {'happy': 0.5, 'neutral': 0.5, 'sequence': i},
+        'confidence': 0.5,
+    }
+
+
+def run_sync(engine, writers: int, commits: int):
+    def writer(index: int):
+        latencies, failures = [], 0
+        for i in range(commits):
+            start = time.perf_counter()
+            try:
+                with engine.begin() as conn:
+                    conn.execute(TABLE.insert(), make_row(index, i))
+            except OperationalError:
+                failures += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+        return latencies, failures
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=writers) as pool:
+        results = list(pool.map(writer, range(writers)))
+    return time.perf_counter() - start, results
+
+
+async def run_async(engine, writers: int, commits: int):
+    async def writer(index: int):
+        latencies, failures = [], 0
+        for i in range(commits):
+            start = time.perf_counter()
+            try:
+                async with engine.begin() as conn:
+                    await conn.execute(TABLE.insert(), make_row(index, i))
+            except OperationalError:
+                failures += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+        return latencies, failures
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(writer(i) for i in range(writers)))
+    elapsed = time.perf_counter() - start
+    await engine.dispose()
+    return elapsed, results
+
+
+def report(name: str, elapsed: float, results):
+    latencies = np.concatenate([np.array(r[0]) for r in results]) if results else np.empty(0)
+    failures = sum(r[1] for r in results)
+    p50, p99 = (np.percentile(latencies, [50, 99]) * 1000) if len(latencies) else (0.0, 0.0)
+    print(f"{name:>7} {len(latencies) / elapsed:>10.1f} {p50:>9.2f} {p99:>9.2f} {failures:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--writers', type=int, default=16)
+    parser.add_argument('--commits', type=int, default=50)
+    parser.add_argument('--url', default=None)
+    args = parser.parse_args()
+
+    workdir = None
+    if args.url is None:
+        workdir = tempfile.TemporaryDirectory()
+
+    def fresh_url(name: str) -> str:
+        return args.url or f"sqlite:///{os.path.join(workdir.name, name + '.db')}"
+
+    print(f"{args.writers} writers x {args.commits} commits")
+    print(f"{'engine':>7} {'commits/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'failures':>8}")
+
+    url = fresh_url('before')
+    connect_args = {"check_same_thread": False} if is_sqlite(url) else {}
+    before = create_engine(url, connect_args=connect_args)
+    models.Base.metadata.create_all(bind=before)
+    report('before', *run_sync(before, args.writers, args.commits))
+    before.dispose()
+
+    url = fresh_url('sync')
+    tuned = make_engine(url)
+    models.Base.metadata.create_all(bind=tuned)
+    report('sync', *run_sync(tuned, args.writers, args.commits))
+    tuned.dispose()
+
+    url = fresh_url('async')
+    setup = make_engine(url)
+    models.Base.metadata.create_all(bind=setup)
+    setup.dispose()
+    report('async', *asyncio.run(run_async(make_async_engine(url), args.writers, args.commits)))
+
+    if workdir is not None:
+        workdir.cleanup()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""Payload size and encode time of the columnar emotion series formats.
+
+Synthesizes an interview's emotion history at the UI's one sample every 2s.
+It then encodes the history in each of these ways:
+
+- "rows": what the paginated listing sends. Each sample is validated
+  into ``schemas.EmotionData`` through ``orm_mode`` and run through
+  FastAPI's ``jsonable_encoder`` and ``json.dumps``, as one single page.
+- "json": columnar JSON, via orjson when installed
+- "json-stdlib": columnar JSON through the stdlib encoder
+- "msgpack" and "arrow": columnar, only if msgpack or pyarrow is installed
+
+It reports the raw and gzipped size and the median encode time.
+
+    python benchmarks/bench_emotion_series.py [--minutes 30 60 120] [--repeat 5]
+"""
+import argparse
+import gzip
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import emotion_series  # noqa: E402
+import schemas  # noqa: E402
+from emotion_analysis import EMOTIONS  # noqa: E402
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+
+SAMPLE_INTERVAL = 2.0
+START = datetime(2024, 1, 1, 9, tzinfo=timezone.utc).timestamp()
+
+
+def synthetic_series(samples: int, seed: int = 0):
+    """float64 timestamps and float32 softmax scores, as ``load_emotion_series`` returns them."""
+    rng = np.random.default_rng(seed)
+    timestamps = START + np.arange(samples) * SAMPLE_INTERVAL
+    logits = rng.normal(size=(samples, len(EMOTIONS)))
+    scores = np.exp(logits) / np.exp(logits).sum(axis=1, keepdims=True)
+    return timestamps, scores.astype(np.float32)
+
+
+def orm_rows(timestamps: np.ndarray, scores: np.ndarray):
+    """Objects shaped like ``models.EmotionData`` rows, for the orm_mode path."""
+    return [
+        SimpleNamespace(
+            id=index + 1,
+            interview_id=1,
+            timestamp=datetime.fromtimestamp(timestamp, tz=timezone.utc).replace(tzinfo=None),
+            emotion_data={emotion: float(score) for emotion, score in zip(EMOTIONS, row)},
+            confidence=float(row.max()),
+        )
+        for index, (timestamp, row) in enumerate(zip(timestamps, scores))
+    ]
+
+
+def encode_rows(rows) -> bytes:
+    page = schemas.EmotionDataPage(items=[schemas.EmotionData.from_orm(row) for row in rows], next_cursor=None)
+    return json.dumps(jsonable_encoder(page)).encode()
+
+
+def encode_json_stdlib(series) -> bytes:
+    has_orjson = emotion_series.HAS_ORJSON
+    emotion_series.HAS_ORJSON = False
+    try:
+        return emotion_series.encode(emotion_series.JSON, 1, series)
+    finally:
+        emotion_series.HAS_ORJSON = has_orjson
+
+
+def median_seconds(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--minutes', type=float, nargs='+', default=[30, 60, 120])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    names = {emotion_series.MSGPACK: 'msgpack', emotion_series.ARROW: 'arrow'}
+    for media_type in (emotion_series.MSGPACK, emotion_series.ARROW):
+        if media_type not in emotion_series.AVAILABLE:
+            print(f"skipping {names[media_type]}: {emotion_series.REQUIRED_MODULES[media_type]} is not installed")
+    if not emotion_series.HAS_ORJSON:
+        print("orjson is not installed, so json and json-stdlib both use the stdlib encoder")
+
+    print(f"{'minutes':>7} {'samples':>7} {'format':<12} {'bytes':>10} {'gzip bytes':>11} {'encode ms':>10} {'vs rows':>8}")
+    for minutes in args.minutes:
+        samples = int(minutes * 60 / SAMPLE_INTERVAL)
+        series = synthetic_series(samples)
+        rows = orm_rows(*series)
+        encoders = [('rows', lambda: encode_rows(rows)),
+                    ('json', lambda: emotion_series.encode(emotion_series.JSON, 1, series)),
+                    ('json-stdlib', lambda: encode_json_stdlib(series))]
+        encoders += [(names[m], lambda m=m: emotion_series.encode(m, 1, series))
+                     for m in (emotion_series.MSGPACK, emotion_series.ARROW) if m in emotion_series.AVAILABLE]
+
+        baseline = None
+        for name, encode in encoders:
+            body = encode()
+            seconds = median_seconds(encode, args.repeat)
+            baseline = baseline or seconds
+            print(f"{minutes:>7g} {samples:>7} {name:<12} {len(body):>10} {len(gzip.compress(body)):>11} "
+                  f"{seconds * 1000:>10.2f} {baseline / seconds:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
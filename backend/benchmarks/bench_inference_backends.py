@@ -0,0 +1,135 @@
+"""Agreement check and micro-benchmark for the inference backends.
+
+Builds a small emotion-shaped Keras model (48x48x1 in, 7 softmax out) with
+fixed random weights. It then writes these variants of the model:
+
+- a Keras file, run by TensorFlow
+- a float TFLite file
+- a full-integer int8 TFLite file
+- ONNX, plus a dynamically quantized int8 copy (only if tf2onnx is installed)
+
+Every variant whose runtime is installed is loaded through
+inference_backends. Its scores are compared with the Keras model's on the
+same faces, and it is timed at a few batch sizes. The script exits non-zero
+when any backend disagrees by more than its tolerance. Finally it shows which
+backend ``load_backend(..., backend="auto")`` picks.
+
+    python benchmarks/bench_inference_backends.py [--threads 1 4] [--batches 1 8 32]
+
+Intra-op thread counts default to 1 and the machine's CPU count.
+"""
+import argparse
+import importlib.util
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import inference_backends  # noqa: E402
+from inference_backends import BackendUnavailable, benchmark, load_backend, max_difference, sample_faces  # noqa: E402
+
+FLOAT_TOLERANCE = 1e-4
+INT8_TOLERANCE = inference_backends.DEFAULT_TOLERANCE
+
+
+def build_model(path: str):
+    import tensorflow as tf
+
+    tf.keras.utils.set_random_seed(0)
+    model = tf.keras.Sequential([
+        tf.keras.layers.Input((48, 48, 1)),
+        tf.keras.layers.Conv2D(8, 3, activation='relu'),
+        tf.keras.layers.MaxPooling2D(2),
+        tf.keras.layers.Conv2D(16, 3, activation='relu'),
+        tf.keras.layers.MaxPooling2D(2),
+        tf.keras.layers.Flatten(),
+        tf.keras.layers.Dense(32, activation='relu'),
+        tf.keras.layers.Dense(7, activation='softmax'),
+    ])
+    model.save(path)
+    return model
+
+
+def write_tflite(model, path: str, int8: bool = False):
+    import tensorflow as tf
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    if int8:
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = lambda: ([sample_faces(1, seed)] for seed in range(100))
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        converter.inference_input_type = tf.int8
+        converter.inference_output_type = tf.int8
+    with open(path, 'wb') as f:
+        f.write(converter.convert())
+
+
+def write_onnx(model, path: str, int8_path: str) -> bool:
+    if importlib.util.find_spec('tf2onnx') is None:
+        print("skipping ONNX variants: tf2onnx is not installed")
+        return False
+    import tensorflow as tf
+    import tf2onnx
+
+    spec = (tf.TensorSpec((None, 48, 48, 1), tf.float32, name='faces'),)
+    tf2onnx.convert.from_keras(model, input_signature=spec, output_path=path)
+    if importlib.util.find_spec('onnxruntime') is not None:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantize_dynamic(path, int8_path, weight_type=QuantType.QInt8)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', type=int, nargs='+', default=sorted({1, os.cpu_count() or 1}))
+    parser.add_argument('--batches', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    workdir = tempfile.TemporaryDirectory()
+    keras_path = os.path.join(workdir.name, 'emotion.keras')
+    model = build_model(keras_path)
+    variants = [(keras_path, FLOAT_TOLERANCE)]
+    write_tflite(model, os.path.join(workdir.name, 'emotion.tflite'))
+    variants.append((os.path.join(workdir.name, 'emotion.tflite'), FLOAT_TOLERANCE))
+    write_tflite(model, os.path.join(workdir.name, 'emotion_int8.tflite'), int8=True)
+    variants.append((os.path.join(workdir.name, 'emotion_int8.tflite'), INT8_TOLERANCE))
+    onnx_path, onnx_int8_path = (os.path.join(workdir.name, name) for name in ('emotion.onnx', 'emotion_int8.onnx'))
+    if write_onnx(model, onnx_path, onnx_int8_path):
+        variants.append((onnx_path, FLOAT_TOLERANCE))
+        if os.path.exists(onnx_int8_path):
+            variants.append((onnx_int8_path, INT8_TOLERANCE))
+
+    faces = sample_faces(64, seed=1)
+    reference = model(faces, training=False).numpy()
+    failures = 0
+    columns = ''.join(f"{f'b={b} ms':>10}" for b in args.batches)
+    print(f"\n{'backend':<30} {'threads':>7} {'max diff':>10} {'tolerance':>10}{columns}")
+    for path, tolerance in variants:
+        kind = inference_backends.backend_for_path(path)
+        for threads in args.threads:
+            try:
+                backend = load_backend(path, backend=kind, intra_op_threads=threads, inter_op_threads=1)
+            except BackendUnavailable as e:
+                print(f"{os.path.basename(path):<30} skipped: {e}")
+                break
+            difference = max_difference(reference, backend.predict(faces))
+            failures += difference > tolerance
+            timings = ''.join(
+                f"{benchmark(backend, sample_faces(b), args.repeat) * 1000:>10.3f}" for b in args.batches
+            )
+            flag = '' if difference <= tolerance else '  DISAGREES'
+            print(f"{backend.label:<30} {threads:>7} {difference:>10.5f} {tolerance:>10}{timings}{flag}")
+
+    print()
+    load_backend([path for path, _ in variants], backend='auto')
+    workdir.cleanup()
+    if failures:
+        print(f"{failures} backend runs disagreed with the Keras model")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,196 @@
+"""Seeded benchmark for the keyset-paginated interview and emotion listings.
+
+Seeds a throwaway SQLite database with --interviews interviews (spread over
+--interviewers users, each with a couple of questions and feedback rows) and
+--emotions emotion_data rows (spread over --hot-interviews interviews). It then
+times pages at increasing depth, using keyset cursors and the equivalent OFFSET
+query for comparison. The interview listing also reports how many SQL
+statements one page costs.
+
+    python benchmarks/bench_listings.py [--interviews 100000] [--emotions 10000000]
+
+Seeding 10M rows takes a few minutes; pass --db to keep and reuse the file.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import listings  # noqa: E402
+import models  # noqa: E402
+import schemas  # noqa: E402
+from database import make_engine  # noqa: E402
+from emotion_store import CHUNK_SIZE  # noqa: E402
+from sqlalchemy.orm import selectinload, sessionmaker  # noqa: E402
+
+SEED_BATCH = 50000
+EPOCH = datetime(2024, 1, 1)
+
+
+def sql_time(value: datetime) -> str:
+    # Same text form SQLAlchemy stores, so keyset comparisons line up
+    return value.strftime('%Y-%m-%d %H:%M:%S.%f')
+
+
+def seed(engine, interviews: int, interviewers: int, emotions: int, hot_interviews: int):
+    models.Base.metadata.create_all(bind=engine)
+    raw = engine.raw_connection()
+    try:
+        cur = raw.cursor()
+        if cur.execute("SELECT COUNT(*) FROM interviews").fetchone()[0]:
+            return
+        start = time.perf_counter()
+        cur.executemany(
+            "INSERT INTO users (id, email, name, hashed_password, role, is_active) VALUES (?, ?, ?, '', 'user', 1)",
+            [(u, f"interviewer{u}@example.com", f"Interviewer {u}") for u in range(1, interviewers + 1)],
+        )
+        for offset in range(0, interviews, SEED_BATCH):
+            ids = range(offset + 1, min(offset + SEED_BATCH, interviews) + 1)
+            cur.executemany(
+                "INSERT INTO interviews (id, candidate_name, candidate_email, position, status, scheduled_at, "
+                "interviewer_id, created_at, updated_at) VALUES (?, ?, ?, 'Engineer', 'completed', ?, ?, ?, ?)",
+                [
+                    (i, f"Candidate {i}", f"candidate{i}@example.com", sql_time(EPOCH + timedelta(minutes=i)),
+                     i % interviewers + 1, sql_time(EPOCH), sql_time(EPOCH))
+                    for i in ids
+                ],
+            )
+            cur.executemany(
+                "INSERT INTO questions (interview_id, question_text, category, difficulty, created_at, updated_at) "
+                "VALUES (?, 'Tell me about a project', 'behavioral', 'medium', ?, ?)",
+                [(i, sql_time(EPOCH), sql_time(EPOCH)) for i in ids for _ in range(2)],
+            )
+            cur.executemany(
+                "INSERT INTO interview_feedback (interview_id, user_id, technical_rating, communication_rating, "
+                "problem_solving_rating, overall_rating, strengths, weaknesses, comments, created_at, updated_at) "
+                "VALUES (?, ?, 4, 4, 4, 4, '', '', '', ?, ?)",
+                [(i, i % interviewers + 1, sql_time(EPOCH), sql_time(EPOCH)) for i in ids],
+            )
+        # Emotion rows go to the newest interviews so they show up on page one
+        hot = [interviews - h for h in range(hot_interviews)]
+        for offset in range(0, emotions, SEED_BATCH):
+            n = min(SEED_BATCH, emotions - offset)
+            cur.executemany(
+                "INSERT INTO emotion_data (interview_id, timestamp, emotion_data, confidence) VALUES (?, ?, ?, 0.5)",
+                [
+                    (hot[(offset + k) % len(hot)],
+                     sql_time(EPOCH + timedelta(milliseconds=200 * ((offset + k) // len(hot)))),
+                     '{"happy": 0.5, "neutral": 0.5}')
+                    for k in range(n)
+                ],
+            )
+            raw.commit()
+        # Matching chunk rows, as bulk_save_emotions writes them (payloads aren't read here)
+        per_interview = emotions // len(hot)
+        cur.executemany(
+            "INSERT INTO emotion_chunks (interview_id, start_time, end_time, sample_count, timestamps, scores) "
+            "VALUES (?, ?, ?, ?, x'', x'')",
+            [
+                (interview_id, sql_time(EPOCH), sql_time(EPOCH), min(CHUNK_SIZE, per_interview - start))
+                for interview_id in hot
+                for start in range(0, per_interview, CHUNK_SIZE)
+            ],
+        )
+        raw.commit()
+        cur.execute("ANALYZE")
+        print(f"seeded in {time.perf_counter() - start:.1f}s")
+    finally:
+        raw.close()
+
+
+def offset_interview_page(db, interviewer_id: int, offset: int, limit: int):
+    """The same page and payload as list_interviews, fetched with OFFSET."""
+    interviews = (
+        db.query(models.Interview)
+        .options(selectinload(models.Interview.questions), selectinload(models.Interview.feedback))
+        .filter(models.Interview.interviewer_id == interviewer_id)
+        .order_by(models.Interview.scheduled_at.desc(), models.Interview.id.desc())
+        .offset(offset).limit(limit).all()
+    )
+    counts = listings.emotion_counts(db, [i.id for i in interviews])
+    return [
+        schemas.InterviewListItem.from_orm(i).copy(update={'emotion_count': counts.get(i.id, 0)})
+        for i in interviews
+    ]
+
+
+def timed(fn, repeat: int = 5) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--interviews', type=int, default=100000)
+    parser.add_argument('--interviewers', type=int, default=10)
+    parser.add_argument('--emotions', type=int, default=10000000)
+    parser.add_argument('--hot-interviews', type=int, default=10)
+    parser.add_argument('--depths', type=int, nargs='+', default=[0, 10, 100, 190])
+    parser.add_argument('--db', default=None, help='SQLite file to seed (kept between runs)')
+    args = parser.parse_args()
+
+    workdir = tempfile.TemporaryDirectory() if args.db is None else None
+    path = args.db or os.path.join(workdir.name, 'listings.db')
+    engine = make_engine(f"sqlite:///{path}")
+    seed(engine, args.interviews, args.interviewers, args.emotions, args.hot_interviews)
+    db = sessionmaker(bind=engine)()
+
+    statements = []
+    event.listen(engine, 'before_cursor_execute', lambda *a: statements.append(a[2]))
+
+    page_size = listings.DEFAULT_PAGE_SIZE
+    interviewer = 1
+    print(f"\ninterview list, {page_size} per page (interviewer {interviewer})")
+    print(f"{'page':>6} {'keyset ms':>10} {'offset ms':>10} {'queries':>8}")
+    cursor, page = None, 0
+    for depth in sorted(args.depths):
+        while page < depth and cursor is not False:
+            cursor = listings.list_interviews(db, interviewer, cursor)['next_cursor'] or False
+            page += 1
+        if cursor is False:
+            break
+        statements.clear()
+        keyset = timed(lambda: listings.list_interviews(db, interviewer, cursor))
+        queries = len(statements) // 5
+        offset = timed(lambda: offset_interview_page(db, interviewer, depth * page_size, page_size))
+        print(f"{depth:>6} {keyset:>10.2f} {offset:>10.2f} {queries:>8}")
+
+    interview_id = args.interviews
+    owner = interview_id % args.interviewers + 1
+    page_size = listings.DEFAULT_EMOTION_PAGE_SIZE
+    print(f"\nemotion list, {page_size} per page (interview {interview_id})")
+    print(f"{'page':>6} {'keyset ms':>10} {'offset ms':>10}")
+    cursor, page = None, 0
+    for depth in sorted(args.depths):
+        while page < depth and cursor is not False:
+            cursor = listings.list_emotions(db, interview_id, owner, cursor)['next_cursor'] or False
+            page += 1
+        if cursor is False:
+            break
+        keyset = timed(lambda: listings.list_emotions(db, interview_id, owner, cursor))
+        offset = timed(lambda: (
+            db.query(models.EmotionData)
+            .filter(models.EmotionData.interview_id == interview_id)
+            .order_by(models.EmotionData.timestamp, models.EmotionData.id)
+            .offset(depth * page_size).limit(page_size).all()
+        ))
+        print(f"{depth:>6} {keyset:>10.2f} {offset:>10.2f}")
+
+    db.close()
+    engine.dispose()
+    if workdir is not None:
+        workdir.cleanup()
+
+
+if __name__ == '__main__':
+    main()
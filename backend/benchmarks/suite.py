@@ -0,0 +1,335 @@
+"""Offline benchmark suite for the analyzer, API and database hot paths.
+
+Runs each case a fixed number of times and writes the results as JSON. It
+can compare them with a stored baseline and exits non-zero when any case's
+median is slower than baseline by more than its threshold. The emotion
+model and the question LLM are replaced by deterministic stubs, and the
+database is a throwaway SQLite file, so no network or GPU is needed.
+
+    python benchmarks/suite.py                          # run and print
+    python benchmarks/suite.py --output results.json    # also write results
+    python benchmarks/suite.py --save-baseline          # record benchmarks/baseline.json
+    python benchmarks/suite.py --compare                # fail on regressions vs the baseline
+    python benchmarks/suite.py --compare --threshold 0.3 --case-threshold api.auth_me=0.5
+    python benchmarks/suite.py --filter analyzer        # only cases whose name contains "analyzer"
+
+The API cases need httpx (see benchmarks/requirements.txt).
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(BACKEND_DIR, 'benchmarks', 'baseline.json')
+DEFAULT_THRESHOLD = 0.25
+
+# Configure the app for an isolated, offline run before anything imports it
+_workdir = tempfile.TemporaryDirectory(prefix='bench-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_workdir.name, 'bench.db')}"
+os.environ.setdefault('VISION_WORKERS', '0')
+os.environ.setdefault('BCRYPT_ROUNDS', '4')
+# The API cases resend one frame; measure full analysis rather than crop reuse
+os.environ.setdefault('CROP_REUSE_MAX_DIFF', '0')
+os.environ.pop('OPENAI_API_KEY', None)
+os.environ.pop('QUESTION_CACHE_DB', None)
+sys.path.insert(0, BACKEND_DIR)
+
+import cv2  # noqa: E402
+import numpy as np  # noqa: E402
+
+from emotion_analysis import EMOTIONS, EmotionAnalyzer, FaceTracker, emotional_insights_batch  # noqa: E402
+
+RESOLUTIONS = [(320, 240), (640, 480), (1280, 720)]
+
+# Run after all cases, e.g. the app's shutdown handlers
+_cleanups: List[Callable[[], None]] = []
+
+
+class StubEmotionModel:
+    """Deterministic stand-in for the Keras model: scores derived from pixel statistics."""
+
+    def predict(self, faces: np.ndarray, verbose: int = 0) -> np.ndarray:
+        means = faces.reshape(len(faces), -1).mean(axis=1, keepdims=True)
+        logits = np.outer(means, np.arange(1, len(EMOTIONS) + 1)) / 4.0
+        exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+        return (exp / exp.sum(axis=1, keepdims=True)).astype(np.float32)
+
+
+def stub_completion(**kwargs) -> str:
+    return "Q: Describe a recent project.\nFollow-up: What would you change?\nContext: warm-up"
+
+
+def synthetic_face(width: int, height: int, seed: int = 0) -> np.ndarray:
+    """A drawn face (head, eyes, brows, nose, mouth) on a noisy background."""
+    rng = np.random.default_rng(seed)
+    frame = rng.integers(60, 120, size=(height, width, 3), dtype=np.uint8)
+    cx, cy, r = width // 2, height // 2, min(width, height) // 4
+    cv2.ellipse(frame, (cx, cy), (int(r * 0.8), r), 0, 0, 360, (170, 190, 225), -1)
+    for dx in (-1, 1):
+        eye = (cx + dx * r // 3, cy - r // 4)
+        cv2.ellipse(frame, eye, (r // 7, r // 12), 0, 0, 360, (250, 250, 250), -1)
+        cv2.circle(frame, eye, r // 16, (40, 30, 30), -1)
+        cv2.line(frame, (eye[0] - r // 6, eye[1] - r // 6), (eye[0] + r // 6, eye[1] - r // 5), (60, 50, 40), 3)
+    cv2.line(frame, (cx, cy - r // 10), (cx - r // 12, cy + r // 6), (120, 130, 170), 2)
+    cv2.ellipse(frame, (cx, cy + r // 2), (r // 3, r // 8), 0, 0, 180, (60, 60, 150), -1)
+    return frame
+
+
+class Case:
+    def __init__(self, name: str, fn: Callable[[], object], repeat: int = 20, warmup: int = 3, items: int = 1):
+        self.name = name
+        self.fn = fn
+        self.repeat = repeat
+        self.warmup = warmup
+        self.items = items
+
+    def run(self) -> Dict[str, float]:
+        for _ in range(self.warmup):
+            self.fn()
+        timings = []
+        for _ in range(self.repeat):
+            start = time.perf_counter()
+            self.fn()
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        median = statistics.median(timings)
+        return {
+            'median_ms': median * 1000,
+            'mean_ms': statistics.fmean(timings) * 1000,
+            'p95_ms': timings[min(len(timings) - 1, int(round(0.95 * (len(timings) - 1))))] * 1000,
+            'min_ms': timings[0] * 1000,
+            'items_per_s': self.items / median if median > 0 else float('inf'),
+            'repeat': self.repeat,
+        }
+
+
+def analyzer_cases() -> List[Case]:
+    analyzer = EmotionAnalyzer()
+    analyzer.model = StubEmotionModel()
+    cases = []
+    for width, height in RESOLUTIONS:
+        frame = synthetic_face(width, height)
+        cases.append(Case(f"analyzer.preprocess.{width}x{height}", lambda f=frame: analyzer.preprocess_image(f)))
+        tracker = FaceTracker()
+        cases.append(Case(
+            f"analyzer.preprocess_tracked.{width}x{height}",
+            lambda f=frame, t=tracker: analyzer.preprocess_image(f, t),
+        ))
+        cases.append(Case(f"analyzer.analyze.{width}x{height}", lambda f=frame: analyzer.analyze_emotion(f)))
+    frames = [synthetic_face(640, 480, seed) for seed in range(16)]
+    cases.append(Case("analyzer.analyze_batch.16x640x480", lambda: analyzer.analyze_batch(frames), repeat=10, items=16))
+
+    scores = np.random.default_rng(0).dirichlet(np.ones(len(EMOTIONS)), size=10000).astype(np.float32)
+    cases.append(Case("insights.batch.10000", lambda: emotional_insights_batch(scores), items=10000))
+    single = dict(zip(EMOTIONS, scores[0].tolist()))
+    cases.append(Case("insights.single", lambda: analyzer.get_emotional_insights(single), repeat=200))
+    return cases
+
+
+def api_cases() -> List[Case]:
+    try:
+        import httpx
+    except ImportError:
+        print("skipping api.* cases: httpx is not installed", file=sys.stderr)
+        return []
+    import main
+
+    main.emotion_analyzer.model = StubEmotionModel()
+    main.question_generator.completion_fn = stub_completion
+    main.question_generator.acompletion_fn = None
+    main.question_generator.stream_fn = lambda **kwargs: iter([stub_completion()])
+
+    loop = asyncio.new_event_loop()
+    transport = httpx.ASGITransport(app=main.app)
+    client = httpx.AsyncClient(transport=transport, base_url="http://bench")
+    # The ASGI transport doesn't send lifespan events, so run them by hand
+    loop.run_until_complete(main.app.router.startup())
+
+    def close():
+        loop.run_until_complete(client.aclose())
+        loop.run_until_complete(main.app.router.shutdown())
+        loop.close()
+    _cleanups.append(close)
+
+    def call(method: str, url: str, **kwargs):
+        response = loop.run_until_complete(client.request(method, url, **kwargs))
+        response.raise_for_status()
+        return response
+
+    token = call("POST", "/api/auth/signup", json={
+        'email': 'bench@example.com', 'name': 'Bench', 'password': 'benchmark',
+    }).json()['access_token']
+    headers = {'Authorization': f"Bearer {token}"}
+
+    interview_id = 'bench-live'
+    for i in range(main.realtime_registry.capacity):
+        main.realtime_registry.record(interview_id, dict(zip(EMOTIONS, np.full(len(EMOTIONS), 1 / len(EMOTIONS)))))
+    _, frame = cv2.imencode('.jpg', synthetic_face(640, 480))
+    frame_bytes = frame.tobytes()
+
+    return [
+        Case("api.auth_me", lambda: call("GET", "/api/auth/me", headers=headers), repeat=50),
+        Case("api.login", lambda: call("POST", "/api/auth/login", json={
+            'email': 'bench@example.com', 'password': 'benchmark',
+        }), repeat=10),
+        Case("api.realtime_snapshot", lambda: call(
+            "GET", f"/api/emotions/{interview_id}/realtime", headers=headers,
+        ), repeat=50),
+        Case("api.analyze_frame.640x480", lambda: call(
+            "POST", f"/api/emotions/analyze?interview_id={interview_id}",
+            content=frame_bytes, headers={**headers, 'Content-Type': 'application/octet-stream'},
+        ), repeat=20),
+        Case("api.generate_questions", lambda: call(
+            "POST", "/api/questions/generate", headers=headers,
+            json={'candidateProfile': {'role': 'engineer', 'skills': ['python']}, 'numQuestions': 1},
+        ), repeat=50),
+    ]
+
+
+def database_cases() -> List[Case]:
+    import emotion_series
+    import emotion_store
+    import models
+    import schemas
+    from database import SessionLocal, engine
+
+    models.Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    interview = models.Interview(
+        candidate_name='Bench', candidate_email='candidate@example.com', position='Engineer',
+        status='completed', scheduled_at=datetime(2024, 1, 1), interviewer_id=1,
+    )
+    db.add(interview)
+    db.commit()
+    _cleanups.append(db.close)
+
+    rng = np.random.default_rng(1)
+    start = datetime(2024, 1, 1)
+    samples = [
+        schemas.EmotionSample(
+            timestamp=start + timedelta(milliseconds=200 * i),
+            emotions=dict(zip(EMOTIONS, rng.dirichlet(np.ones(len(EMOTIONS))).tolist())),
+        )
+        for i in range(2000)
+    ]
+    counter = {'offset': 0}
+
+    def ingest():
+        # Shift each batch forward in time so repeats append rather than overlap
+        counter['offset'] += 1
+        shift = timedelta(hours=counter['offset'])
+        batch = [s.copy(update={'timestamp': s.timestamp + shift}) for s in samples]
+        emotion_store.bulk_save_emotions(db, interview.id, batch)
+
+    cases = [Case("db.bulk_save.2000", ingest, repeat=10, warmup=1, items=len(samples))]
+    ingest()
+    cases.append(Case("db.load_series", lambda: emotion_store.load_emotion_series(db, interview.id), repeat=20))
+    series = emotion_store.load_emotion_series(db, interview.id)
+    for name, media_type in (('json', emotion_series.JSON), ('msgpack', emotion_series.MSGPACK)):
+        if media_type in emotion_series.AVAILABLE:
+            cases.append(Case(
+                f"db.encode_series.{name}", lambda m=media_type: emotion_series.encode(m, interview.id, series),
+                repeat=20, items=len(series[0]),
+            ))
+    return cases
+
+
+def collect_cases(filter_text: Optional[str]) -> List[Case]:
+    cases = analyzer_cases() + api_cases() + database_cases()
+    if filter_text:
+        cases = [case for case in cases if filter_text in case.name]
+    return cases
+
+
+def compare(results: Dict, baseline: Dict, threshold: float, overrides: Dict[str, float]) -> List[str]:
+    """Return a line per regressed case; thresholds are fractional slowdowns of the median."""
+    regressions = []
+    stored = baseline.get('results', {})
+    thresholds = {**baseline.get('thresholds', {}), **overrides}
+    print(f"\n{'case':<40} {'baseline ms':>12} {'current ms':>11} {'change':>8}")
+    for name, current in results['results'].items():
+        if name not in stored:
+            print(f"{name:<40} {'-':>12} {current['median_ms']:>11.3f} {'new':>8}")
+            continue
+        before = stored[name]['median_ms']
+        change = (current['median_ms'] - before) / before if before > 0 else 0.0
+        limit = thresholds.get(name, threshold)
+        flag = '  REGRESSION' if change > limit else ''
+        print(f"{name:<40} {before:>12.3f} {current['median_ms']:>11.3f} {change:>+8.1%}{flag}")
+        if flag:
+            regressions.append(f"{name}: {before:.3f} ms -> {current['median_ms']:.3f} ms ({change:+.1%} > {limit:.0%})")
+    return regressions
+
+
+def parse_overrides(values: List[str]) -> Dict[str, float]:
+    overrides = {}
+    for value in values:
+        name, _, limit = value.partition('=')
+        overrides[name] = float(limit)
+    return overrides
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output', help='write results JSON here')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help='write the results as the new baseline')
+    parser.add_argument('--compare', action='store_true', help='compare with the baseline and fail on regressions')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='allowed median slowdown as a fraction (default %(default)s)')
+    parser.add_argument('--case-threshold', action='append', default=[], metavar='NAME=FRACTION',
+                        help='per-case threshold, may be repeated')
+    parser.add_argument('--filter', help='only run cases whose name contains this text')
+    args = parser.parse_args()
+
+    results = {
+        'created_at': datetime.utcnow().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': {},
+    }
+    print(f"{'case':<40} {'median ms':>10} {'p95 ms':>10} {'items/s':>12}")
+    try:
+        for case in collect_cases(args.filter):
+            stats = case.run()
+            results['results'][case.name] = stats
+            print(f"{case.name:<40} {stats['median_ms']:>10.3f} {stats['p95_ms']:>10.3f} {stats['items_per_s']:>12.1f}")
+    finally:
+        for cleanup in reversed(_cleanups):
+            cleanup()
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.save_baseline:
+        thresholds = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                thresholds = json.load(f).get('thresholds', {})
+        with open(args.baseline, 'w') as f:
+            json.dump({**results, 'thresholds': thresholds}, f, indent=2)
+        print(f"\nbaseline written to {args.baseline}")
+
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            print(f"\nno baseline at {args.baseline}; run with --save-baseline first", file=sys.stderr)
+            sys.exit(2)
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold, parse_overrides(args.case_threshold))
+        if regressions:
+            print("\nregressions:\n  " + "\n  ".join(regressions), file=sys.stderr)
+            sys.exit(1)
+        print("\nno regressions")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,7 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 import os
 from dotenv import load_dotenv
 
@@ -8,9 +9,101 @@ load_dotenv()
 
 SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./ai_interview.db")
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+# Connection pool tuning (ignored for in-memory SQLite)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+
+def is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+
+def is_memory_sqlite(url: str) -> bool:
+    return is_sqlite(url) and (":memory:" in url or url.rstrip("/") in ("sqlite:", "sqlite+aiosqlite:"))
+
+
+def to_async_url(url: str) -> str:
+    """Map a sync DATABASE_URL onto its async driver (aiosqlite / asyncpg)."""
+    scheme, sep, rest = url.partition("://")
+    driver = scheme.split("+")[0]
+    if driver == "sqlite":
+        return f"sqlite+aiosqlite{sep}{rest}"
+    if driver in ("postgresql", "postgres"):
+        return f"postgresql+asyncpg{sep}{rest}"
+    return url
+
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL lets readers run alongside the single writer; NORMAL sync is safe under WAL
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.close()
+
+
+def pool_options(url: str, async_: bool = False) -> dict:
+    if is_memory_sqlite(url):
+        return {}
+    options = dict(
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_pre_ping=not is_sqlite(url),
+    )
+    if is_sqlite(url):
+        # File-backed SQLite defaults to NullPool; use a real pool so the settings apply
+        # (aiosqlite connections each hold a thread; the app disposes the pool at shutdown)
+        options["poolclass"] = AsyncAdaptedQueuePool if async_ else QueuePool
+    return options
+
+
+def make_engine(url: str = SQLALCHEMY_DATABASE_URL):
+    connect_args = {"check_same_thread": False} if is_sqlite(url) else {}
+    sync_engine = create_engine(url, connect_args=connect_args, **pool_options(url))
+    if is_sqlite(url) and not is_memory_sqlite(url):
+        event.listen(sync_engine, "connect", set_sqlite_pragmas)
+    return sync_engine
+
+
+def make_async_engine(url: str = SQLALCHEMY_DATABASE_URL):
+    # Imported here so sync-only deployments don't need an async driver installed
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    async_engine = create_async_engine(to_async_url(url), **pool_options(url, async_=True))
+    if is_sqlite(url) and not is_memory_sqlite(url):
+        event.listen(async_engine.sync_engine, "connect", set_sqlite_pragmas)
+    return async_engine
+
+
+engine = make_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-Base = declarative_base() 
\ No newline at end of file
+_async_session_factory = None
+
+
+def get_async_session_factory():
+    """Async sessionmaker, created on first use alongside its engine."""
+    global _async_session_factory
+    if _async_session_factory is None:
+        from sqlalchemy.ext.asyncio import AsyncSession
+
+        _async_session_factory = sessionmaker(
+            bind=make_async_engine(os.getenv("ASYNC_DATABASE_URL", SQLALCHEMY_DATABASE_URL)),
+            class_=AsyncSession,
+            autoflush=False,
+            expire_on_commit=False,
+        )
+    return _async_session_factory
+
+
+async def dispose_async_engine():
+    if _async_session_factory is not None:
+        await _async_session_factory.kw["bind"].dispose()
+
+
+Base = declarative_base()
@@ -1,54 +1,366 @@
-import cv2
 import numpy as np
-import tensorflow as tf
-from typing import Dict, List, Tuple
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
 import os
+import threading
+import time
+from instrumentation import face_detections, stage
+
+# OpenCV and TensorFlow are imported on first use, so processes that never
+# analyze a frame (and plain imports of this module) don't pay for them.
+
+# Emotion model file(s), comma-separated, run by inference_backends;
+# without one, predictions are placeholders
+MODEL_PATH = os.getenv("EMOTION_MODEL_PATH") or None
+
+# A face crop within this mean absolute pixel difference (0-1 scale) of the
+# last inferred one reuses its scores, for up to CROP_REUSE_MAX_AGE seconds
+CROP_REUSE_MAX_DIFF = float(os.getenv("CROP_REUSE_MAX_DIFF", "0.02"))
+CROP_REUSE_MAX_AGE = float(os.getenv("CROP_REUSE_MAX_AGE", "6"))
+
+EMOTIONS = ['angry', 'disgust', 'fear', 'happy', 'sad', 'surprise', 'neutral']
+
+# Insight name -> (emotions summed, (medium, high) thresholds, band labels)
+INSIGHTS = {
+    # Confidence is based on 'happy' and 'neutral' emotions
+    'confidence': (('happy', 'neutral'), (0.4, 0.7), ('neutral', 'medium', 'high')),
+    # Anxiety is based on 'fear' and 'sad' emotions
+    'anxiety': (('fear', 'sad'), (0.3, 0.6), ('low', 'medium', 'high')),
+    # Nervousness is based on 'surprise' and 'fear' emotions
+    'nervousness': (('surprise', 'fear'), (0.3, 0.6), ('low', 'medium', 'high')),
+}
+
+def insight_scores(scores: np.ndarray) -> Dict[str, np.ndarray]:
+    """Composite insight scores for an (N, 7) array of emotion scores."""
+    scores = np.asarray(scores, dtype=np.float64).reshape(-1, len(EMOTIONS))
+    return {
+        name: scores[:, [EMOTIONS.index(emotion) for emotion in components]].sum(axis=1)
+        for name, (components, _, _) in INSIGHTS.items()
+    }
+
+def insight_levels(scores: np.ndarray) -> Dict[str, np.ndarray]:
+    """Band index per row for each insight: 0 (low), 1 (medium) or 2 (high)."""
+    levels = {}
+    for name, composite in insight_scores(scores).items():
+        medium, high = INSIGHTS[name][1]
+        levels[name] = (composite > medium).astype(np.int8) + (composite > high)
+    return levels
+
+def emotional_insights_batch(scores: np.ndarray) -> Dict[str, np.ndarray]:
+    """Vectorized get_emotional_insights: one array of band labels per insight."""
+    return {
+        name: np.asarray(INSIGHTS[name][2])[levels]
+        for name, levels in insight_levels(scores).items()
+    }
+
+FaceBox = Tuple[int, int, int, int]
+
+def box_iou(a: FaceBox, b: FaceBox) -> float:
+    """Intersection over union of two (x, y, w, h) boxes."""
+    w = min(a[0] + a[2], b[0] + b[2]) - max(a[0], b[0])
+    h = min(a[1] + a[3], b[1] + b[3]) - max(a[1], b[1])
+    if w <= 0 or h <= 0:
+        return 0.0
+    inter = w * h
+    return inter / (a[2] * a[3] + b[2] * b[3] - inter)
+
+class CropCache:
+    """The last inferred face crop of one session and its scores.
+
+    A new normalized crop whose mean absolute pixel difference from the
+    cached crop is at most ``max_diff`` reuses the cached scores, as long as
+    they are no older than ``max_age`` seconds. Crops are compared with the
+    crop that was actually inferred rather than the previous frame, so a
+    slow drift can't keep extending a reuse. ``max_diff=0`` turns reuse off.
+    ``clock`` lets a recorded clip be replayed on its own timestamps.
+    """
+
+    def __init__(
+        self,
+        max_diff: float = CROP_REUSE_MAX_DIFF,
+        max_age: float = CROP_REUSE_MAX_AGE,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_diff = max_diff
+        self.max_age = max_age
+        self.clock = clock
+        self.crop: Optional[np.ndarray] = None
+        self.scores: Optional[Dict[str, float]] = None
+        self.stored_at = 0.0
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, face: np.ndarray) -> Optional[Dict[str, float]]:
+        """Cached scores for a crop close enough to the cached one, else None."""
+        if (
+            self.crop is None
+            or self.max_diff <= 0
+            or self.crop.shape != face.shape
+            or self.clock() - self.stored_at > self.max_age
+            or float(np.abs(face - self.crop).mean()) > self.max_diff
+        ):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return dict(self.scores)
+
+    def store(self, face: np.ndarray, scores: Dict[str, float]):
+        if 'error' in scores:
+            return
+        self.crop = face
+        self.scores = dict(scores)
+        self.stored_at = self.clock()
+
+    def clear(self):
+        self.crop = None
+        self.scores = None
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            'reused': self.hits,
+            'inferred': self.misses,
+            'reuse_rate': self.hits / total if total else 0.0,
+        }
+
+class FaceTracker:
+    """Per-session face tracking state.
+
+    Keeps the last face box so the next frame only has to be searched in a
+    padded region around it. A full (downscaled) detection runs every
+    ``redetect_interval`` frames, or as soon as the tracked region no longer
+    contains a face.
+
+    A new box overlapping the previous one by at least ``stable_iou`` is
+    treated as detector jitter and the previous box is kept. A still face
+    then yields the same crop frame after frame, which is what lets the
+    session's ``CropCache`` skip inference for near-identical crops.
+    ``stable_iou=1`` turns this off.
+    """
+
+    def __init__(
+        self,
+        redetect_interval: int = 10,
+        padding: float = 0.25,
+        detection_scale: float = 0.5,
+        stable_iou: float = 0.8,
+        crop_cache: Optional[CropCache] = None,
+    ):
+        if not 0 < detection_scale <= 1:
+            raise ValueError("detection_scale must be in (0, 1]")
+        self.redetect_interval = redetect_interval
+        self.padding = padding
+        self.detection_scale = detection_scale
+        self.stable_iou = stable_iou
+        self.box: Optional[FaceBox] = None
+        self.frames_since_detection = 0
+        self.tracked_hits = 0
+        self.tracked_misses = 0
+        self.full_detections = 0
+        self.crop_cache = crop_cache or CropCache()
+
+    def reset(self):
+        self.box = None
+        self.frames_since_detection = 0
+
+    def settle(self, box: Optional[FaceBox]) -> Optional[FaceBox]:
+        """The previous box if ``box`` barely moved from it, otherwise ``box``."""
+        if box is not None and self.box is not None and box_iou(box, self.box) >= self.stable_iou:
+            return self.box
+        return box
+
+    def stats(self) -> Dict[str, float]:
+        total = self.tracked_hits + self.full_detections
+        return {
+            'tracked_hits': self.tracked_hits,
+            'tracked_misses': self.tracked_misses,
+            'full_detections': self.full_detections,
+            'tracked_hit_rate': self.tracked_hits / total if total else 0.0,
+            **self.crop_cache.stats(),
+        }
 
 class EmotionAnalyzer:
-    def __init__(self):
-        # Load the pre-trained model
-        self.model = self._load_model()
-        self.face_cascade = cv2.CascadeClassifier(
-            cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
-        )
-        self.emotions = ['angry', 'disgust', 'fear', 'happy', 'sad', 'surprise', 'neutral']
-        
+    def __init__(self, model_path: Optional[str] = MODEL_PATH):
+        # The cascade and model are loaded by load(), on first use at the latest
+        self.model_path = model_path
+        self.model = None
+        self._face_cascade = None
+        self._loaded = False
+        self._load_lock = threading.Lock()
+        self.emotions = list(EMOTIONS)
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    @property
+    def face_cascade(self):
+        if not self._loaded:
+            self.load()
+        return self._face_cascade
+
+    def load(self):
+        """Load the face cascade and the emotion model; safe to call more than once."""
+        with self._load_lock:
+            if self._loaded:
+                return
+            import cv2
+
+            self._face_cascade = cv2.CascadeClassifier(
+                cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
+            )
+            # A model assigned before loading (e.g. a stand-in) is kept
+            if self.model is None:
+                self.model = self._load_model()
+            self._loaded = True
+
     def _load_model(self):
-        # TODO: Load your trained emotion detection model
-        # For now, we'll use a placeholder
-        return None
+        if self.model_path is None:
+            # TODO: Ship a trained emotion detection model
+            # For now, we'll use a placeholder
+            return None
+        import inference_backends
+
+        return inference_backends.load_backend(self.model_path)
+
+    def warm_up(self) -> float:
+        """Load everything and run one detection and one inference; returns the seconds taken.
+
+        The first real frame then doesn't pay for loading, graph tracing or
+        allocator warm-up.
+        """
+        start = time.perf_counter()
+        self.load()
+        self.detect_face(np.zeros((96, 96), dtype=np.uint8))
+        self.predict_batch(np.zeros((1, 48, 48, 1), dtype=np.float32))
+        return time.perf_counter() - start
+
+    def _detect_full(self, gray: np.ndarray, scale: float = 1.0) -> Optional[FaceBox]:
+        """Run the cascade over the whole frame, optionally on a downscaled copy."""
+        import cv2
+
+        if scale < 1.0:
+            small = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        else:
+            small = gray
+        min_side = max(1, int(round(30 * scale)))
 
-    def preprocess_image(self, image: np.ndarray) -> np.ndarray:
+        faces = self.face_cascade.detectMultiScale(
+            small, scaleFactor=1.1, minNeighbors=5, minSize=(min_side, min_side)
+        )
+
+        if len(faces) == 0:
+            return None
+
+        # Map the first face back to full resolution
+        (x, y, w, h) = faces[0]
+        return (
+            int(round(x / scale)), int(round(y / scale)),
+            int(round(w / scale)), int(round(h / scale)),
+        )
+
+    def _detect_in_region(self, gray: np.ndarray, box: FaceBox, padding: float) -> Optional[FaceBox]:
+        """Search for a face only in a padded region around the previous box."""
+        (x, y, w, h) = box
+        pad_x, pad_y = int(w * padding), int(h * padding)
+        x0, y0 = max(0, x - pad_x), max(0, y - pad_y)
+        x1, y1 = min(gray.shape[1], x + w + pad_x), min(gray.shape[0], y + h + pad_y)
+
+        region = gray[y0:y1, x0:x1]
+        min_side = max(30, int(min(w, h) * 0.5))
+        if region.shape[0] < min_side or region.shape[1] < min_side:
+            return None
+
+        faces = self.face_cascade.detectMultiScale(
+            region, scaleFactor=1.1, minNeighbors=5, minSize=(min_side, min_side)
+        )
+
+        if len(faces) == 0:
+            return None
+
+        (fx, fy, fw, fh) = max(faces, key=lambda f: f[2] * f[3])
+        return (x0 + int(fx), y0 + int(fy), int(fw), int(fh))
+
+    def detect_face(self, gray: np.ndarray, tracker: Optional[FaceTracker] = None) -> Optional[FaceBox]:
+        """Locate the face in a grayscale frame, using the tracker when one is given."""
+        with stage('face_detection'):
+            return self._detect_face(gray, tracker)
+
+    def _detect_face(self, gray: np.ndarray, tracker: Optional[FaceTracker]) -> Optional[FaceBox]:
+        if tracker is None:
+            return self._detect_full(gray)
+
+        if tracker.box is not None and tracker.frames_since_detection < tracker.redetect_interval:
+            box = self._detect_in_region(gray, tracker.box, tracker.padding)
+            if box is not None:
+                box = tracker.box = tracker.settle(box)
+                tracker.frames_since_detection += 1
+                tracker.tracked_hits += 1
+                face_detections.inc('tracked')
+                return box
+            tracker.tracked_misses += 1
+            face_detections.inc('lost')
+
+        box = tracker.box = tracker.settle(self._detect_full(gray, tracker.detection_scale))
+        tracker.frames_since_detection = 0
+        tracker.full_detections += 1
+        face_detections.inc('full')
+        return box
+
+    def preprocess_image(self, image: np.ndarray, tracker: Optional[FaceTracker] = None) -> np.ndarray:
         """Preprocess the image for emotion detection."""
+        import cv2
+
         # Convert to grayscale
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        with stage('grayscale'):
+            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
         
         # Detect faces
-        faces = self.face_cascade.detectMultiScale(
-            gray, scaleFactor=1.1, minNeighbors=5, minSize=(30, 30)
-        )
+        box = self.detect_face(gray, tracker)
         
-        if len(faces) == 0:
+        if box is None:
             return None
             
-        # Get the first face
-        (x, y, w, h) = faces[0]
+        (x, y, w, h) = box
         face = gray[y:y+h, x:x+w]
         
-        # Resize to 48x48
-        face = cv2.resize(face, (48, 48))
-        
-        # Normalize
-        face = face.astype('float32') / 255.0
-        
-        # Reshape for model input
-        face = np.expand_dims(face, axis=[0, -1])
+        with stage('resize'):
+            # Resize to 48x48
+            face = cv2.resize(face, (48, 48))
+
+            # Normalize
+            face = face.astype('float32') / 255.0
+
+            # Reshape for model input
+            face = np.expand_dims(face, axis=[0, -1])
         
         return face
 
-    def analyze_emotion(self, frame: np.ndarray) -> Dict[str, float]:
+    def predict_batch(self, faces: np.ndarray) -> np.ndarray:
+        """Run the model on a stacked (N, 48, 48, 1) batch and return (N, 7) scores."""
+        with stage('inference'):
+            return self._predict(faces)
+
+    def _predict(self, faces: np.ndarray) -> np.ndarray:
+        if not self._loaded:
+            self.load()
+        if self.model is not None:
+            return np.asarray(self.model.predict(faces), dtype=np.float32)
+
+        # TODO: Replace with actual model prediction
+        # For now, return dummy predictions
+        predictions = np.random.rand(len(faces), len(self.emotions)).astype(np.float32)
+        return predictions / predictions.sum(axis=1, keepdims=True)
+
+    def scores_to_dict(self, scores: np.ndarray) -> Dict[str, float]:
+        """Map a single row of model scores to emotion labels."""
+        return {
+            emotion: float(score)
+            for emotion, score in zip(self.emotions, scores)
+        }
+
+    def analyze_emotion(self, frame: np.ndarray, tracker: Optional[FaceTracker] = None) -> Dict[str, float]:
         """Analyze emotions in the given frame."""
-        processed_image = self.preprocess_image(frame)
+        processed_image = self.preprocess_image(frame, tracker)
         
         if processed_image is None:
             return {
@@ -56,49 +368,64 @@ class EmotionAnalyzer:
                 'confidence': 0.0
             }
             
-        # TODO: Replace with actual model prediction
-        # For now, return dummy predictions
-        predictions = np.random.rand(7)
-        predictions = predictions / np.sum(predictions)
-        
-        return {
-            emotion: float(score)
-            for emotion, score in zip(self.emotions, predictions)
-        }
+        return self.scores_to_dict(self.predict_batch(processed_image)[0])
+
+    def analyze_emotion_reusing(
+        self, frame: np.ndarray, tracker: Optional[FaceTracker] = None
+    ) -> Tuple[Dict[str, float], bool]:
+        """analyze_emotion that reuses the tracker's cached scores for a near-identical crop.
+
+        Returns the scores and whether they were reused.
+        """
+        processed_image = self.preprocess_image(frame, tracker)
+
+        if processed_image is None:
+            return {'error': 'No face detected', 'confidence': 0.0}, False
+
+        if tracker is not None:
+            cached = tracker.crop_cache.lookup(processed_image)
+            if cached is not None:
+                return cached, True
+
+        emotions = self.scores_to_dict(self.predict_batch(processed_image)[0])
+        if tracker is not None:
+            tracker.crop_cache.store(processed_image, emotions)
+        return emotions, False
+
+    def analyze_batch(self, frames: List[np.ndarray]) -> List[Dict[str, float]]:
+        """Analyze several frames with a single model call."""
+        results: List[Dict[str, float]] = [
+            {'error': 'No face detected', 'confidence': 0.0} for _ in frames
+        ]
+        faces = []
+        indices = []
+        for i, frame in enumerate(frames):
+            processed_image = self.preprocess_image(frame)
+            if processed_image is not None:
+                faces.append(processed_image)
+                indices.append(i)
+
+        if not faces:
+            return results
+
+        predictions = self.predict_batch(np.concatenate(faces, axis=0))
+        for i, scores in zip(indices, predictions):
+            results[i] = self.scores_to_dict(scores)
+        return results
 
     def get_emotional_insights(self, emotions: Dict[str, float]) -> Dict[str, str]:
         """Generate insights based on emotional analysis."""
-        insights = {
-            'confidence': 'neutral',
-            'anxiety': 'low',
-            'nervousness': 'low'
-        }
-        
-        # Calculate confidence based on 'happy' and 'neutral' emotions
-        confidence_score = emotions.get('happy', 0) + emotions.get('neutral', 0)
-        if confidence_score > 0.7:
-            insights['confidence'] = 'high'
-        elif confidence_score > 0.4:
-            insights['confidence'] = 'medium'
-            
-        # Calculate anxiety based on 'fear' and 'sad' emotions
-        anxiety_score = emotions.get('fear', 0) + emotions.get('sad', 0)
-        if anxiety_score > 0.6:
-            insights['anxiety'] = 'high'
-        elif anxiety_score > 0.3:
-            insights['anxiety'] = 'medium'
-            
-        # Calculate nervousness based on 'surprise' and 'fear' emotions
-        nervousness_score = emotions.get('surprise', 0) + emotions.get('fear', 0)
-        if nervousness_score > 0.6:
-            insights['nervousness'] = 'high'
-        elif nervousness_score > 0.3:
-            insights['nervousness'] = 'medium'
-            
-        return insights
+        with stage('insights'):
+            row = np.array([[emotions.get(emotion, 0) for emotion in self.emotions]], dtype=np.float64)
+            return {
+                name: str(labels[0])
+                for name, labels in emotional_insights_batch(row).items()
+            }
 
     def analyze_video_stream(self, video_source: int = 0) -> Tuple[Dict[str, float], Dict[str, str]]:
         """Analyze emotions from a video stream."""
+        import cv2
+
         cap = cv2.VideoCapture(video_source)
         
         if not cap.isOpened():
@@ -115,4 +442,42 @@ class EmotionAnalyzer:
             return emotions, insights
             
         finally:
-            cap.release() 
\ No newline at end of file
+            cap.release()
+
+    def stream_video(
+        self,
+        video_source: Union[int, str] = 0,
+        target_fps: Optional[float] = None,
+        max_queue: int = 32,
+        batch_size: int = 8,
+        tracker: Optional[FaceTracker] = None,
+    ) -> Iterator[Dict]:
+        """Continuously analyze a camera, network stream or recorded file.
+
+        Frames are decoded on a background thread and analyzed in small
+        batches; each analyzed frame yields a timestamped record.
+        """
+        from video_stream import FrameReader
+
+        tracker = tracker or FaceTracker()
+        with FrameReader(video_source, target_fps=target_fps, max_queue=max_queue) as reader:
+            while True:
+                batch = reader.get_batch(batch_size)
+                if not batch:
+                    return
+
+                faces = [self.preprocess_image(frame, tracker) for _, _, frame in batch]
+                detected = [face for face in faces if face is not None]
+                predictions = iter(self.predict_batch(np.concatenate(detected, axis=0)) if detected else [])
+
+                for (timestamp, frame_index, _), face in zip(batch, faces):
+                    if face is None:
+                        emotions = {'error': 'No face detected', 'confidence': 0.0}
+                    else:
+                        emotions = self.scores_to_dict(next(predictions))
+                    yield {
+                        'timestamp': timestamp,
+                        'frame_index': frame_index,
+                        'emotions': emotions,
+                        'insights': self.get_emotional_insights(emotions),
+                    }
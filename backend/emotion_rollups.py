@@ -0,0 +1,221 @@
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+import emotion_store
+import models
+from emotion_analysis import EMOTIONS, INSIGHTS, insight_levels
+
+# Fixed-width score histogram bins over [0, 1]; percentiles are read from these
+HISTOGRAM_BINS = 50
+# Reports read minute and question windows; finer views come from the packed chunks
+GRANULARITIES = ('minute', 'question')
+PERCENTILES = (50, 90, 95)
+
+# Keep IN (...) lists under SQLite's bound-parameter limit
+KEY_BATCH_SIZE = 500
+
+
+class RollupStats:
+    """Mergeable aggregate of the emotion samples that fall into one window."""
+
+    def __init__(
+        self,
+        count: int = 0,
+        sums: Optional[np.ndarray] = None,
+        maxima: Optional[np.ndarray] = None,
+        histogram: Optional[np.ndarray] = None,
+        bands: Optional[np.ndarray] = None,
+    ):
+        self.count = int(count)
+        self.sums = np.zeros(len(EMOTIONS), dtype='<f8') if sums is None else sums
+        self.maxima = np.zeros(len(EMOTIONS), dtype='<f4') if maxima is None else maxima
+        self.histogram = (
+            np.zeros((len(EMOTIONS), HISTOGRAM_BINS), dtype='<i4') if histogram is None else histogram
+        )
+        self.bands = np.zeros((len(INSIGHTS), 3), dtype='<i4') if bands is None else bands
+
+    def merge(self, other: "RollupStats") -> "RollupStats":
+        self.count += other.count
+        self.sums = self.sums + other.sums
+        self.maxima = np.maximum(self.maxima, other.maxima)
+        self.histogram = self.histogram + other.histogram
+        self.bands = self.bands + other.bands
+        return self
+
+    @classmethod
+    def from_row(cls, row: models.EmotionRollup) -> "RollupStats":
+        return cls(
+            count=row.sample_count,
+            sums=np.frombuffer(row.sums, dtype='<f8').copy(),
+            maxima=np.frombuffer(row.maxima, dtype='<f4').copy(),
+            histogram=np.frombuffer(row.histogram, dtype='<i4').reshape(len(EMOTIONS), HISTOGRAM_BINS).copy(),
+            bands=np.frombuffer(row.bands, dtype='<i4').reshape(len(INSIGHTS), 3).copy(),
+        )
+
+    def to_columns(self) -> Dict[str, object]:
+        return {
+            'sample_count': self.count,
+            'sums': self.sums.astype('<f8').tobytes(),
+            'maxima': self.maxima.astype('<f4').tobytes(),
+            'histogram': self.histogram.astype('<i4').tobytes(),
+            'bands': self.bands.astype('<i4').tobytes(),
+        }
+
+    def percentile(self, q: float) -> np.ndarray:
+        """Approximate per-emotion percentile, interpolated inside histogram bins."""
+        if self.count == 0:
+            return np.zeros(len(EMOTIONS))
+        cumulative = np.cumsum(self.histogram, axis=1)
+        target = q / 100.0 * self.count
+        bins = np.minimum((cumulative < target).sum(axis=1), HISTOGRAM_BINS - 1)
+        rows = np.arange(len(EMOTIONS))
+        below = np.where(bins > 0, cumulative[rows, np.maximum(bins - 1, 0)], 0)
+        in_bin = np.maximum(self.histogram[rows, bins], 1)
+        fraction = np.clip((target - below) / in_bin, 0.0, 1.0)
+        return (bins + fraction) / HISTOGRAM_BINS
+
+    def summary(self) -> Dict[str, object]:
+        if self.count == 0:
+            return {'samples': 0}
+        mean = self.sums / self.count
+        result = {
+            'samples': self.count,
+            'mean': dict(zip(EMOTIONS, np.round(mean, 4).tolist())),
+            'max': dict(zip(EMOTIONS, np.round(self.maxima, 4).tolist())),
+        }
+        for q in PERCENTILES:
+            result[f'p{q}'] = dict(zip(EMOTIONS, np.round(self.percentile(q), 4).tolist()))
+
+        result['insights'] = {}
+        for i, (name, (components, _, labels)) in enumerate(INSIGHTS.items()):
+            result['insights'][name] = {
+                'mean': round(float(sum(mean[EMOTIONS.index(emotion)] for emotion in components)), 4),
+                'bands': {label: round(int(n) / self.count, 4) for label, n in zip(labels, self.bands[i])},
+            }
+        return result
+
+
+def aggregate(keys: np.ndarray, scores: np.ndarray) -> Tuple[np.ndarray, List[RollupStats]]:
+    """Group (N, 7) scores by window key and build one RollupStats per window."""
+    unique, inverse = np.unique(keys, return_inverse=True)
+    groups = len(unique)
+    columns = np.arange(len(EMOTIONS))
+
+    counts = np.bincount(inverse, minlength=groups)
+    sums = np.zeros((groups, len(EMOTIONS)), dtype='<f8')
+    np.add.at(sums, inverse, scores)
+    maxima = np.zeros((groups, len(EMOTIONS)), dtype='<f4')
+    np.maximum.at(maxima, inverse, scores)
+
+    bins = np.clip((scores * HISTOGRAM_BINS).astype(np.int64), 0, HISTOGRAM_BINS - 1)
+    histogram = np.zeros((groups, len(EMOTIONS), HISTOGRAM_BINS), dtype='<i4')
+    np.add.at(histogram, (inverse[:, None], columns[None, :], bins), 1)
+
+    bands = np.zeros((groups, len(INSIGHTS), 3), dtype='<i4')
+    for i, levels in enumerate(insight_levels(scores).values()):
+        np.add.at(bands, (inverse, i, levels), 1)
+
+    return unique, [
+        RollupStats(counts[g], sums[g], maxima[g], histogram[g], bands[g]) for g in range(groups)
+    ]
+
+
+def _question_starts(db: Session, interview_id: int) -> Tuple[np.ndarray, np.ndarray, Dict[int, object]]:
+    questions = (
+        db.query(models.Question.id, models.Question.created_at)
+        .filter(models.Question.interview_id == interview_id, models.Question.created_at.isnot(None))
+        .order_by(models.Question.created_at, models.Question.id)
+        .all()
+    )
+    ids = np.array([q.id for q in questions], dtype=np.int64)
+    starts = np.array([emotion_store.to_epoch(q.created_at) for q in questions], dtype=np.float64)
+    return ids, starts, {q.id: q.created_at for q in questions}
+
+
+def window_keys(
+    db: Session, interview_id: int, timestamps: np.ndarray
+) -> Iterator[Tuple[str, np.ndarray, np.ndarray, object]]:
+    """Yield (granularity, sample mask, window keys, window start lookup)."""
+    everything = np.ones(len(timestamps), dtype=bool)
+    from_epoch = emotion_store.from_epoch
+    yield 'minute', everything, np.floor(timestamps / 60).astype(np.int64), lambda key: from_epoch(key * 60)
+
+    # A sample belongs to the most recent question asked before it
+    ids, starts, created = _question_starts(db, interview_id)
+    if len(ids):
+        index = np.searchsorted(starts, timestamps, side='right') - 1
+        mask = index >= 0
+        yield 'question', mask, ids[index[mask]], created.get
+
+
+def update_rollups(db: Session, interview_id: int, timestamps: np.ndarray, scores: np.ndarray):
+    """Fold new samples into the stored window rollups. The caller commits."""
+    if len(timestamps) == 0:
+        return
+    table = models.EmotionRollup
+
+    for granularity, mask, keys, window_start in window_keys(db, interview_id, timestamps):
+        if not mask.any():
+            continue
+        unique, stats = aggregate(keys, scores[mask])
+        unique = unique.tolist()
+
+        existing = {}
+        for start in range(0, len(unique), KEY_BATCH_SIZE):
+            rows = (
+                db.query(table)
+                .filter(
+                    table.interview_id == interview_id,
+                    table.granularity == granularity,
+                    table.window_key.in_(unique[start:start + KEY_BATCH_SIZE]),
+                )
+                .all()
+            )
+            existing.update({row.window_key: row for row in rows})
+
+        inserts = []
+        for key, stat in zip(unique, stats):
+            row = existing.get(key)
+            if row is not None:
+                for column, value in RollupStats.from_row(row).merge(stat).to_columns().items():
+                    setattr(row, column, value)
+            else:
+                inserts.append({
+                    'interview_id': interview_id,
+                    'granularity': granularity,
+                    'window_key': key,
+                    'window_start': window_start(key),
+                    **stat.to_columns(),
+                })
+        if inserts:
+            db.execute(table.__table__.insert(), inserts)
+
+
+def backfill_rollups(db: Session, interview_id: int) -> bool:
+    """Roll up an interview saved before rollups existed; returns whether any samples were found.
+
+    Only call this for an interview without rollups. Samples that are
+    only in ``emotion_data`` are packed into chunks first, and an
+    interview with no samples writes nothing.
+    """
+    timestamps, scores = emotion_store.load_emotion_series(db, interview_id)
+    if not len(timestamps):
+        return False
+    update_rollups(db, interview_id, timestamps, scores)
+    db.commit()
+    return True
+
+
+def load_rollups(db: Session, interview_id: int, granularity: str) -> List[Tuple[models.EmotionRollup, RollupStats]]:
+    rows = (
+        db.query(models.EmotionRollup)
+        .filter(
+            models.EmotionRollup.interview_id == interview_id,
+            models.EmotionRollup.granularity == granularity,
+        )
+        .order_by(models.EmotionRollup.window_start, models.EmotionRollup.window_key)
+        .all()
+    )
+    return [(row, RollupStats.from_row(row)) for row in rows]
@@ -0,0 +1,125 @@
+import importlib.util
+import json
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from emotion_analysis import EMOTIONS
+
+JSON = 'application/json'
+MSGPACK = 'application/msgpack'
+ARROW = 'application/vnd.apache.arrow.stream'
+
+# Accept header media type -> format served; x-msgpack is the older, still common spelling
+MEDIA_TYPES = {JSON: JSON, MSGPACK: MSGPACK, 'application/x-msgpack': MSGPACK, ARROW: ARROW}
+# Formats needing an optional package are only offered when it is installed
+REQUIRED_MODULES = {MSGPACK: 'msgpack', ARROW: 'pyarrow'}
+AVAILABLE = tuple(
+    media_type for media_type in (JSON, MSGPACK, ARROW)
+    if media_type not in REQUIRED_MODULES or importlib.util.find_spec(REQUIRED_MODULES[media_type]) is not None
+)
+# orjson writes numpy arrays directly; without it the stdlib encoder gets Python floats
+HAS_ORJSON = importlib.util.find_spec('orjson') is not None
+
+# Enough for float32 scores in 0-1, and keeps them from printing as long float64 reprs
+SCORE_DECIMALS = 6
+
+
+def _parse_accept(accept: str) -> List[str]:
+    """Media types with a non-zero q, best first; ties keep the client's order."""
+    entries = []
+    for index, part in enumerate(accept.split(',')):
+        media_type, *params = (p.strip() for p in part.split(';'))
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if media_type and q > 0:
+            entries.append((-q, index, media_type.lower()))
+    return [media_type for _, _, media_type in sorted(entries)]
+
+
+def negotiate(accept: Optional[str]) -> Optional[str]:
+    """Pick the format to serve for an Accept header; None when nothing acceptable is available.
+
+    JSON is served when the header is missing or only has wildcards.
+    """
+    if not accept:
+        return JSON
+    for media_type in _parse_accept(accept):
+        if media_type in ('*/*', 'application/*'):
+            return JSON
+        served = MEDIA_TYPES.get(media_type)
+        if served in AVAILABLE:
+            return served
+    return None
+
+
+def columns(scores: np.ndarray) -> Dict[str, np.ndarray]:
+    """One contiguous float32 array per emotion, in ``EMOTIONS`` order."""
+    return {emotion: np.ascontiguousarray(scores[:, i]) for i, emotion in enumerate(EMOTIONS)}
+
+
+def encode_json(interview_id: int, timestamps: np.ndarray, scores: np.ndarray) -> bytes:
+    scores = np.round(scores, SCORE_DECIMALS)
+    if HAS_ORJSON:
+        import orjson
+
+        payload = {'interview_id': interview_id, 'count': len(timestamps), 'timestamps': timestamps,
+                   'scores': columns(scores)}
+        return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+    payload = {
+        'interview_id': interview_id,
+        'count': len(timestamps),
+        'timestamps': timestamps.tolist(),
+        'scores': {emotion: column.astype(np.float64).round(SCORE_DECIMALS).tolist()
+                   for emotion, column in columns(scores).items()},
+    }
+    return json.dumps(payload, separators=(',', ':')).encode()
+
+
+def encode_msgpack(interview_id: int, timestamps: np.ndarray, scores: np.ndarray) -> bytes:
+    import msgpack
+
+    # Scores go out as 32-bit floats; timestamps need all 64 bits
+    single, double = msgpack.Packer(use_single_float=True), msgpack.Packer()
+    return b''.join((
+        double.pack_map_header(4),
+        double.pack('interview_id'), double.pack(interview_id),
+        double.pack('count'), double.pack(len(timestamps)),
+        double.pack('timestamps'), double.pack(timestamps.tolist()),
+        double.pack('scores'), single.pack({emotion: column.tolist() for emotion, column in columns(scores).items()}),
+    ))
+
+
+def encode_arrow(interview_id: int, timestamps: np.ndarray, scores: np.ndarray) -> bytes:
+    import pyarrow as pa
+
+    micros = np.round(timestamps * 1_000_000).astype(np.int64)
+    arrays = [pa.array(micros, type=pa.timestamp('us', tz='UTC'))]
+    arrays += [pa.array(column, type=pa.float32()) for column in columns(scores).values()]
+    batch = pa.RecordBatch.from_arrays(arrays, names=['timestamp', *EMOTIONS])
+    batch = batch.replace_schema_metadata({'interview_id': str(interview_id)})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
+
+
+ENCODERS = {JSON: encode_json, MSGPACK: encode_msgpack, ARROW: encode_arrow}
+
+
+def encode(media_type: str, interview_id: int, series: Tuple[np.ndarray, np.ndarray]) -> bytes:
+    """Encode ``emotion_store.load_emotion_series`` output as one timestamp column plus one per emotion.
+
+    JSON and MessagePack send ``{interview_id, count, timestamps, scores}``
+    with Unix-second timestamps and ``scores`` keyed by emotion. Arrow sends
+    a single record batch with a UTC ``timestamp`` column and a float32
+    column per emotion.
+    """
+    timestamps, scores = series
+    return ENCODERS[media_type](interview_id, timestamps, scores)
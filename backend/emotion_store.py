@@ -0,0 +1,159 @@
+from datetime import datetime, timezone
+from typing import List, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+import emotion_rollups
+import models
+import schemas
+from emotion_analysis import EMOTIONS
+
+# Samples per packed EmotionChunk row
+CHUNK_SIZE = 512
+
+TIMESTAMP_DTYPE = np.dtype('<f8')
+SCORE_DTYPE = np.dtype('<f4')
+
+
+def to_utc_naive(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def to_epoch(value: datetime) -> float:
+    return to_utc_naive(value).replace(tzinfo=timezone.utc).timestamp()
+
+
+def from_epoch(value: float) -> datetime:
+    return datetime.fromtimestamp(float(value), tz=timezone.utc).replace(tzinfo=None)
+
+
+def has_scores(sample: schemas.EmotionSample) -> bool:
+    """A sample is stored only if it carries a numeric score for every emotion."""
+    return all(isinstance(sample.emotions.get(emotion), (int, float)) for emotion in EMOTIONS)
+
+
+def _empty_series() -> Tuple[np.ndarray, np.ndarray]:
+    return np.empty(0, dtype=TIMESTAMP_DTYPE), np.empty((0, len(EMOTIONS)), dtype=SCORE_DTYPE)
+
+
+def pack_chunk(interview_id: int, timestamps: np.ndarray, scores: np.ndarray) -> dict:
+    return {
+        'interview_id': interview_id,
+        'start_time': from_epoch(timestamps[0]),
+        'end_time': from_epoch(timestamps[-1]),
+        'sample_count': len(timestamps),
+        'timestamps': timestamps.astype(TIMESTAMP_DTYPE).tobytes(),
+        'scores': scores.astype(SCORE_DTYPE).tobytes(),
+    }
+
+
+def _chunks(interview_id: int, timestamps: np.ndarray, scores: np.ndarray) -> List[dict]:
+    return [
+        pack_chunk(interview_id, timestamps[start:start + CHUNK_SIZE], scores[start:start + CHUNK_SIZE])
+        for start in range(0, len(timestamps), CHUNK_SIZE)
+    ]
+
+
+def pack_legacy_rows(db: Session, interview_id: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Pack ``emotion_data`` rows into chunks for an interview that has none yet.
+
+    Samples saved before chunks existed are only in ``emotion_data``. This
+    inserts their chunks without committing and returns the packed series,
+    which is empty when the interview already has chunks or no usable rows.
+    """
+    if db.query(models.EmotionChunk.id).filter(models.EmotionChunk.interview_id == interview_id).first():
+        return _empty_series()
+    rows = (
+        db.query(models.EmotionData.timestamp, models.EmotionData.emotion_data)
+        .filter(models.EmotionData.interview_id == interview_id)
+        .order_by(models.EmotionData.timestamp, models.EmotionData.id)
+        .all()
+    )
+    rows = [
+        (timestamp, data) for timestamp, data in rows
+        if timestamp is not None and isinstance(data, dict)
+        and all(isinstance(data.get(emotion), (int, float)) for emotion in EMOTIONS)
+    ]
+    if not rows:
+        return _empty_series()
+    timestamps = np.fromiter((to_epoch(timestamp) for timestamp, _ in rows), dtype=TIMESTAMP_DTYPE, count=len(rows))
+    scores = np.array([[data[emotion] for emotion in EMOTIONS] for _, data in rows], dtype=SCORE_DTYPE)
+    db.execute(models.EmotionChunk.__table__.insert(), _chunks(interview_id, timestamps, scores))
+    return timestamps, scores
+
+
+def bulk_save_emotions(db: Session, interview_id: int, samples: List[schemas.EmotionSample]) -> int:
+    """Persist a batch of samples in one transaction and return how many were stored.
+
+    Rows go into ``emotion_data`` with a single executemany insert, and the
+    same samples are packed into float32 ``emotion_chunks`` of up to
+    ``CHUNK_SIZE`` samples for fast readback. Window rollups are updated in
+    the same transaction. Rows saved before chunks existed are packed first,
+    so they aren't hidden behind the new chunks.
+    """
+    samples = sorted((s for s in samples if has_scores(s)), key=lambda s: to_epoch(s.timestamp))
+    if not samples:
+        return 0
+
+    timestamps = np.fromiter((to_epoch(s.timestamp) for s in samples), dtype=TIMESTAMP_DTYPE, count=len(samples))
+    scores = np.array([[s.emotions[emotion] for emotion in EMOTIONS] for s in samples], dtype=SCORE_DTYPE)
+    confidences = scores.max(axis=1)
+
+    rows = [
+        {
+            'interview_id': interview_id,
+            'timestamp': to_utc_naive(sample.timestamp),
+            'emotion_data': {emotion: float(score) for emotion, score in zip(EMOTIONS, row)},
+            'confidence': float(sample.confidence if sample.confidence is not None else confidence),
+        }
+        for sample, row, confidence in zip(samples, scores, confidences)
+    ]
+    try:
+        legacy_timestamps, legacy_scores = pack_legacy_rows(db, interview_id)
+        if len(legacy_timestamps):
+            emotion_rollups.update_rollups(db, interview_id, legacy_timestamps, legacy_scores)
+        db.execute(models.EmotionData.__table__.insert(), rows)
+        db.execute(models.EmotionChunk.__table__.insert(), _chunks(interview_id, timestamps, scores))
+        emotion_rollups.update_rollups(db, interview_id, timestamps, scores)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return len(samples)
+
+
+def load_emotion_series(db: Session, interview_id: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Return an interview's ``(timestamps, scores)`` as float64 (N,) and float32 (N, 7) arrays.
+
+    An interview whose samples are only in ``emotion_data`` gets them
+    packed into chunks on its first read.
+    """
+    chunks = (
+        db.query(models.EmotionChunk.timestamps, models.EmotionChunk.scores)
+        .filter(models.EmotionChunk.interview_id == interview_id)
+        .order_by(models.EmotionChunk.start_time, models.EmotionChunk.id)
+        .all()
+    )
+    if not chunks:
+        try:
+            timestamps, scores = pack_legacy_rows(db, interview_id)
+            if len(timestamps):
+                db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        return timestamps, scores
+
+    timestamps = np.concatenate([np.frombuffer(chunk.timestamps, dtype=TIMESTAMP_DTYPE) for chunk in chunks])
+    scores = np.concatenate([
+        np.frombuffer(chunk.scores, dtype=SCORE_DTYPE).reshape(-1, len(EMOTIONS)) for chunk in chunks
+    ])
+
+    # Chunks saved by separate requests can overlap in time
+    if len(timestamps) > 1 and np.any(np.diff(timestamps) < 0):
+        order = np.argsort(timestamps, kind='stable')
+        timestamps, scores = timestamps[order], scores[order]
+    return timestamps, scores
@@ -0,0 +1,251 @@
+import abc
+import importlib.util
+import os
+import statistics
+import threading
+import time
+from typing import Dict, List, Sequence, Union
+
+import numpy as np
+
+DEFAULT_BACKEND = os.getenv("INFERENCE_BACKEND", "auto")
+DEFAULT_INTRA_OP_THREADS = int(os.getenv("INFERENCE_INTRA_OP_THREADS", "0"))
+DEFAULT_INTER_OP_THREADS = int(os.getenv("INFERENCE_INTER_OP_THREADS", "0"))
+# Largest allowed difference in any emotion probability between two backends
+DEFAULT_TOLERANCE = float(os.getenv("INFERENCE_TOLERANCE", "0.05"))
+
+BENCH_BATCH_SIZE = 8
+BENCH_REPEAT = 10
+FACE_SHAPE = (48, 48, 1)
+
+
+class BackendUnavailable(Exception):
+    """Raised when a backend's runtime isn't installed."""
+
+
+class InferenceBackend(abc.ABC):
+    """Runs an emotion model on a (N, 48, 48, 1) float32 batch and returns (N, 7) scores.
+
+    Runtimes are imported when a backend is created, so only the ones
+    actually used get loaded. Thread counts of 0 leave the runtime's own
+    default in place.
+    """
+
+    name = ''
+    runtime_module = ''
+
+    def __init__(self, path: str, intra_op_threads: int = 0, inter_op_threads: int = 0):
+        if importlib.util.find_spec(self.runtime_module) is None:
+            raise BackendUnavailable(f"{self.name} needs the '{self.runtime_module}' package")
+        self.path = path
+        self.intra_op_threads = intra_op_threads
+        self.inter_op_threads = inter_op_threads
+
+    @property
+    def label(self) -> str:
+        return f"{self.name}:{os.path.basename(self.path.rstrip(os.sep))}"
+
+    @abc.abstractmethod
+    def predict(self, faces: np.ndarray) -> np.ndarray:
+        """Scores for each face, one row per face in ``EMOTIONS`` order."""
+
+
+class TensorFlowBackend(InferenceBackend):
+    """Keras model (.keras, .h5 or a SavedModel directory) run through one traced tf.function."""
+
+    name = 'tensorflow'
+    runtime_module = 'tensorflow'
+
+    def __init__(self, path: str, intra_op_threads: int = 0, inter_op_threads: int = 0):
+        super().__init__(path, intra_op_threads, inter_op_threads)
+        import tensorflow as tf
+
+        try:
+            if intra_op_threads:
+                tf.config.threading.set_intra_op_parallelism_threads(intra_op_threads)
+            if inter_op_threads:
+                tf.config.threading.set_inter_op_parallelism_threads(inter_op_threads)
+        except RuntimeError:
+            # Only settable before TensorFlow initializes; keep whatever is in place
+            print("TensorFlow is already initialized, ignoring inference thread settings")
+        model = tf.keras.models.load_model(path, compile=False)
+        spec = tf.TensorSpec((None,) + tuple(model.input_shape[1:]), tf.float32)
+        self._call = tf.function(lambda faces: model(faces, training=False), input_signature=[spec])
+
+    def predict(self, faces: np.ndarray) -> np.ndarray:
+        return self._call(faces).numpy()
+
+
+class TFLiteBackend(InferenceBackend):
+    """TFLite flatbuffer, float or int8-quantized, via tflite_runtime when installed.
+
+    Full-integer models get their input quantized and their output
+    dequantized here, using the scale and zero point stored in the model.
+    """
+
+    name = 'tflite'
+    runtime_module = 'tflite_runtime' if importlib.util.find_spec('tflite_runtime') else 'tensorflow'
+
+    def __init__(self, path: str, intra_op_threads: int = 0, inter_op_threads: int = 0):
+        super().__init__(path, intra_op_threads, inter_op_threads)
+        if self.runtime_module == 'tflite_runtime':
+            from tflite_runtime.interpreter import Interpreter
+        else:
+            import tensorflow as tf
+
+            Interpreter = tf.lite.Interpreter
+        self._interpreter = Interpreter(model_path=path, num_threads=intra_op_threads or None)
+        self._interpreter.allocate_tensors()
+        self._input = self._interpreter.get_input_details()[0]
+        self._output = self._interpreter.get_output_details()[0]
+        self._batch_size = int(self._input['shape'][0])
+        # The interpreter holds per-call state, so calls are serialized
+        self._lock = threading.Lock()
+
+    @property
+    def quantized(self) -> bool:
+        return self._input['dtype'] in (np.int8, np.uint8)
+
+    def _resize(self, batch_size: int):
+        self._interpreter.resize_tensor_input(self._input['index'], (batch_size,) + FACE_SHAPE)
+        self._interpreter.allocate_tensors()
+        self._input = self._interpreter.get_input_details()[0]
+        self._output = self._interpreter.get_output_details()[0]
+        self._batch_size = batch_size
+
+    def predict(self, faces: np.ndarray) -> np.ndarray:
+        with self._lock:
+            if len(faces) != self._batch_size:
+                self._resize(len(faces))
+            if self.quantized:
+                scale, zero_point = self._input['quantization']
+                info = np.iinfo(self._input['dtype'])
+                faces = np.clip(np.round(faces / scale + zero_point), info.min, info.max)
+            self._interpreter.set_tensor(self._input['index'], faces.astype(self._input['dtype'], copy=False))
+            self._interpreter.invoke()
+            scores = self._interpreter.get_tensor(self._output['index'])
+        if self._output['dtype'] in (np.int8, np.uint8):
+            scale, zero_point = self._output['quantization']
+            scores = (scores.astype(np.float32) - zero_point) * scale
+        return scores.astype(np.float32, copy=False)
+
+
+class OnnxRuntimeBackend(InferenceBackend):
+    """ONNX model on the CPU execution provider; int8 (QDQ or dynamic) models run as-is."""
+
+    name = 'onnxruntime'
+    runtime_module = 'onnxruntime'
+
+    def __init__(self, path: str, intra_op_threads: int = 0, inter_op_threads: int = 0):
+        super().__init__(path, intra_op_threads, inter_op_threads)
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_threads:
+            options.intra_op_num_threads = intra_op_threads
+        if inter_op_threads:
+            # Inter-op threads only matter when independent nodes may run in parallel
+            options.execution_mode = ort.ExecutionMode.ORT_PARALLEL
+            options.inter_op_num_threads = inter_op_threads
+        self._session = ort.InferenceSession(path, sess_options=options, providers=['CPUExecutionProvider'])
+        self._input_name = self._session.get_inputs()[0].name
+
+    def predict(self, faces: np.ndarray) -> np.ndarray:
+        return self._session.run(None, {self._input_name: faces})[0].astype(np.float32, copy=False)
+
+
+BACKENDS = {
+    'tensorflow': TensorFlowBackend,
+    'tflite': TFLiteBackend,
+    'onnxruntime': OnnxRuntimeBackend,
+}
+
+
+def backend_for_path(path: str) -> str:
+    if path.endswith('.tflite'):
+        return 'tflite'
+    if path.endswith('.onnx'):
+        return 'onnxruntime'
+    return 'tensorflow'
+
+
+def sample_faces(batch_size: int = BENCH_BATCH_SIZE, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).random((batch_size,) + FACE_SHAPE, dtype=np.float32)
+
+
+def benchmark(backend: InferenceBackend, faces: np.ndarray, repeat: int = BENCH_REPEAT) -> float:
+    """Median seconds per ``predict`` call, after two warm-up calls."""
+    for _ in range(2):
+        backend.predict(faces)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        backend.predict(faces)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def max_difference(a: np.ndarray, b: np.ndarray) -> float:
+    return float(np.max(np.abs(np.asarray(a, dtype=np.float64) - np.asarray(b, dtype=np.float64))))
+
+
+def check_agreement(backends: Sequence[InferenceBackend], faces: np.ndarray) -> List[float]:
+    """Largest score difference of each backend from the first one, on the same faces.
+
+    Returns one value per backend, in the order given; the first is always 0.
+    """
+    reference = backends[0].predict(faces)
+    return [max_difference(reference, backend.predict(faces)) for backend in backends]
+
+
+def load_backend(
+    paths: Union[str, Sequence[str]],
+    backend: str = DEFAULT_BACKEND,
+    intra_op_threads: int = DEFAULT_INTRA_OP_THREADS,
+    inter_op_threads: int = DEFAULT_INTER_OP_THREADS,
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> InferenceBackend:
+    """Load the model at one of ``paths`` (a list or comma-separated string).
+
+    Each path is run by the backend its extension calls for. With
+    ``backend="auto"`` every path whose runtime is installed is loaded and
+    compared against the first one. Any that disagree by more than
+    ``tolerance`` are dropped, the rest are timed on a small batch, and the
+    fastest is kept. Otherwise the first path of the named backend is used.
+    List the float model first so that quantized copies are checked
+    against it.
+    """
+    if isinstance(paths, str):
+        paths = [p.strip() for p in paths.split(',') if p.strip()]
+    if backend != 'auto':
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown inference backend '{backend}', use auto or one of {', '.join(BACKENDS)}")
+        paths = [p for p in paths if backend_for_path(p) == backend]
+        if not paths:
+            raise ValueError(f"No model file for the {backend} backend")
+        return BACKENDS[backend](paths[0], intra_op_threads, inter_op_threads)
+
+    candidates: List[InferenceBackend] = []
+    for path in paths:
+        try:
+            candidates.append(BACKENDS[backend_for_path(path)](path, intra_op_threads, inter_op_threads))
+        except BackendUnavailable as e:
+            print(f"Skipping {path}: {e}")
+    if not candidates:
+        raise BackendUnavailable("No inference runtime is installed for any configured model")
+    if len(candidates) == 1:
+        return candidates[0]
+
+    faces = sample_faces()
+    differences = check_agreement(candidates, faces)
+    agreeing = [i for i, difference in enumerate(differences) if difference <= tolerance]
+    for i, candidate in enumerate(candidates):
+        if i not in agreeing:
+            print(f"Skipping {candidate.path}: scores differ from {candidates[0].path} "
+                  f"by {differences[i]:.4f} (tolerance {tolerance})")
+    timings: Dict[int, float] = {i: benchmark(candidates[i], faces) for i in agreeing}
+    chosen = candidates[min(agreeing, key=timings.__getitem__)]
+    summary = ', '.join(f"{candidates[i].name}:{candidates[i].path} {seconds * 1000:.2f}ms" for i, seconds in timings.items())
+    print(f"Inference backend: {chosen.label} (batch of {len(faces)}: {summary})")
+    return chosen
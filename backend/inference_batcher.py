@@ -0,0 +1,134 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from emotion_analysis import EmotionAnalyzer, FaceTracker
+
+DEFAULT_MAX_BATCH_SIZE = int(os.getenv("EMOTION_BATCH_SIZE", "32"))
+DEFAULT_MAX_WAIT_MS = float(os.getenv("EMOTION_BATCH_WAIT_MS", "10"))
+
+
+class InferenceBatcher:
+    """Collects preprocessed faces from concurrent callers into shared model batches.
+
+    Callers submit faces from any thread and get a ``Future`` back. A single
+    worker thread drains the queue, waiting at most ``max_wait_ms`` after the
+    first face arrives for more faces to fill a batch of ``max_batch_size``,
+    and then runs one ``predict_batch`` call for the whole batch.
+    """
+
+    def __init__(
+        self,
+        analyzer: EmotionAnalyzer,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        max_wait_ms: float = DEFAULT_MAX_WAIT_MS,
+    ):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.analyzer = analyzer
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: "queue.Queue[Optional[Tuple[np.ndarray, Future]]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.batches_run = 0
+        self.faces_processed = 0
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="emotion-batcher", daemon=True
+                )
+                self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout)
+
+    def submit_face(self, face: np.ndarray) -> Future:
+        """Queue a preprocessed face of shape (48, 48, 1) or (1, 48, 48, 1)."""
+        if face.ndim == 3:
+            face = face[np.newaxis]
+        future: Future = Future()
+        self.start()
+        self._queue.put((face, future))
+        return future
+
+    def submit_frame(self, frame: np.ndarray, tracker: Optional[FaceTracker] = None) -> Future:
+        """Preprocess a frame in the calling thread and queue the face for inference."""
+        face = self.analyzer.preprocess_image(frame, tracker)
+        if face is None:
+            future: Future = Future()
+            future.set_result({'error': 'No face detected', 'confidence': 0.0})
+            return future
+        return self.submit_face(face)
+
+    def analyze(
+        self,
+        frame: np.ndarray,
+        tracker: Optional[FaceTracker] = None,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, float]:
+        """Blocking convenience wrapper around ``submit_frame``."""
+        return self.submit_frame(frame, tracker).result(timeout)
+
+    def _collect(self, first: Tuple[np.ndarray, Future]) -> Tuple[List[Tuple[np.ndarray, Future]], bool]:
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch, stopping = self._collect(item)
+
+            # Skip callers that cancelled while waiting in the queue
+            batch = [(face, future) for face, future in batch if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            try:
+                predictions = self.analyzer.predict_batch(
+                    np.concatenate([face for face, _ in batch], axis=0)
+                )
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            self.batches_run += 1
+            self.faces_processed += len(batch)
+            for (_, future), scores in zip(batch, predictions):
+                future.set_result(self.analyzer.scores_to_dict(scores))
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            'batches_run': self.batches_run,
+            'faces_processed': self.faces_processed,
+            'average_batch_size': (
+                self.faces_processed / self.batches_run if self.batches_run else 0.0
+            ),
+            'queue_depth': self._queue.qsize(),
+        }
@@ -0,0 +1,304 @@
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextvars import ContextVar
+from typing import Deque, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "1000"))
+MAX_SLOW_TRACES = 100
+
+# Seconds; upper bounds of the histogram buckets, +Inf is implied
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Streamed responses (SSE, exports) stay open for seconds to hours
+STREAM_BUCKETS = (1.0, 5.0, 15.0, 60.0, 300.0, 900.0, 3600.0)
+
+# Starlette appends the charset to text/* media types
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+# (stage, seconds) entries recorded while serving the current request
+_trace: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("stage_trace", default=None)
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format(value: float) -> str:
+    return '+Inf' if value == float('inf') else repr(float(value))
+
+
+class Histogram:
+    """Fixed-bucket latency histogram with one series per label combination.
+
+    An observation is a bisect plus two increments under a lock, which is
+    cheap enough to run on every stage of every frame.
+    """
+
+    def __init__(self, name: str, help: str, labels: Sequence[str], buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> per-bucket counts (last one is +Inf) and the running sum
+        self._counts: Dict[Tuple[str, ...], List[int]] = {}
+        self._sums: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float, *label_values: str):
+        index = bisect_left(self.buckets, seconds)
+        with self._lock:
+            counts = self._counts.get(label_values)
+            if counts is None:
+                counts = self._counts[label_values] = [0] * (len(self.buckets) + 1)
+                self._sums[label_values] = 0.0
+            counts[index] += 1
+            self._sums[label_values] += seconds
+
+    def clear(self):
+        with self._lock:
+            self._counts.clear()
+            self._sums.clear()
+
+    def snapshot(self) -> Dict[Tuple[str, ...], Tuple[List[int], float]]:
+        with self._lock:
+            return {key: (list(counts), self._sums[key]) for key, counts in self._counts.items()}
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for label_values, (counts, total) in sorted(self.snapshot().items()):
+            labels = ','.join(f'{name}="{_escape(value)}"' for name, value in zip(self.labels, label_values))
+            prefix = labels + ',' if labels else ''
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{_format(bound)}"}} {cumulative}')
+            suffix = f"{{{labels}}}" if labels else ''
+            lines.append(f"{self.name}_sum{suffix} {_format(total)}")
+            lines.append(f"{self.name}_count{suffix} {cumulative}")
+        return lines
+
+
+class Counter:
+    """Monotonic counter with one series per label combination."""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str]):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple[str, ...], int] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def snapshot(self) -> Dict[Tuple[str, ...], int]:
+        with self._lock:
+            return dict(self._values)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for label_values, value in sorted(self.snapshot().items()):
+            labels = ','.join(f'{name}="{_escape(v)}"' for name, v in zip(self.labels, label_values))
+            lines.append(f"{self.name}{{{labels}}} {value}" if labels else f"{self.name} {value}")
+        return lines
+
+
+stage_seconds = Histogram(
+    "stage_duration_seconds", "Time spent in each processing stage.", ("stage",),
+)
+request_seconds = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route and status.", ("method", "route", "status"),
+)
+stream_seconds = Histogram(
+    "http_stream_duration_seconds", "Time streamed responses stayed open, by route.", ("method", "route", "status"),
+    buckets=STREAM_BUCKETS,
+)
+# full: whole-frame detection; tracked: face found near the last box; lost: tracked search came up empty
+face_detections = Counter(
+    "face_detections_total", "Face detection passes by kind, for tuning the redetect interval.", ("kind",),
+)
+_slow_traces: Deque[Dict] = deque(maxlen=MAX_SLOW_TRACES)
+
+logger = logging.getLogger(__name__)
+
+
+class _Stage:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class _NoStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_STAGE = _NoStage()
+
+
+def stage(name: str):
+    """Context manager timing one stage; a shared no-op when metrics are disabled."""
+    if not ENABLED:
+        return _NO_STAGE
+    return _Stage(name)
+
+
+def record(name: str, seconds: float):
+    """Record a stage duration measured elsewhere."""
+    if not ENABLED:
+        return
+    stage_seconds.observe(seconds, name)
+    trace = _trace.get()
+    if trace is not None:
+        trace.append((name, seconds))
+
+
+def set_enabled(enabled: bool):
+    global ENABLED
+    ENABLED = enabled
+
+
+def instrument_engines():
+    """Time every SQL statement as the ``db`` stage, for all engines (async ones included)."""
+    if not ENABLED or event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('query_start')
+    if starts:
+        record('db', time.perf_counter() - starts.pop())
+
+
+def summarize(trace: List[Tuple[str, float]]) -> Dict[str, float]:
+    """Milliseconds per stage in first-seen order, with repeated stages added up."""
+    totals: Dict[str, float] = {}
+    for name, seconds in trace:
+        totals[name] = totals.get(name, 0.0) + seconds * 1000
+    return {name: round(ms, 3) for name, ms in totals.items()}
+
+
+def slow_traces() -> List[Dict]:
+    return list(_slow_traces)
+
+
+def render() -> str:
+    lines = stage_seconds.render() + request_seconds.render() + stream_seconds.render() + face_detections.render()
+    return '\n'.join(lines) + '\n'
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing each HTTP request and collecting its stage trace.
+
+    Requests are labelled with their route template rather than the raw
+    path, so ids don't explode the number of series. Requests slower than
+    ``slow_request_ms`` log their per-stage breakdown and are kept in
+    ``slow_traces()``.
+
+    Streamed responses (server-sent events, or any body sent without a
+    Content-Length) are timed up to their first byte. How long they then
+    stay open goes to ``http_stream_duration_seconds`` instead.
+    """
+
+    def __init__(self, app, slow_request_ms: float = SLOW_REQUEST_MS):
+        self.app = app
+        self.slow_request = slow_request_ms / 1000.0
+        self._routes: Optional[Dict] = None
+
+    def _route(self, scope) -> str:
+        if self._routes is None and 'app' in scope:
+            self._routes = {
+                route.endpoint: route.path
+                for route in scope['app'].routes
+                if hasattr(route, 'endpoint')
+            }
+        return (self._routes or {}).get(scope.get('endpoint'), 'unmatched')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        first_byte: Optional[float] = None
+        streamed = False
+        trace: List[Tuple[str, float]] = []
+        token = _trace.set(trace)
+
+        async def send_wrapper(message):
+            nonlocal status, first_byte, streamed
+            if message['type'] == 'http.response.start':
+                status = message['status']
+                first_byte = time.perf_counter()
+                streamed = _is_streamed(message.get('headers', []))
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            end = time.perf_counter()
+            _trace.reset(token)
+            route = self._route(scope)
+            elapsed = end - start
+            if streamed:
+                elapsed = first_byte - start
+                stream_seconds.observe(end - first_byte, scope['method'], route, str(status))
+            request_seconds.observe(elapsed, scope['method'], route, str(status))
+            if elapsed >= self.slow_request:
+                entry = {
+                    'method': scope['method'],
+                    'path': scope['path'],
+                    'route': route,
+                    'status': status,
+                    'duration_ms': round(elapsed * 1000, 3),
+                    'stages_ms': summarize(trace),
+                    'at': time.time(),
+                }
+                _slow_traces.append(entry)
+                stages = ', '.join(f"{name}={ms:.1f}ms" for name, ms in entry['stages_ms'].items())
+                logger.warning("Slow request %s %s -> %s took %.1fms (%s)", entry['method'], entry['path'], status,
+                               entry['duration_ms'], stages or 'no stages recorded')
+
+
+def _is_streamed(headers: Sequence[Tuple[bytes, bytes]]) -> bool:
+    content_length = False
+    for name, value in headers:
+        name = name.lower()
+        if name == b'content-type' and value.lower().startswith(b'text/event-stream'):
+            return True
+        if name == b'content-length':
+            content_length = True
+    return not content_length
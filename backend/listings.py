@@ -0,0 +1,150 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, tuple_
+from sqlalchemy.orm import Session, selectinload
+
+import models
+import schemas
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+DEFAULT_EMOTION_PAGE_SIZE = 500
+MAX_EMOTION_PAGE_SIZE = 5000
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(value: Optional[datetime], row_id: int) -> str:
+    payload = json.dumps([value.isoformat() if value else None, row_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    """Inverse of ``encode_cursor``; raises InvalidCursor for anything malformed."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return (datetime.fromisoformat(value) if value else None), int(row_id)
+    except Exception:
+        raise InvalidCursor("Invalid cursor")
+
+
+def clamp_limit(limit: Optional[int], default: int, maximum: int) -> int:
+    return max(1, min(limit or default, maximum))
+
+
+def emotion_counts(db: Session, interview_ids: List[int]) -> Dict[int, int]:
+    """Samples per interview, summed from packed chunks rather than counting rows.
+
+    Interviews saved before chunks existed fall back to a grouped count of
+    their ``emotion_data`` rows.
+    """
+    if not interview_ids:
+        return {}
+    counts = dict(
+        db.query(models.EmotionChunk.interview_id, func.sum(models.EmotionChunk.sample_count))
+        .filter(models.EmotionChunk.interview_id.in_(interview_ids))
+        .group_by(models.EmotionChunk.interview_id)
+        .all()
+    )
+    legacy = [i for i in interview_ids if i not in counts]
+    if legacy:
+        counts.update(
+            db.query(models.EmotionData.interview_id, func.count(models.EmotionData.id))
+            .filter(models.EmotionData.interview_id.in_(legacy))
+            .group_by(models.EmotionData.interview_id)
+            .all()
+        )
+    return {interview_id: int(count) for interview_id, count in counts.items()}
+
+
+def list_interviews(
+    db: Session,
+    interviewer_id: int,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> Dict[str, Any]:
+    """One page of an interviewer's interviews, newest ``scheduled_at`` first.
+
+    The page is read straight off the (interviewer_id, scheduled_at, id)
+    index, so later pages cost the same as the first. Questions and
+    feedback come in with one selectin query each, and emotion sample
+    counts with one or two grouped queries. That makes at most five
+    queries per page, however many interviews it holds. The final pages,
+    which reach the unscheduled interviews, take up to three more.
+    """
+    limit = clamp_limit(limit, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+    Interview = models.Interview
+    base = (
+        db.query(Interview)
+        .options(selectinload(Interview.questions), selectinload(Interview.feedback))
+        .filter(Interview.interviewer_id == interviewer_id)
+    )
+    scheduled_at, last_id = decode_cursor(cursor) if cursor else (None, None)
+
+    interviews: List[models.Interview] = []
+    if last_id is None or scheduled_at is not None:
+        # Row-value comparison keeps this a single index range scan
+        query = base.filter(
+            tuple_(Interview.scheduled_at, Interview.id) < (scheduled_at, last_id)
+            if last_id is not None else Interview.scheduled_at.isnot(None)
+        )
+        interviews = query.order_by(Interview.scheduled_at.desc(), Interview.id.desc()).limit(limit + 1).all()
+    if len(interviews) <= limit:
+        # Unscheduled interviews come after all scheduled ones, newest id first
+        query = base.filter(Interview.scheduled_at.is_(None))
+        if scheduled_at is None and last_id is not None:
+            query = query.filter(Interview.id < last_id)
+        interviews += query.order_by(Interview.id.desc()).limit(limit + 1 - len(interviews)).all()
+    has_more = len(interviews) > limit
+    interviews = interviews[:limit]
+
+    counts = emotion_counts(db, [interview.id for interview in interviews])
+
+    items = [
+        schemas.InterviewListItem.from_orm(interview).copy(update={'emotion_count': counts.get(interview.id, 0)})
+        for interview in interviews
+    ]
+    last = interviews[-1] if interviews else None
+    return {
+        'items': items,
+        'next_cursor': encode_cursor(last.scheduled_at, last.id) if has_more else None,
+    }
+
+
+def list_emotions(
+    db: Session,
+    interview_id: int,
+    interviewer_id: int,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> Dict[str, Any]:
+    """One page of an interview's emotion samples in time order, via the (interview_id, timestamp, id) index.
+
+    Only the interview's interviewer sees its samples; for anyone else the
+    page is empty, as if the interview had none.
+    """
+    limit = clamp_limit(limit, DEFAULT_EMOTION_PAGE_SIZE, MAX_EMOTION_PAGE_SIZE)
+    EmotionData = models.EmotionData
+    query = (
+        db.query(EmotionData)
+        .join(models.Interview, models.Interview.id == EmotionData.interview_id)
+        .filter(EmotionData.interview_id == interview_id, models.Interview.interviewer_id == interviewer_id)
+    )
+    if cursor:
+        timestamp, last_id = decode_cursor(cursor)
+        query = query.filter(tuple_(EmotionData.timestamp, EmotionData.id) > (timestamp, last_id))
+    rows: List[models.EmotionData] = (
+        query.order_by(EmotionData.timestamp, EmotionData.id).limit(limit + 1).all()
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        'items': rows,
+        'next_cursor': encode_cursor(rows[-1].timestamp, rows[-1].id) if has_more else None,
+    }
@@ -1,26 +1,55 @@
-from fastapi import FastAPI, HTTPException, Depends, status, Body
+import time
+# Cold-start timing starts before the heavy imports below
+STARTED_AT = time.perf_counter()
+
+from fastapi import FastAPI, HTTPException, Depends, status, Body, Request, WebSocket, WebSocketDisconnect, Query
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
 from fastapi.security import OAuth2PasswordBearer
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Dict, Any, List, Tuple
+from collections import OrderedDict
+import asyncio
+import base64
+import json
+import threading
+import numpy as np
 import uvicorn
 from pydantic import BaseModel
 from jose import JWTError, jwt
-from passlib.context import CryptContext
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, ForeignKey, Enum
+from sqlalchemy import create_engine, Column, Integer, String, DateTime, ForeignKey, Enum, select
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.ext.asyncio import AsyncSession
 import os
 from dotenv import load_dotenv
-from database import SessionLocal, engine
+from database import SessionLocal, engine, get_async_session_factory, dispose_async_engine
 import models
 import schemas
+from emotion_analysis import EmotionAnalyzer, FaceTracker
+from inference_batcher import InferenceBatcher
+from vision_pool import VisionWorkerPool, PoolSaturated, WorkerCrashed, WorkerError
+from admission import AdmissionController, AdmissionRejected
+import emotion_store
+import emotion_series
+import instrumentation
+from instrumentation import stage
+import reports
+import listings
+from report_jobs import ReportJobQueue
+from realtime import RealtimeRegistry
+from auth_cache import UserCache
+from password_hasher import PasswordHasher, HasherSaturated
+from question_generator import QuestionGenerator
 
 # Load environment variables
 load_dotenv()
 
-# Create database tables
-models.Base.metadata.create_all(bind=engine)
+# Set DB_CREATE_SCHEMA=0 when the schema is created by a deploy step (python models.py)
+DB_CREATE_SCHEMA = os.getenv("DB_CREATE_SCHEMA", "1") == "1"
+# Set EMOTION_WARMUP=0 to load the emotion model on the first frame instead of at startup
+EMOTION_WARMUP = os.getenv("EMOTION_WARMUP", "1") == "1"
 
 app = FastAPI(title="AI Interview System API")
 
@@ -38,14 +67,25 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency and per-stage traces; METRICS_ENABLED=0 leaves both out
+if instrumentation.ENABLED:
+    app.add_middleware(instrumentation.MetricsMiddleware)
+    instrumentation.instrument_engines()
+
 # Security
 SECRET_KEY = os.getenv("JWT_SECRET", "your-super-secret-key-change-this-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt runs on its own bounded pool; BCRYPT_ROUNDS sets the cost factor
+password_hasher = PasswordHasher()
+pwd_context = password_hasher.context
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
+# Verified token -> user snapshot, so steady-state auth skips the users query
+user_cache = UserCache()
+user_cache.watch(models.User)
+
 # Dependency
 def get_db():
     db = SessionLocal()
@@ -54,6 +94,10 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    async with get_async_session_factory()() as db:
+        yield db
+
 # Helper functions
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
@@ -71,7 +115,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+def get_user_from_token(token: str, db: Session):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -84,20 +128,35 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
             raise credentials_exception
     except JWTError:
         raise credentials_exception
+    exp = payload.get("exp")
+    user = user_cache.get(models.User, db, email, exp)
+    if user is not None:
+        return user
     user = db.query(models.User).filter(models.User.email == email).first()
     if user is None:
         raise credentials_exception
+    user_cache.set(email, exp, user)
     return user
 
+def hasher_busy() -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="Too many sign-ins in progress, please retry",
+        headers={"Retry-After": "1"},
+    )
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    return get_user_from_token(token, db)
+
 # Auth endpoints
 @app.post("/api/auth/signup", response_model=schemas.Token)
-async def signup(user: schemas.UserCreate, db: Session = Depends(get_db)):
+async def signup(user: schemas.UserCreate, db: AsyncSession = Depends(get_async_db)):
     try:
-        db_user = db.query(models.User).filter(models.User.email == user.email).first()
+        db_user = (await db.execute(select(models.User).where(models.User.email == user.email))).scalars().first()
         if db_user:
             raise HTTPException(status_code=400, detail="Email already registered")
         
-        hashed_password = get_password_hash(user.password)
+        hashed_password = await password_hasher.hash(user.password)
         db_user = models.User(
             email=user.email,
             hashed_password=hashed_password,
@@ -105,8 +164,8 @@ async def signup(user: schemas.UserCreate, db: Session = Depends(get_db)):
             role=user.role or "user"
         )
         db.add(db_user)
-        db.commit()
-        db.refresh(db_user)
+        await db.commit()
+        await db.refresh(db_user)
         
         access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
         access_token = create_access_token(
@@ -117,8 +176,10 @@ async def signup(user: schemas.UserCreate, db: Session = Depends(get_db)):
             "token_type": "bearer",
             "user": db_user
         }
+    except HasherSaturated:
+        raise hasher_busy()
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 class LoginRequest(BaseModel):
@@ -126,20 +187,26 @@ class LoginRequest(BaseModel):
     password: str
 
 @app.post("/api/auth/login", response_model=schemas.Token)
-async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
+async def login(login_data: LoginRequest, db: AsyncSession = Depends(get_async_db)):
     try:
-        user = db.query(models.User).filter(models.User.email == login_data.email).first()
+        user = (await db.execute(select(models.User).where(models.User.email == login_data.email))).scalars().first()
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect email or password",
             )
         
-        if not verify_password(login_data.password, user.hashed_password):
+        valid, new_hash = await password_hasher.verify_and_update(login_data.password, user.hashed_password)
+        if not valid:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect email or password",
             )
+        if new_hash is not None:
+            # Stored hash used a different BCRYPT_ROUNDS; upgrade it now we have the password
+            user.hashed_password = new_hash
+            await db.commit()
+            await db.refresh(user)
 
         access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
         access_token = create_access_token(
@@ -153,6 +220,8 @@ async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
         }
     except HTTPException as he:
         raise he
+    except HasherSaturated:
+        raise hasher_busy()
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -160,5 +229,523 @@ async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
 async def read_users_me(current_user: models.User = Depends(get_current_user)):
     return current_user
 
+# Emotion analysis
+emotion_analyzer = EmotionAnalyzer()
+inference_batcher = InferenceBatcher(emotion_analyzer)
+
+# Set VISION_WORKERS > 0 to run analysis in a pool of warm worker processes
+VISION_WORKERS = int(os.getenv("VISION_WORKERS", "0"))
+VISION_MAX_PENDING = int(os.getenv("VISION_MAX_PENDING", "0")) or None
+vision_pool: Optional[VisionWorkerPool] = None
+
+# Bounds the frames analyzed at once and paces clients by the resulting load
+analysis_admission = AdmissionController()
+
+realtime_registry = RealtimeRegistry(
+    idle_timeout=float(os.getenv("REALTIME_IDLE_TIMEOUT", "300")),
+)
+realtime_eviction: Optional[asyncio.Task] = None
+
+def analysis_session(user: models.User, interview_id) -> str:
+    """Key for a user's frame analysis of one interview: face tracking, crop reuse and the live buffer.
+
+    Keying by user keeps one account from reading or writing another's live data.
+    """
+    return f"{user.id}:{interview_id}"
+
+MAX_TRACKED_SESSIONS = 1024
+face_trackers: "OrderedDict[str, FaceTracker]" = OrderedDict()
+
+def get_face_tracker(session_key: str) -> FaceTracker:
+    tracker = face_trackers.pop(session_key, None) or FaceTracker()
+    face_trackers[session_key] = tracker
+    while len(face_trackers) > MAX_TRACKED_SESSIONS:
+        face_trackers.popitem(last=False)
+    return tracker
+
+def decode_frame(data) -> np.ndarray:
+    """Decode an encoded image straight from the received buffer."""
+    import cv2
+
+    with stage('decode_image'):
+        frame = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if frame is None:
+        raise HTTPException(status_code=400, detail="Could not decode image")
+    return frame
+
+def to_frontend_scores(emotions: Dict[str, float]) -> Dict[str, float]:
+    """Map raw model scores to the 0-100 scores shown in the interview UI."""
+    return {
+        'confidence': round((emotions.get('happy', 0) + emotions.get('neutral', 0)) * 100, 1),
+        'nervousness': round((emotions.get('surprise', 0) + emotions.get('fear', 0)) * 100, 1),
+        'anxiety': round((emotions.get('fear', 0) + emotions.get('sad', 0)) * 100, 1),
+        'happiness': round(emotions.get('happy', 0) * 100, 1),
+        'neutral': round(emotions.get('neutral', 0) * 100, 1),
+    }
+
+async def run_analysis(data, session_key: Optional[str] = None) -> Tuple[Dict[str, float], bool]:
+    if vision_pool is not None:
+        try:
+            # Stages inside the worker processes aren't exported; time the round trip
+            with stage('vision_pool'):
+                emotions, reused = await vision_pool.analyze(data, session_key)
+        except PoolSaturated:
+            raise HTTPException(
+                status_code=503,
+                detail="Emotion analysis is at capacity",
+                headers={"Retry-After": "1"},
+            )
+        except WorkerCrashed as e:
+            raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+        except WorkerError as e:
+            # Not the client's fault; keep the internals out of the response
+            print(f"Emotion analysis failed in a vision worker: {e}")
+            raise HTTPException(status_code=500, detail="Emotion analysis failed")
+        except ValueError as e:
+            # Frames that can't be decoded or don't fit a shared-memory slot
+            raise HTTPException(status_code=400, detail=str(e))
+    else:
+        tracker = get_face_tracker(session_key) if session_key is not None else None
+        frame = await run_in_threadpool(decode_frame, data)
+        face = await run_in_threadpool(emotion_analyzer.preprocess_image, frame, tracker)
+        # A near-identical crop to the session's last inferred one reuses its scores
+        emotions = tracker.crop_cache.lookup(face) if tracker is not None and face is not None else None
+        reused = emotions is not None
+        if face is None:
+            emotions = {'error': 'No face detected', 'confidence': 0.0}
+        elif not reused:
+            with stage('inference_wait'):
+                emotions = await asyncio.wrap_future(inference_batcher.submit_face(face))
+            if tracker is not None:
+                tracker.crop_cache.store(face, emotions)
+    return emotions, reused
+
+async def analyze_frame_bytes(data, session_key: Optional[str] = None) -> Dict[str, Any]:
+    try:
+        async with analysis_admission.admit(session_key):
+            emotions, reused = await run_analysis(data, session_key)
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many frames waiting for analysis, slow down",
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    return {
+        'emotions': emotions,
+        'insights': emotion_analyzer.get_emotional_insights(emotions),
+        'scores': to_frontend_scores(emotions),
+        'face_detected': 'error' not in emotions,
+        'reused': reused,
+        # Clients pace their next frame by this, so the load settles at what the server keeps up with
+        'next_frame_ms': analysis_admission.next_interval_ms(),
+        'timestamp': datetime.utcnow().isoformat(),
+    }
+
+async def read_frame_payload(request: Request) -> bytes:
+    """Read a frame sent as raw bytes, multipart upload or legacy base64 JSON."""
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("frame") or form.get("image")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status_code=400, detail="Missing 'frame' file field")
+        return await upload.read()
+    if content_type.startswith("application/json"):
+        try:
+            payload = await request.json()
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid JSON body")
+        image = payload.get("image") if isinstance(payload, dict) else None
+        if not image:
+            raise HTTPException(status_code=400, detail="Missing 'image' field")
+        if not isinstance(image, str):
+            raise HTTPException(status_code=400, detail="'image' must be a base64 string")
+        try:
+            with stage('decode_base64'):
+                return base64.b64decode(image.split(",", 1)[-1])
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid base64 image")
+    return await request.body()
+
+@app.post("/api/emotions/analyze")
+async def analyze_emotions(
+    request: Request,
+    interview_id: Optional[str] = None,
+    current_user: models.User = Depends(get_current_user),
+):
+    data = await read_frame_payload(request)
+    if not data:
+        raise HTTPException(status_code=400, detail="Empty frame")
+    session = analysis_session(current_user, interview_id or '')
+    result = await analyze_frame_bytes(data, session)
+    if interview_id is not None:
+        realtime_registry.record(session, result['emotions'])
+    return result
+
+@app.websocket("/ws/emotions/{interview_id}")
+async def emotion_stream(websocket: WebSocket, interview_id: str, token: str = Query(...)):
+    db = SessionLocal()
+    try:
+        user = get_user_from_token(token, db)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    finally:
+        db.close()
+
+    await websocket.accept()
+    session_key = analysis_session(user, interview_id)
+    try:
+        while True:
+            message = await websocket.receive()
+            if message['type'] == 'websocket.disconnect':
+                break
+            data = message.get('bytes')
+            try:
+                if not data:
+                    # Text frames (or empty ones) can't carry an image; keep the socket open
+                    raise HTTPException(status_code=400, detail="Send each frame as a binary message")
+                result = await analyze_frame_bytes(data, session_key)
+                realtime_registry.record(session_key, result['emotions'])
+            except HTTPException as he:
+                result = {'error': he.detail, 'next_frame_ms': analysis_admission.next_interval_ms()}
+            await websocket.send_json(result)
+    except WebSocketDisconnect:
+        pass
+
+@app.post("/api/emotions/{interview_id}/save", response_model=schemas.EmotionSaveResult)
+async def save_interview_emotions(
+    interview_id: int,
+    batch: schemas.EmotionSampleBatch,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    ensure_interview(interview_id, db, current_user)
+    saved = emotion_store.bulk_save_emotions(db, interview_id, batch.emotions)
+    if saved:
+        report_jobs.invalidate(interview_id)
+    # Saving is the interview's last step; end its live stream now rather than at the idle timeout
+    realtime_registry.finish(analysis_session(current_user, interview_id))
+    return {"saved": saved, "skipped": len(batch.emotions) - saved}
+
+@app.get("/api/emotions/{interview_id}/realtime")
+async def read_realtime_emotions(interview_id: str, current_user: models.User = Depends(get_current_user)):
+    buffer = realtime_registry.get(analysis_session(current_user, interview_id))
+    if buffer is None:
+        raise HTTPException(status_code=404, detail="No live emotion data for this interview")
+    return buffer.snapshot()
+
+@app.get("/api/emotions/{interview_id}/realtime/stream")
+async def stream_realtime_emotions(
+    interview_id: str,
+    request: Request,
+    current_user: models.User = Depends(get_current_user),
+):
+    session = analysis_session(current_user, interview_id)
+
+    async def events():
+        version = -1
+        while not await request.is_disconnected():
+            buffer = realtime_registry.get(session)
+            if buffer is None:
+                yield "event: end\ndata: {}\n\n"
+                return
+            if not await buffer.wait_for_update(version, timeout=15):
+                yield ": keep-alive\n\n"
+                continue
+            snapshot = buffer.snapshot()
+            version = buffer.version
+            yield f"data: {json.dumps(snapshot)}\n\n"
+            if buffer.finished:
+                yield "event: end\ndata: {}\n\n"
+                return
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.get("/api/emotions/{interview_id}/series")
+async def read_emotion_series(
+    interview_id: int,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    media_type = emotion_series.negotiate(request.headers.get("accept"))
+    if media_type is None:
+        raise HTTPException(
+            status_code=406,
+            detail=f"Emotion series are available as {', '.join(emotion_series.AVAILABLE)}",
+        )
+    ensure_interview(interview_id, db, current_user)
+    series = emotion_store.load_emotion_series(db, interview_id)
+    with stage('series_encode'):
+        body = await run_in_threadpool(emotion_series.encode, media_type, interview_id, series)
+    return Response(content=body, media_type=media_type, headers={"Vary": "Accept"})
+
+# Questions
+question_generator = QuestionGenerator()
+
+@app.post("/api/questions/generate", response_model=List[schemas.GeneratedQuestion])
+async def generate_questions(
+    body: schemas.QuestionGenerateRequest,
+    request: Request,
+    stream: bool = False,
+    current_user: models.User = Depends(get_current_user),
+):
+    if stream or "text/event-stream" in request.headers.get("accept", ""):
+        # Send each question as a server-sent event as soon as it is parsed
+        async def events():
+            async for question in question_generator.stream_questions(
+                body.candidateProfile,
+                body.emotionalState,
+                previous_qa=body.previousQa,
+                num_questions=body.numQuestions,
+            ):
+                yield f"event: question\ndata: {json.dumps(question)}\n\n"
+            yield "event: done\ndata: {}\n\n"
+
+        return StreamingResponse(
+            events(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    return await question_generator.agenerate_questions(
+        body.candidateProfile,
+        body.emotionalState,
+        previous_qa=body.previousQa,
+        num_questions=body.numQuestions,
+    )
+
+@app.get("/api/questions/cache/stats")
+async def question_cache_stats(current_user: models.User = Depends(get_current_user)):
+    return question_generator.cache.stats()
+
+# Reports
+report_jobs = ReportJobQueue(SessionLocal)
+report_jobs.watch(models.EmotionData, models.Question, models.InterviewFeedback, models.Interview)
+
+def owns_interview(interview_id: int, db: Session, user: models.User) -> bool:
+    return db.query(models.Interview.id).filter(
+        models.Interview.id == interview_id,
+        models.Interview.interviewer_id == user.id,
+    ).first() is not None
+
+def ensure_interview(interview_id: int, db: Session, user: models.User):
+    """404 unless the interview exists and belongs to ``user``, so other users' ids aren't revealed."""
+    if not owns_interview(interview_id, db, user):
+        raise HTTPException(status_code=404, detail="Interview not found")
+
+def report_or_job(interview_id: int, db: Session, user: models.User):
+    """The cached report if it is current, otherwise a 202 with the (possibly new) job."""
+    ensure_interview(interview_id, db, user)
+    report = report_jobs.cached_report(interview_id)
+    if report is not None:
+        return report
+    job = report_jobs.submit(interview_id)
+    if job.status == "done":
+        return job.result
+    return JSONResponse(
+        status_code=202,
+        content={**job.to_dict(), "status_url": f"/api/reports/jobs/{job.id}"},
+        headers={"Location": f"/api/reports/jobs/{job.id}", "Retry-After": "1"},
+    )
+
+@app.post("/api/reports/generate/{interview_id}")
+async def generate_report(
+    interview_id: int,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    return report_or_job(interview_id, db, current_user)
+
+# Registered before /api/reports/{report_id} so "jobs" isn't parsed as an id
+@app.get("/api/reports/jobs/stats")
+async def report_job_stats(current_user: models.User = Depends(get_current_user)):
+    return report_jobs.stats()
+
+@app.get("/api/reports/jobs/{job_id}")
+async def read_report_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    job = report_jobs.get(job_id)
+    if job is None or not owns_interview(job.interview_id, db, current_user):
+        raise HTTPException(status_code=404, detail="Report job not found")
+    return job.to_dict(include_result=True)
+
+@app.get("/api/reports/{report_id}")
+async def read_report(
+    report_id: int,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    # Reports are generated per interview and share the interview's id
+    return report_or_job(report_id, db, current_user)
+
+@app.get("/api/reports/{report_id}/export")
+async def export_report(
+    report_id: int,
+    format: str = "csv",
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    if format not in reports.EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported export format, use one of {', '.join(reports.EXPORT_FORMATS)}")
+    ensure_interview(report_id, db, current_user)
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        reports.iter_report_export(SessionLocal, report_id, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="interview-{report_id}.{format}"'},
+    )
+
+@app.get("/api/emotions/pool/stats")
+async def vision_pool_stats(current_user: models.User = Depends(get_current_user)):
+    if vision_pool is None:
+        backend = getattr(emotion_analyzer.model, 'label', None)
+        return {
+            'workers': 0,
+            'inference_backend': backend,
+            'admission': analysis_admission.stats(),
+            **inference_batcher.stats(),
+        }
+    return {**vision_pool.stats(), 'admission': analysis_admission.stats()}
+
+# Listings
+@app.get("/api/interviews", response_model=schemas.InterviewPage)
+async def list_interviews(
+    cursor: Optional[str] = None,
+    limit: int = Query(listings.DEFAULT_PAGE_SIZE, ge=1, le=listings.MAX_PAGE_SIZE),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    try:
+        return listings.list_interviews(db, current_user.id, cursor, limit)
+    except listings.InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# Registered after the fixed /api/emotions/... routes so they match first
+@app.get("/api/emotions/{interview_id}", response_model=schemas.EmotionDataPage)
+async def list_interview_emotions(
+    interview_id: int,
+    cursor: Optional[str] = None,
+    limit: int = Query(listings.DEFAULT_EMOTION_PAGE_SIZE, ge=1, le=listings.MAX_EMOTION_PAGE_SIZE),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    try:
+        return listings.list_emotions(db, interview_id, current_user.id, cursor, limit)
+    except listings.InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# Metrics
+@app.get("/metrics")
+async def metrics():
+    if not instrumentation.ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return PlainTextResponse(instrumentation.render(), media_type=instrumentation.CONTENT_TYPE)
+
+@app.get("/metrics/slow")
+async def slow_requests(current_user: models.User = Depends(get_current_user)):
+    return instrumentation.slow_traces()
+
+# Health
+startup_timings: Dict[str, float] = {}
+schema_ready = threading.Event()
+analyzer_ready = threading.Event()
+warmup_error: Optional[str] = None
+
+def vision_ready() -> bool:
+    if vision_pool is not None:
+        return vision_pool.stats()['workers_ready'] == vision_pool.num_workers
+    return analyzer_ready.is_set()
+
+def note_ready():
+    """Record and print the cold-start time the first time every check passes."""
+    if 'ready_s' not in startup_timings and schema_ready.is_set() and vision_ready():
+        startup_timings['ready_s'] = round(time.perf_counter() - STARTED_AT, 3)
+        parts = ', '.join(f"{name[:-2]} {seconds:.2f}s" for name, seconds in startup_timings.items() if name != 'ready_s')
+        print(f"Ready after {startup_timings['ready_s']:.2f}s ({parts})")
+
+def warm_up_analyzer():
+    global warmup_error
+    try:
+        startup_timings['warmup_s'] = round(emotion_analyzer.warm_up(), 3)
+    except Exception as e:
+        warmup_error = str(e)
+        print(f"Emotion model warm-up failed: {warmup_error}")
+        return
+    analyzer_ready.set()
+    note_ready()
+
+@app.get("/health/live")
+async def liveness():
+    return {"status": "ok"}
+
+@app.get("/health/ready")
+async def readiness():
+    checks = {
+        "schema": schema_ready.is_set(),
+        "emotion_model": vision_ready(),
+    }
+    ready = all(checks.values())
+    if ready:
+        note_ready()
+    content = {"ready": ready, "checks": checks, "startup": startup_timings}
+    if warmup_error is not None:
+        content["error"] = warmup_error
+    return JSONResponse(status_code=200 if ready else 503, content=content)
+
+@app.on_event("startup")
+def create_schema():
+    if DB_CREATE_SCHEMA:
+        start = time.perf_counter()
+        models.create_schema(engine)
+        startup_timings['schema_s'] = round(time.perf_counter() - start, 3)
+    schema_ready.set()
+
+@app.on_event("startup")
+def start_vision_pool():
+    global vision_pool
+    if VISION_WORKERS > 0:
+        # Workers load and warm up their own analyzers; this process never loads the model
+        vision_pool = VisionWorkerPool(num_workers=VISION_WORKERS, max_pending=VISION_MAX_PENDING)
+        vision_pool.start()
+    elif EMOTION_WARMUP:
+        # Serve liveness probes while the model loads; readiness waits for it
+        threading.Thread(target=warm_up_analyzer, name="emotion-warmup", daemon=True).start()
+    else:
+        analyzer_ready.set()
+    note_ready()
+
+@app.on_event("startup")
+async def start_realtime_eviction():
+    global realtime_eviction
+    realtime_eviction = asyncio.create_task(realtime_registry.run_eviction())
+
+@app.on_event("shutdown")
+async def stop_realtime_eviction():
+    if realtime_eviction is not None:
+        realtime_eviction.cancel()
+
+@app.on_event("shutdown")
+def stop_inference_batcher():
+    inference_batcher.stop(timeout=5)
+    if vision_pool is not None:
+        vision_pool.stop()
+    password_hasher.shutdown()
+    report_jobs.shutdown()
+
+@app.on_event("shutdown")
+async def close_async_db():
+    await dispose_async_engine()
+
+startup_timings['import_s'] = round(time.perf_counter() - STARTED_AT, 3)
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
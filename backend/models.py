@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, Integer, String, DateTime, ForeignKey, JSON, Float, func
+from sqlalchemy import Boolean, Column, Integer, String, DateTime, ForeignKey, JSON, Float, LargeBinary, UniqueConstraint, Index, func
 from sqlalchemy.orm import relationship
 from database import Base
 
@@ -19,6 +19,10 @@ class User(Base):
 
 class Interview(Base):
     __tablename__ = "interviews"
+    __table_args__ = (
+        # Keyset pagination of an interviewer's interviews by schedule
+        Index("ix_interviews_interviewer_scheduled", "interviewer_id", "scheduled_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     candidate_name = Column(String)
@@ -34,11 +38,17 @@ class Interview(Base):
 
     interviewer = relationship("User", back_populates="interviews")
     emotions = relationship("EmotionData", back_populates="interview")
+    emotion_chunks = relationship("EmotionChunk", back_populates="interview")
+    emotion_rollups = relationship("EmotionRollup", back_populates="interview")
     questions = relationship("Question", back_populates="interview")
     feedback = relationship("InterviewFeedback", back_populates="interview")
 
 class EmotionData(Base):
     __tablename__ = "emotion_data"
+    __table_args__ = (
+        # Keyset pagination of an interview's samples by time
+        Index("ix_emotion_data_interview_timestamp", "interview_id", "timestamp", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     interview_id = Column(Integer, ForeignKey("interviews.id"))
@@ -48,11 +58,45 @@ class EmotionData(Base):
 
     interview = relationship("Interview", back_populates="emotions")
 
+class EmotionChunk(Base):
+    __tablename__ = "emotion_chunks"
+
+    id = Column(Integer, primary_key=True, index=True)
+    interview_id = Column(Integer, ForeignKey("interviews.id"), index=True)
+    start_time = Column(DateTime)
+    end_time = Column(DateTime)
+    sample_count = Column(Integer)
+    timestamps = Column(LargeBinary)  # little-endian float64 epoch seconds
+    scores = Column(LargeBinary)  # little-endian float32, sample_count x 7, row-major
+    created_at = Column(DateTime, server_default=func.now())
+
+    interview = relationship("Interview", back_populates="emotion_chunks")
+
+class EmotionRollup(Base):
+    __tablename__ = "emotion_rollups"
+    __table_args__ = (
+        UniqueConstraint("interview_id", "granularity", "window_key"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    interview_id = Column(Integer, ForeignKey("interviews.id"), index=True)
+    granularity = Column(String)  # minute or question
+    window_key = Column(Integer)  # epoch minute or question id
+    window_start = Column(DateTime)
+    sample_count = Column(Integer)
+    sums = Column(LargeBinary)  # float64 x 7
+    maxima = Column(LargeBinary)  # float32 x 7
+    histogram = Column(LargeBinary)  # int32 x 7 x HISTOGRAM_BINS
+    bands = Column(LargeBinary)  # int32 x 3 insights x 3 levels
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    interview = relationship("Interview", back_populates="emotion_rollups")
+
 class Question(Base):
     __tablename__ = "questions"
 
     id = Column(Integer, primary_key=True, index=True)
-    interview_id = Column(Integer, ForeignKey("interviews.id"))
+    interview_id = Column(Integer, ForeignKey("interviews.id"), index=True)
     question_text = Column(String)
     category = Column(String)
     difficulty = Column(String)
@@ -66,7 +110,7 @@ class InterviewFeedback(Base):
     __tablename__ = "interview_feedback"
 
     id = Column(Integer, primary_key=True, index=True)
-    interview_id = Column(Integer, ForeignKey("interviews.id"))
+    interview_id = Column(Integer, ForeignKey("interviews.id"), index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
     technical_rating = Column(Integer)
     communication_rating = Column(Integer)
@@ -79,4 +123,22 @@ class InterviewFeedback(Base):
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
 
     interview = relationship("Interview", back_populates="feedback")
-    user = relationship("User", back_populates="feedback") 
\ No newline at end of file
+    user = relationship("User", back_populates="feedback")
+
+
+def create_schema(bind):
+    """Create missing tables and indexes.
+
+    The API runs this at startup unless DB_CREATE_SCHEMA=0; deployments that
+    manage the schema separately run ``python models.py`` once instead.
+    """
+    Base.metadata.create_all(bind=bind)
+    # create_all skips indexes on tables that already exist
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=bind, checkfirst=True)
+
+if __name__ == "__main__":
+    from database import engine
+
+    create_schema(engine)
@@ -0,0 +1,200 @@
+import copy
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Tuple
+
+DEFAULT_MAX_ENTRIES = int(os.getenv("QUESTION_CACHE_SIZE", "1024"))
+DEFAULT_TTL = float(os.getenv("QUESTION_CACHE_TTL", "3600"))
+
+
+def _normalize_text(value) -> str:
+    return ' '.join(str(value or '').lower().split())
+
+
+def fingerprint(
+    candidate_profile: Dict,
+    emotional_state: Dict,
+    num_questions: int,
+    previous_qa: Optional[List[Dict]] = None,
+) -> str:
+    """Stable cache key for a question-generation request.
+
+    Profiles that differ only in case, whitespace or skill order share a key,
+    and only the emotional-state levels that reach the prompt are included.
+    """
+    key = {
+        'role': _normalize_text(candidate_profile.get('role')),
+        'experience': _normalize_text(candidate_profile.get('experience')),
+        'skills': sorted({_normalize_text(s) for s in candidate_profile.get('skills', []) if s}),
+        'confidence': _normalize_text(emotional_state.get('confidence', 'neutral')),
+        'anxiety': _normalize_text(emotional_state.get('anxiety', 'low')),
+        'nervousness': _normalize_text(emotional_state.get('nervousness', 'low')),
+        'num_questions': int(num_questions),
+        'previous_qa': [
+            [_normalize_text(qa.get('question')), _normalize_text(qa.get('answer'))]
+            for qa in previous_qa or []
+        ],
+    }
+    encoded = json.dumps(key, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class QuestionCache:
+    """LRU + TTL cache of generated questions with in-flight request coalescing.
+
+    Values are held as JSON text so every caller gets its own copy. With
+    ``db_path`` set, entries are also written to a small SQLite table so they
+    survive restarts; memory misses fall through to it.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl: float = DEFAULT_TTL,
+        db_path: Optional[str] = None,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.db_path = db_path
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.expired = 0
+        self.evictions = 0
+
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS question_cache "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._db.execute("DELETE FROM question_cache WHERE expires_at < ?", (time.time(),))
+            self._db.commit()
+
+    def _load(self, key: str) -> Optional[Tuple[float, str]]:
+        if self._db is None:
+            return None
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT value, expires_at FROM question_cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return row[1], row[0]
+
+    def _store(self, key: str, expires_at: float, value: str):
+        if self._db is None:
+            return
+        with self._db_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO question_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, expires_at),
+            )
+            self._db.commit()
+
+    def _lookup(self, key: str) -> Optional[List[Dict]]:
+        # Must be called with self._lock held
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._load(key)
+            if entry is not None:
+                self._insert(key, *entry)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.time():
+            self._entries.pop(key, None)
+            self.expired += 1
+            return None
+        self._entries.move_to_end(key)
+        return json.loads(value)
+
+    def _insert(self, key: str, expires_at: float, value: str):
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key: str) -> Optional[List[Dict]]:
+        with self._lock:
+            value = self._lookup(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return value
+
+    def set(self, key: str, value: List[Dict]):
+        expires_at = time.time() + self.ttl
+        encoded = json.dumps(value)
+        with self._lock:
+            self._insert(key, expires_at, encoded)
+        self._store(key, expires_at, encoded)
+
+    def get_or_compute(self, key: str, compute: Callable[[], List[Dict]]) -> List[Dict]:
+        """Return the cached value, or run ``compute`` once for all concurrent callers.
+
+        Empty results and exceptions are handed to every waiting caller but
+        never cached.
+        """
+        with self._lock:
+            value = self._lookup(key)
+            if value is not None:
+                self.hits += 1
+                return value
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                self.misses += 1
+                future = self._inflight[key] = Future()
+                leader = True
+
+        if not leader:
+            return copy.deepcopy(future.result())
+
+        try:
+            value = compute()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            if value:
+                self.set(key, value)
+            future.set_result(value)
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def note_coalesced(self):
+        """Count a caller that joined a request already in flight elsewhere."""
+        with self._lock:
+            self.coalesced += 1
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+            'expired': self.expired,
+            'evictions': self.evictions,
+            'inflight': len(self._inflight),
+            'hit_rate': (self.hits + self.coalesced) / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,182 @@
+import os
+import threading
+from collections import OrderedDict, deque
+from itertools import accumulate
+from typing import Deque, Dict, List, Optional, Tuple
+
+DEFAULT_TOKEN_BUDGET = int(os.getenv("QUESTION_CONTEXT_TOKENS", "1500"))
+DEFAULT_SUMMARY_TOKENS = int(os.getenv("QUESTION_SUMMARY_TOKENS", "300"))
+MAX_CACHED_SUMMARIES = 512
+
+SUMMARY_QUESTION_WORDS = 12
+SUMMARY_ANSWER_WORDS = 20
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (about four characters per token for English text)."""
+    return (len(text) + 3) // 4
+
+
+def _clip_words(text: str, limit: int) -> str:
+    words = str(text or '').split()
+    if len(words) <= limit:
+        return ' '.join(words)
+    return ' '.join(words[:limit]) + '...'
+
+
+def _format_turn(qa: Dict) -> str:
+    return f"Q: {qa['question']}\nA: {qa['answer']}\n"
+
+
+class RollingSummary:
+    """Compressed summary of the oldest Q&A turns, extended one turn at a time."""
+
+    def __init__(self, max_tokens: int):
+        self.max_tokens = max_tokens
+        self.lines: Deque[str] = deque()
+        self.tokens = 0
+        self.turns = 0
+        self.omitted = 0
+
+    def copy(self) -> "RollingSummary":
+        clone = RollingSummary(self.max_tokens)
+        clone.lines = deque(self.lines)
+        clone.tokens, clone.turns, clone.omitted = self.tokens, self.turns, self.omitted
+        return clone
+
+    def add(self, qa: Dict):
+        line = (
+            f"- Asked: {_clip_words(qa.get('question'), SUMMARY_QUESTION_WORDS)} "
+            f"| Answer: {_clip_words(qa.get('answer'), SUMMARY_ANSWER_WORDS)}"
+        )
+        self.lines.append(line)
+        self.tokens += estimate_tokens(line) + 1
+        self.turns += 1
+        # Keep the summary itself within budget by dropping its oldest lines
+        while self.tokens > self.max_tokens and len(self.lines) > 1:
+            self.tokens -= estimate_tokens(self.lines.popleft()) + 1
+            self.omitted += 1
+
+    def render(self) -> str:
+        parts = ["\nEarlier Q&A (summarized):\n"]
+        if self.omitted:
+            parts.append(f"- ({self.omitted} earlier exchanges omitted)\n")
+        parts.append('\n'.join(self.lines))
+        parts.append('\n')
+        return ''.join(parts)
+
+
+class ContextBuilder:
+    """Builds the question-generation prompt context within a token budget.
+
+    The most recent Q&A turns are included verbatim, newest first, until the
+    budget is used. Older turns are folded into a rolling summary which is
+    cached by a hash of the turns it covers. When the next request arrives
+    with one more turn, the cached summary is extended rather than rebuilt.
+    """
+
+    def __init__(
+        self,
+        token_budget: int = DEFAULT_TOKEN_BUDGET,
+        summary_tokens: int = DEFAULT_SUMMARY_TOKENS,
+        max_cached_summaries: int = MAX_CACHED_SUMMARIES,
+    ):
+        self.token_budget = token_budget
+        self.summary_tokens = summary_tokens
+        self.max_cached_summaries = max_cached_summaries
+        self._summaries: "OrderedDict[int, RollingSummary]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.summary_hits = 0
+        self.summary_turns_added = 0
+
+    def _header(self, candidate_profile: Dict, emotional_state: Dict) -> str:
+        return f"""
+        Candidate Profile:
+        - Experience: {candidate_profile.get('experience', 'Not provided')}
+        - Skills: {', '.join(candidate_profile.get('skills', []))}
+        - Role: {candidate_profile.get('role', 'Not specified')}
+        
+        Current Emotional State:
+        - Confidence: {emotional_state.get('confidence', 'neutral')}
+        - Anxiety: {emotional_state.get('anxiety', 'low')}
+        - Nervousness: {emotional_state.get('nervousness', 'low')}
+        """
+
+    @staticmethod
+    def _prefix_hashes(turns: List[Dict]) -> List[int]:
+        """hashes[i] identifies turns[:i]; chained so a prefix maps to one key."""
+        turn_hashes = (hash((str(qa.get('question')), str(qa.get('answer')))) for qa in turns)
+        return list(accumulate(turn_hashes, lambda prefix, turn: hash((prefix, turn)), initial=0))
+
+    def _summarize(self, older: List[Dict]) -> RollingSummary:
+        hashes = self._prefix_hashes(older)
+        # Reuse the longest summarized prefix we already have
+        start, summary = 0, None
+        for length in range(len(older), 0, -1):
+            cached = self._summaries.get(hashes[length])
+            if cached is not None:
+                self._summaries.move_to_end(hashes[length])
+                start, summary = length, cached
+                self.summary_hits += 1
+                break
+
+        if start == len(older):
+            return summary
+        summary = summary.copy() if summary is not None else RollingSummary(self.summary_tokens)
+        for qa in older[start:]:
+            summary.add(qa)
+        self.summary_turns_added += len(older) - start
+
+        self._summaries[hashes[len(older)]] = summary
+        while len(self._summaries) > self.max_cached_summaries:
+            self._summaries.popitem(last=False)
+        return summary
+
+    def split_turns(self, previous_qa: List[Dict], available_tokens: int) -> Tuple[List[Dict], List[str]]:
+        """Return (older turns to summarize, newest turns rendered verbatim in order)."""
+        recent: List[str] = []
+        used = 0
+        index = len(previous_qa)
+        while index > 0:
+            text = _format_turn(previous_qa[index - 1])
+            cost = estimate_tokens(text)
+            if recent and used + cost > available_tokens:
+                break
+            if not recent and cost > available_tokens:
+                # Always keep the latest turn, trimmed to fit
+                text = text[:max(available_tokens, 1) * 4].rstrip() + '...\n'
+                cost = estimate_tokens(text)
+            recent.append(text)
+            used += cost
+            index -= 1
+        recent.reverse()
+        return previous_qa[:index], recent
+
+    def build(
+        self,
+        candidate_profile: Dict,
+        emotional_state: Dict,
+        previous_qa: Optional[List[Dict]] = None,
+    ) -> str:
+        header = self._header(candidate_profile, emotional_state)
+        if not previous_qa:
+            return header
+
+        available = self.token_budget - estimate_tokens(header)
+        older, recent = self.split_turns(previous_qa, max(available - self.summary_tokens, 1))
+
+        parts = [header]
+        if older:
+            with self._lock:
+                summary = self._summarize(older)
+            parts.append(summary.render())
+        parts.append("\nPrevious Q&A:\n")
+        parts.extend(recent)
+        return ''.join(parts)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'cached_summaries': len(self._summaries),
+            'summary_hits': self.summary_hits,
+            'summary_turns_added': self.summary_turns_added,
+        }
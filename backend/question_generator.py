@@ -1,13 +1,119 @@
-import openai
-from typing import List, Dict, Optional
+from typing import AsyncIterator, Awaitable, Callable, Iterator, List, Dict, Optional
+import asyncio
+import contextvars
+import copy
+import functools
 import os
+import random
+import threading
 from dotenv import load_dotenv
+from instrumentation import stage
+from question_cache import QuestionCache, fingerprint
+from question_context import ContextBuilder
 
 load_dotenv()
 
-class QuestionGenerator:
+MAX_CONCURRENCY = int(os.getenv("QUESTION_MAX_CONCURRENCY", "8"))
+LATENCY_BUDGET = float(os.getenv("QUESTION_LATENCY_BUDGET", "8"))
+HEDGE_BUDGET = float(os.getenv("QUESTION_HEDGE_BUDGET", "60"))
+MAX_RETRIES = int(os.getenv("QUESTION_MAX_RETRIES", "2"))
+RETRY_BASE_DELAY = float(os.getenv("QUESTION_RETRY_BASE_DELAY", "0.25"))
+HEDGE = os.getenv("QUESTION_HEDGE", "1") == "1"
+
+QUESTION_PREFIXES = ('Q:', 'Question:', '1.', '2.', '3.')
+CONTEXT_PREFIXES = ('Context:', 'Note:')
+FOLLOW_UP_PREFIXES = ('Follow-up:', 'Follow up:')
+
+def _openai():
+    # Imported on the first upstream call; cached or stubbed runs never need it
+    import openai
+
+    openai.api_key = os.getenv("OPENAI_API_KEY")
+    return openai
+
+class QuestionStreamParser:
+    """Incremental parser for completion text, fed in arbitrary pieces.
+
+    A question is returned once the next question starts or the stream is
+    closed, so its context and follow-ups are already attached.
+    """
+
     def __init__(self):
-        openai.api_key = os.getenv("OPENAI_API_KEY")
+        self._partial = ''
+        self._current: Optional[Dict] = None
+
+    def _parse_line(self, line: str) -> Optional[Dict]:
+        completed = None
+        line = line.strip()
+        if not line:
+            return None
+
+        if line.startswith(QUESTION_PREFIXES):
+            completed = self._current
+            self._current = {
+                'question': line.split(':', 1)[1].strip() if ':' in line else line[2:].strip(),
+                'follow_up_questions': [],
+                'context': ''
+            }
+        elif line.startswith(CONTEXT_PREFIXES):
+            if self._current:
+                self._current['context'] = line.split(':', 1)[1].strip()
+        elif line.startswith(FOLLOW_UP_PREFIXES):
+            if self._current:
+                self._current['follow_up_questions'].append(line.split(':', 1)[1].strip())
+        return completed
+
+    def feed(self, text: str) -> List[Dict]:
+        """Consume more text and return the questions it completed."""
+        *lines, self._partial = (self._partial + text).split('\n')
+        return [q for q in map(self._parse_line, lines) if q]
+
+    def close(self) -> List[Dict]:
+        """Flush the final line and return whatever question is still open."""
+        completed = [q for q in [self._parse_line(self._partial)] if q]
+        self._partial = ''
+        if self._current:
+            completed.append(self._current)
+            self._current = None
+        return completed
+
+class QuestionGenerator:
+    def __init__(
+        self,
+        completion_fn: Optional[Callable[..., str]] = None,
+        cache: Optional[QuestionCache] = None,
+        acompletion_fn: Optional[Callable[..., Awaitable[str]]] = None,
+        stream_fn: Optional[Callable[..., Iterator[str]]] = None,
+        astream_fn: Optional[Callable[..., AsyncIterator[str]]] = None,
+        max_concurrency: int = MAX_CONCURRENCY,
+        latency_budget: float = LATENCY_BUDGET,
+        hedge: bool = HEDGE,
+        hedge_budget: float = HEDGE_BUDGET,
+        max_retries: int = MAX_RETRIES,
+        retry_base_delay: float = RETRY_BASE_DELAY,
+        context_builder: Optional[ContextBuilder] = None,
+    ):
+        # completion_fn(model=..., messages=..., temperature=..., max_tokens=...) -> str
+        # lets tests and local runs swap in a stand-in for the completion API
+        self.completion_fn = completion_fn or self._openai_completion
+        self.cache = cache if cache is not None else QuestionCache(
+            db_path=os.getenv("QUESTION_CACHE_DB") or None
+        )
+        # Async callers use acompletion_fn when given, otherwise completion_fn in a thread
+        self.acompletion_fn = acompletion_fn
+        # Streaming callers read text deltas from astream_fn, or from stream_fn in a thread
+        self.stream_fn = stream_fn or self._openai_stream
+        self.astream_fn = astream_fn
+        # Keeps long interviews within the prompt token budget
+        self.context_builder = context_builder or ContextBuilder()
+        self.max_concurrency = max_concurrency
+        self.latency_budget = latency_budget
+        self.hedge = hedge
+        self.hedge_budget = max(hedge_budget, latency_budget)
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._inflight: Dict[str, asyncio.Future] = {}
         self.system_prompt = """You are an expert interviewer. Generate relevant interview questions based on:
         1. The candidate's profile and experience
         2. The current emotional state of the candidate
@@ -20,6 +126,45 @@ class QuestionGenerator:
         - Build upon previous responses
         """
         
+    @staticmethod
+    def _openai_completion(**kwargs) -> str:
+        response = _openai().ChatCompletion.create(**kwargs)
+        return response.choices[0].message.content
+
+    @staticmethod
+    def _openai_stream(**kwargs) -> Iterator[str]:
+        for chunk in _openai().ChatCompletion.create(stream=True, **kwargs):
+            content = chunk.choices[0].delta.get('content')
+            if content:
+                yield content
+
+    def _build_context(
+        self,
+        candidate_profile: Dict,
+        emotional_state: Dict,
+        previous_qa: Optional[List[Dict]] = None,
+    ) -> str:
+        with stage('question_context'):
+            return self.context_builder.build(candidate_profile, emotional_state, previous_qa)
+
+    def _completion_request(self, context: str, num_questions: int) -> Dict:
+        return dict(
+            model="gpt-4",
+            messages=[
+                {"role": "system", "content": self.system_prompt},
+                {"role": "user", "content": f"{context}\n\nGenerate {num_questions} interview questions."}
+            ],
+            temperature=0.7,
+            max_tokens=500
+        )
+
+    def _request_questions(self, context: str, num_questions: int) -> List[Dict]:
+        with stage('llm_completion'):
+            content = self.completion_fn(**self._completion_request(context, num_questions))
+        
+        # Parse the response and format questions
+        return self._parse_questions(content)
+
     def generate_questions(
         self,
         candidate_profile: Dict,
@@ -28,73 +173,233 @@ class QuestionGenerator:
         num_questions: int = 3
     ) -> List[Dict]:
         """Generate interview questions based on candidate profile and emotional state."""
-        
-        # Prepare the context for the AI
-        context = f"""
-        Candidate Profile:
-        - Experience: {candidate_profile.get('experience', 'Not provided')}
-        - Skills: {', '.join(candidate_profile.get('skills', []))}
-        - Role: {candidate_profile.get('role', 'Not specified')}
-        
-        Current Emotional State:
-        - Confidence: {emotional_state.get('confidence', 'neutral')}
-        - Anxiety: {emotional_state.get('anxiety', 'low')}
-        - Nervousness: {emotional_state.get('nervousness', 'low')}
-        """
-        
-        if previous_qa:
-            context += "\nPrevious Q&A:\n"
-            for qa in previous_qa:
-                context += f"Q: {qa['question']}\nA: {qa['answer']}\n"
-        
+        context = self._build_context(candidate_profile, emotional_state, previous_qa)
+
         try:
-            response = openai.ChatCompletion.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": self.system_prompt},
-                    {"role": "user", "content": f"{context}\n\nGenerate {num_questions} interview questions."}
-                ],
-                temperature=0.7,
-                max_tokens=500
+            key = fingerprint(candidate_profile, emotional_state, num_questions, previous_qa)
+            return self.cache.get_or_compute(
+                key, functools.partial(self._request_questions, context, num_questions)
             )
             
-            # Parse the response and format questions
-            questions = self._parse_questions(response.choices[0].message.content)
-            return questions
-            
         except Exception as e:
             print(f"Error generating questions: {str(e)}")
             return self._get_fallback_questions(candidate_profile)
+
+    async def _arequest_questions(self, context: str, num_questions: int) -> List[Dict]:
+        if self.acompletion_fn is not None:
+            with stage('llm_completion'):
+                content = await self.acompletion_fn(**self._completion_request(context, num_questions))
+            return self._parse_questions(content)
+        loop = asyncio.get_running_loop()
+        # Run in a copy of this context so the request's stage trace sees the call
+        return await loop.run_in_executor(
+            None, functools.partial(contextvars.copy_context().run, self._request_questions, context, num_questions)
+        )
+
+    def _release_slot(self, call: asyncio.Future):
+        self._semaphore.release()
+        # The caller may have timed out already; consume the outcome here
+        if not call.cancelled():
+            call.exception()
+
+    async def _fetch_with_retries(self, context: str, num_questions: int, budget: float) -> List[Dict]:
+        """Call upstream under the global semaphore, retrying with jittered backoff within ``budget``.
+
+        A slot is held until its upstream call has really ended. Async calls
+        are cancelled on timeout, but a call running in a thread cannot be,
+        so its slot stays taken until the thread returns; that keeps
+        ``max_concurrency`` a bound on calls actually in flight.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + budget
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        attempt = 0
+        while True:
+            await self._semaphore.acquire()
+            # Time spent waiting for a slot counts against the budget
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                self._semaphore.release()
+                raise asyncio.TimeoutError()
+            call = asyncio.ensure_future(self._arequest_questions(context, num_questions))
+            call.add_done_callback(self._release_slot)
+            try:
+                return await asyncio.wait_for(asyncio.shield(call), remaining)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                if self.acompletion_fn is not None:
+                    call.cancel()
+                raise
+            except Exception:
+                attempt += 1
+                if attempt > self.max_retries:
+                    raise
+            delay = random.uniform(0, self.retry_base_delay * 2 ** (attempt - 1))
+            if loop.time() + delay >= deadline:
+                raise asyncio.TimeoutError()
+            await asyncio.sleep(delay)
+
+    async def _fetch_and_cache(self, key: str, context: str, num_questions: int, budget: float) -> List[Dict]:
+        questions = await self._fetch_with_retries(context, num_questions, budget)
+        if questions:
+            self.cache.set(key, questions)
+        return questions
+
+    def _finish_inflight(self, key: str, task: asyncio.Future):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Hedged callers may have stopped waiting; consume the outcome here
+        if not task.cancelled():
+            task.exception()
+
+    async def agenerate_questions(
+        self,
+        candidate_profile: Dict,
+        emotional_state: Dict,
+        previous_qa: Optional[List[Dict]] = None,
+        num_questions: int = 3,
+        hedge: Optional[bool] = None,
+        latency_budget: Optional[float] = None,
+    ) -> List[Dict]:
+        """Async generate_questions that never blocks the event loop past its latency budget.
+
+        Upstream calls share a concurrency semaphore and identical requests
+        share one in-flight call. When the budget runs out the fallback
+        questions are returned; in hedged mode the upstream call keeps running
+        (up to ``hedge_budget``) and its answer is cached for the next caller.
+        """
+        hedge = self.hedge if hedge is None else hedge
+        budget = latency_budget or self.latency_budget
+        key = fingerprint(candidate_profile, emotional_state, num_questions, previous_qa)
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.cache.note_coalesced()
+        else:
+            with stage('question_cache'):
+                cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+            context = self._build_context(candidate_profile, emotional_state, previous_qa)
+            upstream_budget = self.hedge_budget if hedge else budget
+            task = asyncio.ensure_future(self._fetch_and_cache(key, context, num_questions, upstream_budget))
+            self._inflight[key] = task
+            task.add_done_callback(functools.partial(self._finish_inflight, key))
+
+        try:
+            return copy.deepcopy(await asyncio.wait_for(asyncio.shield(task), budget))
+        except asyncio.TimeoutError:
+            print(f"Question generation exceeded its {budget:.1f}s budget, using fallback questions")
+        except Exception as e:
+            print(f"Error generating questions: {str(e)}")
+        return self._get_fallback_questions(candidate_profile)
     
     def _parse_questions(self, response: str) -> List[Dict]:
         """Parse the AI response into structured question objects."""
-        questions = []
-        current_question = None
-        
-        for line in response.split('\n'):
-            line = line.strip()
-            if not line:
-                continue
-                
-            if line.startswith(('Q:', 'Question:', '1.', '2.', '3.')):
-                if current_question:
-                    questions.append(current_question)
-                current_question = {
-                    'question': line.split(':', 1)[1].strip() if ':' in line else line[2:].strip(),
-                    'follow_up_questions': [],
-                    'context': ''
-                }
-            elif line.startswith(('Context:', 'Note:')):
-                if current_question:
-                    current_question['context'] = line.split(':', 1)[1].strip()
-            elif line.startswith(('Follow-up:', 'Follow up:')):
-                if current_question:
-                    current_question['follow_up_questions'].append(line.split(':', 1)[1].strip())
-        
-        if current_question:
-            questions.append(current_question)
-            
-        return questions
+        with stage('question_parse'):
+            parser = QuestionStreamParser()
+            return parser.feed(response) + parser.close()
+
+    async def _astream_completion(self, request: Dict) -> AsyncIterator[str]:
+        if self.astream_fn is not None:
+            async for piece in self.astream_fn(**request):
+                yield piece
+            return
+
+        # Pump the blocking stream from a worker thread into the event loop
+        loop = asyncio.get_running_loop()
+        pieces: asyncio.Queue = asyncio.Queue()
+        finished = object()
+        # Set when the consumer goes away, so the thread stops reading upstream
+        stop = threading.Event()
+
+        def pump():
+            stream = None
+            try:
+                stream = self.stream_fn(**request)
+                for piece in stream:
+                    if stop.is_set():
+                        return
+                    loop.call_soon_threadsafe(pieces.put_nowait, piece)
+                loop.call_soon_threadsafe(pieces.put_nowait, finished)
+            except Exception as e:
+                if not stop.is_set():
+                    loop.call_soon_threadsafe(pieces.put_nowait, e)
+            finally:
+                # Drops the upstream connection when the stream is abandoned early
+                if hasattr(stream, 'close'):
+                    stream.close()
+
+        loop.run_in_executor(None, pump)
+        try:
+            while True:
+                piece = await pieces.get()
+                if piece is finished:
+                    return
+                if isinstance(piece, Exception):
+                    raise piece
+                yield piece
+        finally:
+            stop.set()
+
+    async def stream_questions(
+        self,
+        candidate_profile: Dict,
+        emotional_state: Dict,
+        previous_qa: Optional[List[Dict]] = None,
+        num_questions: int = 3,
+    ) -> AsyncIterator[Dict]:
+        """Yield each question as soon as the streamed completion finishes it.
+
+        The first question must arrive within the latency budget and the whole
+        stream within the hedge budget. If upstream fails before any question
+        is produced, the fallback questions are yielded instead.
+        """
+        key = fingerprint(candidate_profile, emotional_state, num_questions, previous_qa)
+        cached = self.cache.get(key)
+        if cached is not None:
+            for question in cached:
+                yield question
+            return
+
+        request = self._completion_request(
+            self._build_context(candidate_profile, emotional_state, previous_qa), num_questions
+        )
+        parser = QuestionStreamParser()
+        questions: List[Dict] = []
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        loop = asyncio.get_running_loop()
+        first_deadline = loop.time() + self.latency_budget
+        final_deadline = loop.time() + self.hedge_budget
+        pieces = self._astream_completion(request)
+        try:
+            async with self._semaphore:
+                while True:
+                    deadline = final_deadline if questions else first_deadline
+                    try:
+                        piece = await asyncio.wait_for(pieces.__anext__(), deadline - loop.time())
+                    except StopAsyncIteration:
+                        break
+                    for question in parser.feed(piece):
+                        questions.append(question)
+                        yield question
+                for question in parser.close():
+                    questions.append(question)
+                    yield question
+        except Exception as e:
+            print(f"Error streaming questions: {str(e) or type(e).__name__}")
+            if not questions:
+                for question in self._get_fallback_questions(candidate_profile):
+                    yield question
+            return
+        finally:
+            await pieces.aclose()
+
+        if questions:
+            self.cache.set(key, questions)
     
     def _get_fallback_questions(self, candidate_profile: Dict) -> List[Dict]:
         """Generate fallback questions when AI generation fails."""
@@ -0,0 +1,151 @@
+import asyncio
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Deque, Dict, Optional, Tuple
+
+import numpy as np
+
+from emotion_analysis import EMOTIONS, emotional_insights_batch, insight_scores
+
+DEFAULT_CAPACITY = 300
+DEFAULT_ALPHA = 0.3
+DEFAULT_IDLE_TIMEOUT = 300.0
+MAX_LIVE_INTERVIEWS = 4096
+
+
+class RealtimeBuffer:
+    """Ring buffer of recent samples for one live interview.
+
+    Alongside the raw samples it keeps an exponential moving average and
+    Welford running mean/variance, so a snapshot costs the same no matter
+    how long the interview has been running.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, alpha: float = DEFAULT_ALPHA):
+        self.samples: Deque[Tuple[datetime, np.ndarray]] = deque(maxlen=capacity)
+        self.alpha = alpha
+        self.ema = np.zeros(len(EMOTIONS))
+        self.mean = np.zeros(len(EMOTIONS))
+        self.m2 = np.zeros(len(EMOTIONS))
+        self.count = 0
+        self.version = 0
+        self.finished = False
+        self.last_update = time.monotonic()
+        self._changed = asyncio.Event()
+
+    def add(self, timestamp: datetime, emotions: Dict[str, float]):
+        x = np.array([emotions.get(emotion, 0.0) for emotion in EMOTIONS], dtype=np.float64)
+        self.samples.append((timestamp, x))
+
+        self.count += 1
+        self.ema = x if self.count == 1 else self.alpha * x + (1 - self.alpha) * self.ema
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+
+        self.version += 1
+        self.last_update = time.monotonic()
+        self._notify()
+
+    def finish(self):
+        self.finished = True
+        self._notify()
+
+    def _notify(self):
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def wait_for_update(self, version: int, timeout: float) -> bool:
+        """Wait until the buffer moves past ``version``; False on timeout."""
+        if self.version != version or self.finished:
+            return True
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def snapshot(self) -> Dict[str, object]:
+        if not self.samples:
+            return {'samples': 0, 'finished': self.finished}
+        timestamp, latest = self.samples[-1]
+        std = np.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else np.zeros(len(EMOTIONS))
+        smoothed = {name: float(score[0]) for name, score in insight_scores(self.ema).items()}
+        return {
+            'timestamp': timestamp.isoformat(),
+            # 0-100 composite scores from the smoothed signal
+            'confidence': round(smoothed['confidence'] * 100, 1),
+            'anxiety': round(smoothed['anxiety'] * 100, 1),
+            'nervousness': round(smoothed['nervousness'] * 100, 1),
+            'insights': {name: str(labels[0]) for name, labels in emotional_insights_batch(self.ema).items()},
+            'latest': dict(zip(EMOTIONS, np.round(latest, 4).tolist())),
+            'ema': dict(zip(EMOTIONS, np.round(self.ema, 4).tolist())),
+            'mean': dict(zip(EMOTIONS, np.round(self.mean, 4).tolist())),
+            'std': dict(zip(EMOTIONS, np.round(std, 4).tolist())),
+            'samples': self.count,
+            'version': self.version,
+            'finished': self.finished,
+        }
+
+
+class RealtimeRegistry:
+    """Per-interview realtime buffers with idle and finished-interview eviction."""
+
+    def __init__(
+        self,
+        capacity: int = DEFAULT_CAPACITY,
+        alpha: float = DEFAULT_ALPHA,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+        max_interviews: int = MAX_LIVE_INTERVIEWS,
+    ):
+        self.capacity = capacity
+        self.alpha = alpha
+        self.idle_timeout = idle_timeout
+        self.max_interviews = max_interviews
+        # How often idle buffers are swept, both from record() and from run_eviction()
+        self.sweep_interval = idle_timeout / 10
+        self._buffers: "OrderedDict[str, RealtimeBuffer]" = OrderedDict()
+        self._last_sweep = time.monotonic()
+
+    def get(self, interview_id: str) -> Optional[RealtimeBuffer]:
+        return self._buffers.get(str(interview_id))
+
+    def record(self, interview_id: str, emotions: Dict[str, float], timestamp: Optional[datetime] = None):
+        if 'error' in emotions:
+            return
+        key = str(interview_id)
+        buffer = self._buffers.pop(key, None) or RealtimeBuffer(self.capacity, self.alpha)
+        self._buffers[key] = buffer
+        buffer.add(timestamp or datetime.utcnow(), emotions)
+
+        while len(self._buffers) > self.max_interviews:
+            _, evicted = self._buffers.popitem(last=False)
+            evicted.finish()
+        if time.monotonic() - self._last_sweep > self.sweep_interval:
+            self.evict_idle()
+
+    def finish(self, interview_id: str):
+        buffer = self._buffers.pop(str(interview_id), None)
+        if buffer is not None:
+            buffer.finish()
+
+    def evict_idle(self):
+        now = time.monotonic()
+        self._last_sweep = now
+        # Buffers are kept in least-recently-updated order
+        while self._buffers:
+            key, buffer = next(iter(self._buffers.items()))
+            if now - buffer.last_update < self.idle_timeout:
+                break
+            del self._buffers[key]
+            buffer.finish()
+
+    async def run_eviction(self):
+        """Sweep idle buffers forever, so quiet interviews end without new samples arriving."""
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            self.evict_idle()
+
+    def __len__(self) -> int:
+        return len(self._buffers)
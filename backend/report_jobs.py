@@ -0,0 +1,166 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy import event
+
+import reports
+
+DEFAULT_WORKERS = int(os.getenv("REPORT_WORKERS", "2"))
+DEFAULT_MAX_JOBS = int(os.getenv("REPORT_MAX_JOBS", "1024"))
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class ReportJob:
+    def __init__(self, job_id: str, interview_id: int, version: int):
+        self.id = job_id
+        self.interview_id = interview_id
+        self.version = version
+        self.status = QUEUED
+        self.error: Optional[str] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def to_dict(self, include_result: bool = False) -> Dict[str, Any]:
+        data = {
+            'job_id': self.id,
+            'interview_id': self.interview_id,
+            'status': self.status,
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+        }
+        if include_result and self.status == DONE:
+            data['report'] = self.result
+        return data
+
+
+class ReportJobQueue:
+    """In-process report generation jobs with idempotent keys and cached results.
+
+    A job's id is the interview id plus that interview's data version. Asking
+    for the same report twice returns the job that is queued, running or
+    already done, not a new one. A finished job doubles as the cached report
+    until ``invalidate`` bumps the version because new emotion samples,
+    questions or feedback arrived. Failed jobs are retried on the next submit.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable,
+        workers: int = DEFAULT_WORKERS,
+        max_jobs: int = DEFAULT_MAX_JOBS,
+        build: Callable = reports.build_interview_report,
+    ):
+        self.session_factory = session_factory
+        self.build = build
+        self.max_jobs = max_jobs
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="report")
+        self._jobs: "OrderedDict[str, ReportJob]" = OrderedDict()
+        self._versions: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.deduplicated = 0
+        self.invalidations = 0
+
+    def _job_id(self, interview_id: int) -> str:
+        return f"{interview_id}-{self._versions.get(interview_id, 0)}"
+
+    def submit(self, interview_id: int) -> ReportJob:
+        """Return the job for the interview's current data, queueing one if needed."""
+        with self._lock:
+            job_id = self._job_id(interview_id)
+            job = self._jobs.get(job_id)
+            if job is not None and job.status != FAILED:
+                self._jobs.move_to_end(job_id)
+                self.deduplicated += 1
+                return job
+            job = self._jobs[job_id] = ReportJob(job_id, interview_id, self._versions.get(interview_id, 0))
+            self.submitted += 1
+            while len(self._jobs) > self.max_jobs:
+                oldest_id, oldest = next(iter(self._jobs.items()))
+                if oldest.status in (QUEUED, RUNNING):
+                    break
+                del self._jobs[oldest_id]
+        self._executor.submit(self._run, job)
+        return job
+
+    def _run(self, job: ReportJob):
+        job.status = RUNNING
+        job.started_at = time.time()
+        db = self.session_factory()
+        try:
+            result = self.build(db, job.interview_id)
+            if result is None:
+                raise LookupError("Interview not found")
+            job.result = result
+            job.status = DONE
+        except Exception as e:
+            job.error = str(e)
+            job.status = FAILED
+        finally:
+            db.close()
+            job.finished_at = time.time()
+
+    def get(self, job_id: str) -> Optional[ReportJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cached_report(self, interview_id: int) -> Optional[Dict[str, Any]]:
+        """The finished report for the interview's current data, if there is one."""
+        with self._lock:
+            job = self._jobs.get(self._job_id(interview_id))
+        if job is not None and job.status == DONE:
+            return job.result
+        return None
+
+    def invalidate(self, interview_id: int):
+        with self._lock:
+            stale = self._jobs.get(self._job_id(interview_id))
+            self._versions[interview_id] = self._versions.get(interview_id, 0) + 1
+            if stale is not None and stale.status == DONE:
+                del self._jobs[stale.id]
+            self.invalidations += 1
+
+    def watch(self, *models):
+        """Invalidate an interview's report on ORM writes to rows carrying its ``interview_id``.
+
+        Core bulk inserts (like ``emotion_store.bulk_save_emotions``) skip
+        these events, so their callers invalidate explicitly.
+        """
+        def changed(mapper, connection, target):
+            interview_id = getattr(target, 'interview_id', None)
+            if interview_id is None and mapper.class_.__tablename__ == 'interviews':
+                interview_id = target.id
+            if interview_id is not None:
+                self.invalidate(interview_id)
+
+        for model in models:
+            for name in ('after_insert', 'after_update', 'after_delete'):
+                event.listen(model, name, changed)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            by_status: Dict[str, int] = {}
+            for job in self._jobs.values():
+                by_status[job.status] = by_status.get(job.status, 0) + 1
+        return {
+            'jobs': len(self._jobs),
+            'submitted': self.submitted,
+            'deduplicated': self.deduplicated,
+            'invalidations': self.invalidations,
+            **by_status,
+        }
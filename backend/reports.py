@@ -0,0 +1,191 @@
+import csv
+import io
+import json
+from typing import Callable, Dict, Iterator, List, Optional
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import Session
+
+import models
+from emotion_analysis import EMOTIONS
+from emotion_rollups import RollupStats, backfill_rollups, load_rollups
+
+EXPORT_FORMATS = ('csv', 'jsonl')
+EXPORT_CHUNK_SIZE = 1000
+
+
+def _average(values: List[Optional[int]]) -> float:
+    values = [v for v in values if v is not None]
+    return round(sum(values) / len(values), 2) if values else 0.0
+
+
+def _recommendations(overall: Dict[str, object]) -> List[str]:
+    insights = overall.get('insights', {})
+    recommendations = []
+    if insights.get('anxiety', {}).get('bands', {}).get('high', 0) > 0.3:
+        recommendations.append('Candidate showed sustained anxiety; consider a warm-up question next time.')
+    if insights.get('nervousness', {}).get('bands', {}).get('high', 0) > 0.3:
+        recommendations.append('Nervousness peaked during the interview; review the questions where it rose.')
+    if insights.get('confidence', {}).get('bands', {}).get('high', 0) > 0.5:
+        recommendations.append('Candidate appeared confident for most of the interview.')
+    return recommendations
+
+
+def build_interview_report(db: Session, interview_id: int) -> Optional[Dict[str, object]]:
+    """Assemble an interview report from precomputed emotion rollups and feedback."""
+    interview = db.query(models.Interview).filter(models.Interview.id == interview_id).first()
+    if interview is None:
+        return None
+
+    minutes = load_rollups(db, interview_id, 'minute')
+    if not minutes and backfill_rollups(db, interview_id):
+        # Interviews saved before rollups (or chunks) existed are backfilled on their first report
+        minutes = load_rollups(db, interview_id, 'minute')
+
+    overall = RollupStats()
+    for _, stats in minutes:
+        overall.merge(stats)
+    overall_summary = overall.summary()
+
+    question_text = dict(
+        db.query(models.Question.id, models.Question.question_text)
+        .filter(models.Question.interview_id == interview_id)
+        .all()
+    )
+    per_question = [
+        {
+            'question_id': row.window_key,
+            'question': question_text.get(row.window_key),
+            'window_start': row.window_start.isoformat() if row.window_start else None,
+            **stats.summary(),
+        }
+        for row, stats in load_rollups(db, interview_id, 'question')
+    ]
+    timeline = [
+        {'window_start': row.window_start.isoformat(), **stats.summary()}
+        for row, stats in minutes
+    ]
+
+    feedback = (
+        db.query(models.InterviewFeedback)
+        .filter(models.InterviewFeedback.interview_id == interview_id)
+        .all()
+    )
+    insights = overall_summary.get('insights', {})
+    report_date = interview.completed_at or interview.scheduled_at
+
+    return {
+        'id': interview.id,
+        'interviewId': interview.id,
+        'interviewerId': interview.interviewer_id,
+        'date': report_date.isoformat() if report_date else None,
+        'type': 'comprehensive',
+        'metrics': {
+            'technicalScore': _average([f.technical_rating for f in feedback]),
+            'communicationScore': _average([f.communication_rating for f in feedback]),
+            'problemSolvingScore': _average([f.problem_solving_rating for f in feedback]),
+            'overallScore': _average([f.overall_rating for f in feedback]),
+            'emotionalMetrics': {
+                name: round(insights.get(name, {}).get('mean', 0.0) * 100, 1)
+                for name in ('confidence', 'anxiety', 'nervousness')
+            },
+        },
+        'feedback': '\n'.join(f.comments for f in feedback if f.comments),
+        'recommendations': _recommendations(overall_summary),
+        'emotions': {
+            'overall': overall_summary,
+            'timeline': timeline,
+            'questions': per_question,
+        },
+    }
+
+
+def iter_emotion_rows(db: Session, interview_id: int, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[List]:
+    """Yield an interview's ``emotion_data`` rows in time order, ``chunk_size`` at a time.
+
+    Each chunk is its own keyset query on (interview_id, timestamp, id), so
+    memory stays bounded and the transaction isn't held open between chunks.
+    """
+    table = models.EmotionData.__table__
+    columns = [table.c.id, table.c.timestamp, table.c.emotion_data, table.c.confidence]
+    last = None
+    while True:
+        query = select(columns).where(table.c.interview_id == interview_id)
+        if last is not None:
+            query = query.where(tuple_(table.c.timestamp, table.c.id) > last)
+        rows = db.execute(query.order_by(table.c.timestamp, table.c.id).limit(chunk_size)).all()
+        db.commit()
+        if not rows:
+            return
+        yield rows
+        last = (rows[-1].timestamp, rows[-1].id)
+
+
+def _csv_lines(rows: List[List]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
+
+
+def iter_report_export(
+    session_factory: Callable[[], Session],
+    interview_id: int,
+    fmt: str = 'csv',
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+) -> Iterator[str]:
+    """Stream an interview's data as CSV or JSON lines.
+
+    CSV holds the emotion timeline, one sample per row. JSON lines start
+    with the interview, its questions and feedback, then one ``emotion``
+    record per sample. The generator opens its own session so it can
+    outlive the request's.
+    """
+    db = session_factory()
+    try:
+        if fmt == 'csv':
+            yield _csv_lines([['timestamp', *EMOTIONS, 'confidence']])
+            for rows in iter_emotion_rows(db, interview_id, chunk_size):
+                yield _csv_lines([
+                    [row.timestamp.isoformat() if row.timestamp else '',
+                     *[(row.emotion_data or {}).get(emotion, '') for emotion in EMOTIONS],
+                     row.confidence]
+                    for row in rows
+                ])
+            return
+
+        interview = db.query(models.Interview).filter(models.Interview.id == interview_id).first()
+        records = [{
+            'type': 'interview',
+            'id': interview.id,
+            'candidate_name': interview.candidate_name,
+            'position': interview.position,
+            'status': interview.status,
+            'scheduled_at': interview.scheduled_at.isoformat() if interview.scheduled_at else None,
+            'completed_at': interview.completed_at.isoformat() if interview.completed_at else None,
+        }]
+        records += [
+            {'type': 'question', 'id': q.id, 'question': q.question_text, 'category': q.category,
+             'difficulty': q.difficulty, 'answer': q.answer}
+            for q in db.query(models.Question).filter(models.Question.interview_id == interview_id)
+        ]
+        records += [
+            {'type': 'feedback', 'id': f.id, 'user_id': f.user_id, 'technical_rating': f.technical_rating,
+             'communication_rating': f.communication_rating, 'problem_solving_rating': f.problem_solving_rating,
+             'overall_rating': f.overall_rating, 'comments': f.comments}
+            for f in db.query(models.InterviewFeedback).filter(models.InterviewFeedback.interview_id == interview_id)
+        ]
+        yield ''.join(json.dumps(record) + '\n' for record in records)
+        db.commit()
+
+        for rows in iter_emotion_rows(db, interview_id, chunk_size):
+            yield ''.join(
+                json.dumps({
+                    'type': 'emotion',
+                    'timestamp': row.timestamp.isoformat() if row.timestamp else None,
+                    'emotions': row.emotion_data,
+                    'confidence': row.confidence,
+                }) + '\n'
+                for row in rows
+            )
+    finally:
+        db.close()
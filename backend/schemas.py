@@ -63,6 +63,23 @@ class EmotionData(EmotionDataBase):
     class Config:
         orm_mode = True
 
+class EmotionDataPage(BaseModel):
+    items: List[EmotionData]
+    next_cursor: Optional[str] = None
+
+class EmotionSample(BaseModel):
+    timestamp: datetime
+    emotions: Dict[str, Any] = {}
+    scores: Optional[Dict[str, float]] = None
+    confidence: Optional[float] = None
+
+class EmotionSampleBatch(BaseModel):
+    emotions: List[EmotionSample]
+
+class EmotionSaveResult(BaseModel):
+    saved: int
+    skipped: int
+
 class QuestionBase(BaseModel):
     question_text: str
     category: str
@@ -81,6 +98,17 @@ class Question(QuestionBase):
     class Config:
         orm_mode = True
 
+class QuestionGenerateRequest(BaseModel):
+    candidateProfile: Dict[str, Any] = {}
+    emotionalState: Dict[str, Any] = {}
+    previousQa: Optional[List[Dict[str, str]]] = None
+    numQuestions: int = 3
+
+class GeneratedQuestion(BaseModel):
+    question: str
+    follow_up_questions: List[str] = []
+    context: str = ''
+
 class InterviewFeedbackBase(BaseModel):
     technical_rating: int
     communication_rating: int
@@ -101,4 +129,14 @@ class InterviewFeedback(InterviewFeedbackBase):
     updated_at: datetime
 
     class Config:
-        orm_mode = True 
\ No newline at end of file
+        orm_mode = True 
+
+class InterviewListItem(Interview):
+    scheduled_at: Optional[datetime]
+    questions: List[Question] = []
+    feedback: List[InterviewFeedback] = []
+    emotion_count: int = 0
+
+class InterviewPage(BaseModel):
+    items: List[InterviewListItem]
+    next_cursor: Optional[str] = None
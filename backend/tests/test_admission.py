@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+import models
+from admission import AdmissionController, AdmissionRejected
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def controller(clock: Clock, **options) -> AdmissionController:
+    options = {'max_inflight': 2, 'max_queue': 2, 'interval_ms': 1000, 'max_interval_ms': 10000,
+               'target_load': 1.0, **options}
+    return AdmissionController(clock=clock, **options)
+
+
+def test_full_queue_is_rejected_and_hints_back_off_then_recover():
+    clock = Clock()
+    admission = controller(clock)
+
+    async def scenario():
+        await admission.acquire('a')
+        await admission.acquire('b')
+        waiting = [asyncio.ensure_future(admission.acquire(key)) for key in ('c', 'd')]
+        await asyncio.sleep(0)
+        assert admission.queue_depth() == 2
+
+        with pytest.raises(AdmissionRejected) as rejected:
+            await admission.acquire('e')
+        assert rejected.value.retry_after >= 1
+        assert admission.stats()['rejected'] == 1
+        # Nothing is known about service time yet, so clients keep the normal pace
+        assert admission.next_interval_ms() == 1000
+
+        # 2s per frame over two slots: five active sessions need 5s between frames each
+        admission.release(2.0)
+        await asyncio.sleep(0)
+        assert admission.queue_depth() == 1
+        assert admission.next_interval_ms() == 5000
+        assert admission.retry_after() == 5
+
+        # Sessions turned away still count, pushing the hint up to the cap
+        waiting.append(asyncio.ensure_future(admission.acquire('f')))
+        await asyncio.sleep(0)
+        for key in 'ghijklmn':
+            with pytest.raises(AdmissionRejected):
+                await admission.acquire(key)
+        assert admission.next_interval_ms() == 10000
+
+        # Fast frames and sessions going quiet bring it back down to the normal pace
+        for _ in range(4):
+            admission.release(0.05)
+        await asyncio.gather(*waiting)
+        for _ in range(20):
+            await admission.acquire()
+            admission.release(0.05)
+        clock.now += admission.session_window + 1
+        assert admission.active_sessions() == 0
+        assert admission.next_interval_ms() == 1000
+        assert admission.stats()['inflight'] == 0
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_gives_up_its_place():
+    admission = controller(Clock(), max_inflight=1, max_queue=1)
+
+    async def scenario():
+        await admission.acquire('a')
+        waiter = asyncio.ensure_future(admission.acquire('b'))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        assert admission.queue_depth() == 0
+        # The freed queue place can be taken again
+        queued = asyncio.ensure_future(admission.acquire('c'))
+        await asyncio.sleep(0)
+        admission.release(0.1)
+        await queued
+        assert admission.stats()['inflight'] == 1
+
+    asyncio.run(scenario())
+
+
+@pytest.fixture
+def saturated(monkeypatch):
+    admission = AdmissionController(max_inflight=1, max_queue=0)
+    asyncio.run(admission.acquire('busy'))
+    monkeypatch.setattr(main, 'analysis_admission', admission)
+    user = models.User(id=1, email='owner@example.com', name='owner', role='interviewer')
+    main.app.dependency_overrides[main.get_current_user] = lambda: user
+    yield admission
+    main.app.dependency_overrides.clear()
+
+
+def test_saturated_analysis_returns_429_with_retry_after(saturated):
+    response = TestClient(main.app).post(
+        '/api/emotions/analyze', data=b'frame', headers={'Content-Type': 'application/octet-stream'},
+    )
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) == saturated.retry_after()
+    assert saturated.stats()['rejected'] == 1
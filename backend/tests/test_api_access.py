@@ -0,0 +1,122 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+import models
+from emotion_analysis import EMOTIONS
+
+START = datetime(2024, 1, 1, 9)
+SCORES = {emotion: 1.0 / len(EMOTIONS) for emotion in EMOTIONS}
+
+
+class Api:
+    """Test client for the app on the test database, signed in as ``user``."""
+
+    def __init__(self, db):
+        self.db = db
+        self.owner = self.add_user('owner@example.com')
+        self.other = self.add_user('other@example.com')
+        self.user = self.owner
+        self.interview = models.Interview(candidate_name='Candidate', scheduled_at=START, interviewer_id=self.owner.id)
+        db.add(self.interview)
+        db.commit()
+        self.client = TestClient(main.app)
+
+    def add_user(self, email: str) -> models.User:
+        user = models.User(email=email, name=email.split('@')[0], hashed_password='x', role='interviewer')
+        self.db.add(user)
+        self.db.commit()
+        return user
+
+    def as_user(self, user: models.User) -> TestClient:
+        self.user = user
+        return self.client
+
+
+@pytest.fixture
+def api(db):
+    api = Api(db)
+    main.app.dependency_overrides[main.get_db] = lambda: db
+    main.app.dependency_overrides[main.get_current_user] = lambda: api.user
+    yield api
+    main.app.dependency_overrides.clear()
+
+
+def save_payload(count: int = 3):
+    return {'emotions': [
+        {'timestamp': (START + timedelta(seconds=2 * i)).isoformat(), 'emotions': SCORES}
+        for i in range(count)
+    ]}
+
+
+def test_other_users_cannot_save_into_an_interview(api):
+    url = f'/api/emotions/{api.interview.id}/save'
+    assert api.as_user(api.other).post(url, json=save_payload()).status_code == 404
+    assert api.db.query(models.EmotionChunk).count() == 0
+    assert api.db.query(models.EmotionRollup).count() == 0
+
+    assert api.as_user(api.owner).post(url, json=save_payload()).json() == {'saved': 3, 'skipped': 0}
+
+
+def test_missing_and_foreign_interviews_look_the_same(api):
+    client = api.as_user(api.other)
+    foreign = client.post(f'/api/emotions/{api.interview.id}/save', json=save_payload())
+    missing = client.post('/api/emotions/9999/save', json=save_payload())
+    assert foreign.status_code == missing.status_code == 404
+    assert foreign.json() == missing.json()
+
+
+@pytest.mark.parametrize('path', ['/api/reports/{id}', '/api/reports/{id}/export'])
+def test_other_users_cannot_read_reports(api, path):
+    assert api.as_user(api.other).get(path.format(id=api.interview.id)).status_code == 404
+
+
+def test_other_users_cannot_generate_reports(api):
+    assert api.as_user(api.other).post(f'/api/reports/generate/{api.interview.id}').status_code == 404
+
+
+def test_live_buffers_are_per_user(api):
+    main.realtime_registry.record(main.analysis_session(api.owner, 'live-1'), SCORES)
+    try:
+        assert api.as_user(api.owner).get('/api/emotions/live-1/realtime').json()['samples'] == 1
+        assert api.as_user(api.other).get('/api/emotions/live-1/realtime').status_code == 404
+    finally:
+        main.realtime_registry.finish(main.analysis_session(api.owner, 'live-1'))
+
+
+def test_saving_finishes_the_owners_live_buffer(api):
+    session = main.analysis_session(api.owner, api.interview.id)
+    main.realtime_registry.record(session, SCORES)
+    buffer = main.realtime_registry.get(session)
+    api.as_user(api.owner).post(f'/api/emotions/{api.interview.id}/save', json=save_payload())
+    assert buffer.finished
+    assert main.realtime_registry.get(session) is None
+
+
+def test_other_users_cannot_download_a_series(api):
+    api.as_user(api.owner).post(f'/api/emotions/{api.interview.id}/save', json=save_payload())
+    url = f'/api/emotions/{api.interview.id}/series'
+
+    assert api.as_user(api.owner).get(url).json()['count'] == 3
+    assert api.as_user(api.other).get(url).status_code == 404
+    assert api.as_user(api.other).get('/api/emotions/9999/series').status_code == 404
+
+
+def test_other_users_cannot_page_through_emotion_rows(api):
+    api.db.add_all([
+        models.EmotionData(interview_id=api.interview.id, timestamp=START + timedelta(seconds=i), emotion_data=SCORES,
+                           confidence=0.5)
+        for i in range(3)
+    ])
+    api.db.commit()
+    url = f'/api/emotions/{api.interview.id}?limit=2'
+
+    page = api.as_user(api.owner).get(url).json()
+    assert len(page['items']) == 2 and page['next_cursor']
+    rest = api.as_user(api.owner).get(url, params={'cursor': page['next_cursor']}).json()
+    assert len(rest['items']) == 1
+
+    assert api.as_user(api.other).get(url).json() == {'items': [], 'next_cursor': None}
+    assert api.as_user(api.other).get(url, params={'cursor': page['next_cursor']}).json()['items'] == []
@@ -0,0 +1,87 @@
+import numpy as np
+
+from emotion_analysis import EMOTIONS, CropCache, EmotionAnalyzer, FaceTracker
+
+SCORES = {emotion: 1.0 / len(EMOTIONS) for emotion in EMOTIONS}
+
+
+def crop(value: float = 0.5, seed: int = 0) -> np.ndarray:
+    noise = np.random.default_rng(seed).normal(0, 0.002, (1, 48, 48, 1))
+    return (np.full((1, 48, 48, 1), value) + noise).astype(np.float32)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_near_identical_crop_reuses_scores():
+    cache = CropCache(max_diff=0.01, max_age=5, clock=Clock())
+    cache.store(crop(seed=0), SCORES)
+    assert cache.lookup(crop(seed=1)) == SCORES
+    assert cache.stats()['reused'] == 1
+
+
+def test_changed_crop_misses():
+    cache = CropCache(max_diff=0.01, max_age=5, clock=Clock())
+    cache.store(crop(0.5), SCORES)
+    assert cache.lookup(crop(0.55)) is None
+    assert cache.stats()['inferred'] == 1
+
+
+def test_entries_expire_after_max_age():
+    clock = Clock()
+    cache = CropCache(max_diff=0.01, max_age=5, clock=clock)
+    cache.store(crop(), SCORES)
+    clock.now = 5.0
+    assert cache.lookup(crop()) is not None
+    clock.now = 5.1
+    assert cache.lookup(crop()) is None
+
+
+def test_reuse_is_measured_from_the_inferred_crop():
+    cache = CropCache(max_diff=0.01, max_age=60, clock=Clock())
+    cache.store(crop(0.5), SCORES)
+    # Each step is within max_diff of the last, but the drift adds up
+    assert cache.lookup(crop(0.506)) is not None
+    assert cache.lookup(crop(0.512)) is None
+
+
+def test_errors_are_never_cached():
+    cache = CropCache(clock=Clock())
+    cache.store(crop(), {'error': 'No face detected', 'confidence': 0.0})
+    assert cache.lookup(crop()) is None
+
+
+def test_max_diff_zero_turns_reuse_off():
+    cache = CropCache(max_diff=0, clock=Clock())
+    cache.store(crop(), SCORES)
+    assert cache.lookup(crop()) is None
+
+
+def test_analyze_emotion_reusing_only_infers_when_needed():
+    analyzer = EmotionAnalyzer(model_path=None)
+    crops = iter([crop(0.5, seed=0), crop(0.5, seed=1), crop(0.7), crop(0.7, seed=2)])
+    analyzer.preprocess_image = lambda frame, tracker=None: next(crops)
+    calls = []
+
+    def predict_batch(faces):
+        calls.append(len(faces))
+        return np.tile(np.linspace(0.1, 0.2, len(EMOTIONS), dtype=np.float32), (len(faces), 1))
+
+    analyzer.predict_batch = predict_batch
+    clock = Clock()
+    tracker = FaceTracker(crop_cache=CropCache(max_diff=0.01, max_age=5, clock=clock))
+    frame = np.zeros((240, 320, 3), dtype=np.uint8)
+
+    first, reused = analyzer.analyze_emotion_reusing(frame, tracker)
+    assert not reused
+    assert analyzer.analyze_emotion_reusing(frame, tracker) == (first, True)
+    # A different face is inferred, and so is a repeat of it once the entry is too old
+    assert analyzer.analyze_emotion_reusing(frame, tracker)[1] is False
+    clock.now = 10.0
+    assert analyzer.analyze_emotion_reusing(frame, tracker)[1] is False
+    assert calls == [1, 1, 1]
@@ -0,0 +1,103 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from sqlalchemy import event
+
+import emotion_store
+import models
+import reports
+import schemas
+from emotion_analysis import EMOTIONS
+
+START = datetime(2024, 1, 1, 9)
+
+
+def scores(i: int) -> dict:
+    values = np.roll(np.linspace(0.05, 0.35, len(EMOTIONS)), i)
+    return dict(zip(EMOTIONS, (values / values.sum()).tolist()))
+
+
+@pytest.fixture
+def interview(db):
+    interview = models.Interview(candidate_name='Candidate', position='Engineer', scheduled_at=START)
+    db.add(interview)
+    db.commit()
+    return interview
+
+
+def add_legacy_rows(db, interview_id: int, count: int, start: datetime = START):
+    """Rows written straight to emotion_data, as before chunks and rollups existed."""
+    db.add_all([
+        models.EmotionData(
+            interview_id=interview_id, timestamp=start + timedelta(seconds=2 * i),
+            emotion_data=scores(i), confidence=max(scores(i).values()),
+        )
+        for i in range(count)
+    ])
+    # Rows without a full set of scores are never part of the series
+    db.add(models.EmotionData(interview_id=interview_id, timestamp=start, emotion_data={'error': 'No face detected'}))
+    db.commit()
+
+
+def count(db, model, interview_id: int) -> int:
+    return db.query(model).filter(model.interview_id == interview_id).count()
+
+
+def test_legacy_rows_are_packed_once_on_first_read(db, interview):
+    add_legacy_rows(db, interview.id, 700)
+
+    timestamps, values = emotion_store.load_emotion_series(db, interview.id)
+    assert len(timestamps) == 700
+    assert np.all(np.diff(timestamps) == 2.0)
+    assert values[3] == pytest.approx([scores(3)[e] for e in EMOTIONS], abs=1e-6)
+    chunks = count(db, models.EmotionChunk, interview.id)
+    assert chunks == 2
+
+    again, _ = emotion_store.load_emotion_series(db, interview.id)
+    assert np.array_equal(again, timestamps)
+    assert count(db, models.EmotionChunk, interview.id) == chunks
+
+
+def test_bulk_save_keeps_legacy_rows(db, interview):
+    add_legacy_rows(db, interview.id, 10)
+    later = START + timedelta(hours=1)
+    samples = [schemas.EmotionSample(timestamp=later + timedelta(seconds=i), emotions=scores(i)) for i in range(5)]
+
+    assert emotion_store.bulk_save_emotions(db, interview.id, samples) == 5
+    timestamps, _ = emotion_store.load_emotion_series(db, interview.id)
+    assert len(timestamps) == 15
+
+
+def test_report_backfills_legacy_interview(db, interview):
+    add_legacy_rows(db, interview.id, 90)
+
+    report = reports.build_interview_report(db, interview.id)
+    assert report['emotions']['timeline']
+    rollups = count(db, models.EmotionRollup, interview.id)
+    assert rollups > 0
+
+    assert reports.build_interview_report(db, interview.id)['emotions']['timeline'] == report['emotions']['timeline']
+    assert count(db, models.EmotionRollup, interview.id) == rollups
+
+
+def test_report_without_samples_writes_nothing(db, interview):
+    statements = []
+    engine = db.get_bind()
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)  # noqa: E731
+    event.listen(engine, 'before_cursor_execute', listener)
+    try:
+        for _ in range(2):
+            assert reports.build_interview_report(db, interview.id)['emotions']['timeline'] == []
+    finally:
+        event.remove(engine, 'before_cursor_execute', listener)
+    assert not [s for s in statements if s.lstrip().upper().startswith(('INSERT', 'UPDATE', 'DELETE'))]
+
+
+def test_saves_roll_up_only_the_windows_reports_read(db, interview):
+    samples = [schemas.EmotionSample(timestamp=START + timedelta(seconds=2 * i), emotions=scores(i)) for i in range(90)]
+    emotion_store.bulk_save_emotions(db, interview.id, samples)
+
+    granularities = db.query(models.EmotionRollup.granularity, models.EmotionRollup.window_key).all()
+    assert {granularity for granularity, _ in granularities} == {'minute'}
+    assert len(granularities) == 3
@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+import instrumentation
+from emotion_analysis import EmotionAnalyzer, FaceTracker
+
+FRAME = np.zeros((240, 320), dtype=np.uint8)
+BOX = (100, 60, 80, 80)
+
+
+class ScriptedDetector:
+    """Stands in for the cascade: each search returns the next box from its script."""
+
+    def __init__(self, analyzer: EmotionAnalyzer, full=(), region=()):
+        self.full, self.region = list(full), list(region)
+        self.full_calls = self.region_calls = 0
+        analyzer._detect_full = self.detect_full
+        analyzer._detect_in_region = self.detect_in_region
+
+    def detect_full(self, gray, scale=1.0):
+        self.full_calls += 1
+        return self.full.pop(0) if self.full else BOX
+
+    def detect_in_region(self, gray, box, padding):
+        self.region_calls += 1
+        return self.region.pop(0) if self.region else box
+
+
+@pytest.fixture
+def analyzer():
+    instrumentation.face_detections.clear()
+    return EmotionAnalyzer(model_path=None)
+
+
+def test_full_detection_runs_every_redetect_interval(analyzer):
+    detector = ScriptedDetector(analyzer)
+    tracker = FaceTracker(redetect_interval=3)
+
+    for _ in range(8):
+        assert analyzer.detect_face(FRAME, tracker) == BOX
+    # Frames 0 and 4 search the whole frame; the others only the region around the box
+    assert (detector.full_calls, detector.region_calls) == (2, 6)
+    assert tracker.stats()['full_detections'] == 2
+    assert tracker.stats()['tracked_hits'] == 6
+    assert instrumentation.face_detections.snapshot() == {('full',): 2, ('tracked',): 6}
+
+
+def test_small_moves_keep_the_previous_box(analyzer):
+    jitter = (102, 61, 80, 80)
+    moved = (160, 60, 80, 80)
+    ScriptedDetector(analyzer, region=[jitter, moved])
+    tracker = FaceTracker(stable_iou=0.8)
+
+    assert analyzer.detect_face(FRAME, tracker) == BOX
+    assert analyzer.detect_face(FRAME, tracker) == BOX
+    assert analyzer.detect_face(FRAME, tracker) == moved
+
+
+def test_stable_iou_of_one_follows_every_move(analyzer):
+    jitter = (102, 61, 80, 80)
+    ScriptedDetector(analyzer, region=[jitter])
+    tracker = FaceTracker(stable_iou=1.0)
+
+    analyzer.detect_face(FRAME, tracker)
+    assert analyzer.detect_face(FRAME, tracker) == jitter
+
+
+def test_lost_track_falls_back_to_full_detection(analyzer):
+    # The region search loses the face, and so does the full pass that follows
+    detector = ScriptedDetector(analyzer, full=[BOX, None, BOX], region=[None])
+    tracker = FaceTracker(redetect_interval=10)
+
+    assert analyzer.detect_face(FRAME, tracker) == BOX
+    assert analyzer.detect_face(FRAME, tracker) is None
+    assert tracker.box is None
+    # With no box left the next frame goes straight to a full detection
+    assert analyzer.detect_face(FRAME, tracker) == BOX
+    assert (detector.full_calls, detector.region_calls) == (3, 1)
+    assert tracker.stats()['tracked_misses'] == 1
+    assert instrumentation.face_detections.snapshot() == {('full',): 3, ('lost',): 1}
+
+
+def test_detection_counts_are_exported(analyzer):
+    ScriptedDetector(analyzer)
+    tracker = FaceTracker(redetect_interval=2)
+    for _ in range(3):
+        analyzer.detect_face(FRAME, tracker)
+
+    rendered = instrumentation.render()
+    assert '# TYPE face_detections_total counter' in rendered
+    assert 'face_detections_total{kind="full"} 1' in rendered
+    assert 'face_detections_total{kind="tracked"} 2' in rendered
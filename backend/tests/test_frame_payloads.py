@@ -0,0 +1,42 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+import models
+
+
+@pytest.fixture
+def user(monkeypatch):
+    user = models.User(id=1, email='owner@example.com', name='owner', role='interviewer')
+    main.app.dependency_overrides[main.get_current_user] = lambda: user
+    monkeypatch.setattr(main, 'get_user_from_token', lambda token, db: user)
+    yield user
+    main.app.dependency_overrides.clear()
+
+
+@pytest.mark.parametrize('body, detail', [
+    ({'image': 1}, "'image' must be a base64 string"),
+    ({'image': ['data']}, "'image' must be a base64 string"),
+    ({'image': None}, "Missing 'image' field"),
+    (['image'], "Missing 'image' field"),
+    ({'image': 'data:image/jpeg;base64,abcde'}, "Invalid base64 image"),
+])
+def test_malformed_json_frames_are_rejected(user, body, detail):
+    response = TestClient(main.app).post('/api/emotions/analyze', json=body)
+    assert response.status_code == 400
+    assert response.json()['detail'] == detail
+
+
+def test_invalid_json_is_rejected(user):
+    response = TestClient(main.app).post(
+        '/api/emotions/analyze', data='{"image": ', headers={'Content-Type': 'application/json'},
+    )
+    assert response.status_code == 400
+
+
+def test_websocket_answers_text_frames_and_stays_open(user):
+    with TestClient(main.app).websocket_connect('/ws/emotions/live-1?token=t') as websocket:
+        websocket.send_text('{"image": "..."}')
+        assert websocket.receive_json()['error'] == "Send each frame as a binary message"
+        websocket.send_bytes(b'not an image')
+        assert websocket.receive_json()['error'] == "Could not decode image"
@@ -0,0 +1,149 @@
+import os
+
+import numpy as np
+import pytest
+
+from inference_backends import (
+    DEFAULT_TOLERANCE, FACE_SHAPE, InferenceBackend, OnnxRuntimeBackend, TensorFlowBackend, TFLiteBackend,
+    check_agreement, load_backend, sample_faces,
+)
+
+
+@pytest.fixture
+def tf():
+    return pytest.importorskip('tensorflow')
+
+
+def build_model(tf, path: str, seed: int = 0):
+    tf.keras.utils.set_random_seed(seed)
+    model = tf.keras.Sequential([
+        tf.keras.layers.Input(FACE_SHAPE),
+        tf.keras.layers.Conv2D(4, 3, activation='relu'),
+        tf.keras.layers.MaxPooling2D(4),
+        tf.keras.layers.Flatten(),
+        tf.keras.layers.Dense(7, activation='softmax'),
+    ])
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    model.save(path)
+    return model
+
+
+def write_tflite(tf, model, path: str, int8: bool = False):
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    if int8:
+        # Full-integer model: int8 input and output, calibrated on sample faces
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = lambda: ([sample_faces(1, seed)] for seed in range(50))
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        converter.inference_input_type = tf.int8
+        converter.inference_output_type = tf.int8
+    with open(path, 'wb') as f:
+        f.write(converter.convert())
+
+
+def write_onnx(path: str, seed: int = 0):
+    """Dense softmax classifier as ONNX, built without TensorFlow; returns its weights."""
+    onnx = pytest.importorskip('onnx')
+    from onnx import TensorProto, helper, numpy_helper
+
+    rng = np.random.default_rng(seed)
+    weights = (rng.standard_normal((int(np.prod(FACE_SHAPE)), 7)) * 0.05).astype(np.float32)
+    bias = (rng.standard_normal(7) * 0.1).astype(np.float32)
+    graph = helper.make_graph(
+        [
+            helper.make_node('Flatten', ['faces'], ['flat'], axis=1),
+            helper.make_node('MatMul', ['flat', 'weights'], ['logits']),
+            helper.make_node('Add', ['logits', 'bias'], ['shifted']),
+            helper.make_node('Softmax', ['shifted'], ['scores'], axis=1),
+        ],
+        'emotion',
+        [helper.make_tensor_value_info('faces', TensorProto.FLOAT, ['batch', *FACE_SHAPE])],
+        [helper.make_tensor_value_info('scores', TensorProto.FLOAT, ['batch', 7])],
+        initializer=[numpy_helper.from_array(weights, 'weights'), numpy_helper.from_array(bias, 'bias')],
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid('', 13)])
+    model.ir_version = 8
+    onnx.save(model, path)
+    return weights, bias
+
+
+def softmax(logits: np.ndarray) -> np.ndarray:
+    exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+def test_predict_is_abstract():
+    class Incomplete(InferenceBackend):
+        name = 'incomplete'
+        runtime_module = 'numpy'
+
+    with pytest.raises(TypeError):
+        Incomplete('model.bin')
+
+
+def test_tflite_agrees_with_keras(tf, tmp_path):
+    keras_path, tflite_path = str(tmp_path / 'emotion.keras'), str(tmp_path / 'emotion.tflite')
+    write_tflite(tf, build_model(tf, keras_path), tflite_path)
+    backends = [TensorFlowBackend(keras_path), TFLiteBackend(tflite_path)]
+
+    faces = sample_faces()
+    differences = check_agreement(backends, faces)
+    assert differences[0] == 0.0
+    assert differences[1] <= DEFAULT_TOLERANCE
+    assert backends[1].predict(faces).shape == (len(faces), 7)
+
+
+def test_int8_tflite_is_quantized_and_dequantized(tf, tmp_path):
+    keras_path, int8_path = str(tmp_path / 'emotion.keras'), str(tmp_path / 'emotion_int8.tflite')
+    write_tflite(tf, build_model(tf, keras_path), int8_path, int8=True)
+    reference, quantized = TensorFlowBackend(keras_path), TFLiteBackend(int8_path)
+    assert quantized.quantized
+
+    faces = sample_faces(5, seed=1)
+    scores = quantized.predict(faces)
+    assert scores.dtype == np.float32
+    assert np.allclose(scores.sum(axis=1), 1.0, atol=0.05)
+    assert check_agreement([reference, quantized], faces)[1] <= DEFAULT_TOLERANCE
+
+
+def test_same_named_models_are_compared_separately(tf, tmp_path):
+    reference, other = str(tmp_path / 'a' / 'emotion.keras'), str(tmp_path / 'b' / 'emotion.keras')
+    build_model(tf, reference, seed=0)
+    model = build_model(tf, other, seed=1)
+    # Push every face towards one class so the two models clearly disagree
+    weights, bias = model.layers[-1].get_weights()
+    model.layers[-1].set_weights([weights, bias + np.eye(7)[0] * 20])
+    model.save(other)
+
+    backends = [TensorFlowBackend(reference), TensorFlowBackend(other)]
+    assert backends[0].label == backends[1].label
+    differences = check_agreement(backends, sample_faces())
+    assert len(differences) == 2
+    assert differences[1] > DEFAULT_TOLERANCE
+
+    assert load_backend([reference, other]).path == reference
+
+
+def test_onnxruntime_matches_the_model(tmp_path):
+    pytest.importorskip('onnxruntime')
+    path = str(tmp_path / 'emotion.onnx')
+    weights, bias = write_onnx(path)
+
+    faces = sample_faces()
+    scores = OnnxRuntimeBackend(path, intra_op_threads=1).predict(faces)
+    assert scores.dtype == np.float32
+    assert np.allclose(scores, softmax(faces.reshape(len(faces), -1) @ weights + bias), atol=1e-5)
+
+
+def test_int8_onnx_agrees_with_float(tmp_path):
+    pytest.importorskip('onnxruntime')
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    float_path, int8_path = str(tmp_path / 'emotion.onnx'), str(tmp_path / 'emotion_int8.onnx')
+    write_onnx(float_path)
+    quantize_dynamic(float_path, int8_path, weight_type=QuantType.QInt8)
+    assert os.path.getsize(int8_path) < os.path.getsize(float_path) / 2
+
+    backends = [OnnxRuntimeBackend(float_path), OnnxRuntimeBackend(int8_path)]
+    assert check_agreement(backends, sample_faces())[1] <= DEFAULT_TOLERANCE
+    assert load_backend([float_path, int8_path], backend='onnxruntime').path == float_path
@@ -0,0 +1,86 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from inference_batcher import InferenceBatcher
+
+
+class StubAnalyzer:
+    """Scores each face with its own fill value, so callers can tell their results apart."""
+
+    def __init__(self):
+        self.batch_sizes = []
+        # Cleared to hold the worker inside predict_batch until the test sets it
+        self.gate = threading.Event()
+        self.gate.set()
+        self.entered = threading.Event()
+
+    def predict_batch(self, faces: np.ndarray) -> np.ndarray:
+        self.entered.set()
+        self.gate.wait(5)
+        self.batch_sizes.append(len(faces))
+        values = faces[:, 0, 0, 0]
+        if (values < 0).any():
+            raise RuntimeError("model failed")
+        return values[:, None]
+
+    def scores_to_dict(self, scores: np.ndarray):
+        return {'id': float(scores[0])}
+
+
+def face(value: float) -> np.ndarray:
+    return np.full((48, 48, 1), value, dtype=np.float32)
+
+
+@pytest.fixture
+def batcher():
+    batchers = []
+
+    def make(analyzer, **options):
+        batchers.append(InferenceBatcher(analyzer, **options))
+        return batchers[-1]
+
+    yield make
+    for b in batchers:
+        b.stop(timeout=5)
+
+
+def test_concurrent_submits_share_bounded_batches(batcher):
+    analyzer = StubAnalyzer()
+    analyzer.gate.clear()
+    inference = batcher(analyzer, max_batch_size=4, max_wait_ms=50)
+
+    # The first face holds the worker, so the rest pile up and must be split into batches of four
+    first = inference.submit_face(face(0))
+    assert analyzer.entered.wait(5)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = list(pool.map(lambda i: inference.submit_face(face(i)), range(1, 20)))
+    analyzer.gate.set()
+
+    results = [f.result(timeout=5) for f in [first] + futures]
+    assert [r['id'] for r in results] == list(range(20))
+    assert analyzer.batch_sizes[0] == 1
+    assert max(analyzer.batch_sizes) == 4
+    assert sum(analyzer.batch_sizes) == 20
+    assert inference.stats()['batches_run'] == len(analyzer.batch_sizes) < 20
+
+
+def test_model_errors_reach_every_caller_in_the_batch(batcher):
+    analyzer = StubAnalyzer()
+    analyzer.gate.clear()
+    inference = batcher(analyzer, max_batch_size=4, max_wait_ms=50)
+
+    first = inference.submit_face(face(0))
+    assert analyzer.entered.wait(5)
+    failing = [inference.submit_face(face(value)) for value in (1, -1, 2)]
+    analyzer.gate.set()
+
+    assert first.result(timeout=5) == {'id': 0.0}
+    for future in failing:
+        with pytest.raises(RuntimeError, match="model failed"):
+            future.result(timeout=5)
+    assert analyzer.batch_sizes == [1, 3]
+    # The worker keeps serving after a failed batch
+    assert inference.submit_face(face(5)).result(timeout=5) == {'id': 5.0}
@@ -0,0 +1,70 @@
+import asyncio
+import logging
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+import instrumentation
+from instrumentation import MetricsMiddleware
+
+
+@pytest.fixture
+def client():
+    instrumentation.request_seconds.clear()
+    instrumentation.stream_seconds.clear()
+    instrumentation._slow_traces.clear()
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware, slow_request_ms=100)
+
+    @app.get("/fast")
+    async def fast():
+        return {"ok": True}
+
+    @app.get("/slow")
+    async def slow():
+        await asyncio.sleep(0.15)
+        return {"ok": True}
+
+    @app.get("/events")
+    async def events():
+        async def body():
+            for i in range(3):
+                await asyncio.sleep(0.1)
+                yield f"data: {i}\n\n"
+
+        return StreamingResponse(body(), media_type="text/event-stream")
+
+    @app.get("/export")
+    async def export():
+        async def body():
+            for i in range(3):
+                await asyncio.sleep(0.1)
+                yield f"{i}\n"
+
+        return StreamingResponse(body(), media_type="text/csv")
+
+    yield TestClient(app)
+    instrumentation._slow_traces.clear()
+
+
+def total_seconds(histogram, route):
+    return sum(total for (_, r, _), (_, total) in histogram.snapshot().items() if r == route)
+
+
+def test_slow_requests_are_traced_and_logged(client, caplog):
+    with caplog.at_level(logging.WARNING, logger='instrumentation'):
+        assert client.get("/fast").status_code == 200
+        assert client.get("/slow").status_code == 200
+    assert [t['route'] for t in instrumentation.slow_traces()] == ["/slow"]
+    assert "Slow request GET /slow -> 200" in caplog.text
+
+
+@pytest.mark.parametrize('route', ["/events", "/export"])
+def test_streamed_responses_are_timed_to_first_byte(client, route):
+    assert client.get(route).status_code == 200
+    assert instrumentation.slow_traces() == []
+    assert total_seconds(instrumentation.request_seconds, route) < 0.1
+    assert total_seconds(instrumentation.stream_seconds, route) >= 0.25
+    assert f'http_stream_duration_seconds_count{{method="GET",route="{route}",status="200"}} 1' in instrumentation.render()
@@ -0,0 +1,143 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import question_cache
+from question_cache import QuestionCache, fingerprint
+from question_generator import QuestionGenerator
+
+PROFILE = {'role': 'Software Engineer', 'experience': '5 years', 'skills': ['Python', 'SQL']}
+STATE = {'confidence': 'high', 'anxiety': 'low', 'nervousness': 'low'}
+COMPLETION = "Q: Describe a system you designed.\nContext: Architecture\nFollow-up: What would you change?\n"
+
+
+class StubCompletion:
+    """completion_fn stand-in that counts calls and can hold them until released."""
+
+    def __init__(self, content: str = COMPLETION):
+        self.content = content
+        self.calls = 0
+        self.release = threading.Event()
+        self.release.set()
+        self._lock = threading.Lock()
+
+    def __call__(self, **request) -> str:
+        with self._lock:
+            self.calls += 1
+        self.release.wait(5)
+        return self.content
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(question_cache.time, 'time', lambda: now[0])
+    return now
+
+
+def test_fingerprint_ignores_case_whitespace_and_skill_order():
+    same = {'role': '  software   ENGINEER', 'experience': '5 Years', 'skills': ['sql', 'Python', 'python', '']}
+    assert fingerprint(PROFILE, STATE, 3) == fingerprint(same, {**STATE, 'ignored': 'x'}, 3)
+
+
+@pytest.mark.parametrize('change', [
+    dict(profile={**PROFILE, 'skills': ['Python']}),
+    dict(state={**STATE, 'anxiety': 'high'}),
+    dict(num_questions=4),
+    dict(previous_qa=[{'question': 'Why Python?', 'answer': 'Speed of iteration'}]),
+])
+def test_fingerprint_changes_with_prompt_inputs(change):
+    key = fingerprint(
+        change.get('profile', PROFILE), change.get('state', STATE),
+        change.get('num_questions', 3), change.get('previous_qa'),
+    )
+    assert key != fingerprint(PROFILE, STATE, 3)
+
+
+def test_lru_evicts_least_recently_used():
+    cache = QuestionCache(max_entries=2)
+    cache.set('a', [{'question': 'a'}])
+    cache.set('b', [{'question': 'b'}])
+    assert cache.get('a') is not None
+    cache.set('c', [{'question': 'c'}])
+
+    assert cache.get('b') is None
+    assert cache.get('a') == [{'question': 'a'}]
+    assert cache.get('c') == [{'question': 'c'}]
+    assert cache.stats()['evictions'] == 1
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = QuestionCache(ttl=60)
+    cache.set('a', [{'question': 'a'}])
+    clock[0] += 59
+    assert cache.get('a') is not None
+    clock[0] += 2
+    assert cache.get('a') is None
+    assert cache.stats()['expired'] == 1
+    assert cache.stats()['entries'] == 0
+
+
+def test_values_are_copies():
+    cache = QuestionCache()
+    cache.set('a', [{'question': 'a', 'follow_up_questions': []}])
+    cache.get('a')[0]['follow_up_questions'].append('mutated')
+    assert cache.get('a') == [{'question': 'a', 'follow_up_questions': []}]
+
+
+def test_sqlite_backing_survives_restart(tmp_path, clock):
+    path = str(tmp_path / 'questions.db')
+    QuestionCache(ttl=60, db_path=path).set('a', [{'question': 'a'}])
+
+    restarted = QuestionCache(ttl=60, db_path=path)
+    assert restarted.get('a') == [{'question': 'a'}]
+    assert restarted.stats()['hits'] == 1
+
+    clock[0] += 61
+    assert QuestionCache(ttl=60, db_path=path).get('a') is None
+
+
+def test_generate_questions_caches_by_fingerprint():
+    completion = StubCompletion()
+    generator = QuestionGenerator(completion_fn=completion, cache=QuestionCache())
+
+    first = generator.generate_questions(PROFILE, STATE)
+    again = generator.generate_questions({**PROFILE, 'role': 'software engineer'}, STATE)
+    assert first == again == [{
+        'question': 'Describe a system you designed.',
+        'follow_up_questions': ['What would you change?'],
+        'context': 'Architecture',
+    }]
+    assert completion.calls == 1
+
+
+def test_concurrent_identical_requests_share_one_completion():
+    completion = StubCompletion()
+    completion.release.clear()
+    cache = QuestionCache()
+    generator = QuestionGenerator(completion_fn=completion, cache=cache)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = [pool.submit(generator.generate_questions, PROFILE, STATE) for _ in range(4)]
+        deadline = time.monotonic() + 5
+        while cache.stats()['coalesced'] < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        completion.release.set()
+        results = [future.result(timeout=5) for future in results]
+
+    assert completion.calls == 1
+    assert all(result == results[0] for result in results)
+    assert cache.stats()['coalesced'] == 3
+
+
+def test_empty_completion_is_not_cached():
+    completion = StubCompletion(content='')
+    cache = QuestionCache()
+    generator = QuestionGenerator(completion_fn=completion, cache=cache)
+
+    assert generator.generate_questions(PROFILE, STATE) == []
+    assert generator.generate_questions(PROFILE, STATE) == []
+    assert completion.calls == 2
+    assert cache.stats()['entries'] == 0
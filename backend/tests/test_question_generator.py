@@ -0,0 +1,236 @@
+import asyncio
+import json
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from question_cache import QuestionCache
+from question_generator import QuestionGenerator, QuestionStreamParser
+
+STATE = {'confidence': 'neutral', 'anxiety': 'low', 'nervousness': 'low'}
+PROFILE = {'role': 'Software Engineer', 'skills': ['Python']}
+COMPLETION = (
+    "Q: How do you review code?\n"
+    "Context: Collaboration\n"
+    "Follow-up: What do you look for first?\n"
+    "Follow up: How do you handle disagreement?\n"
+    "\n"
+    "2. Describe a production incident you handled.\n"
+    "Note: Operations\n"
+    "Question: What are you learning now?\n"
+    "Follow-up: Why that?"
+)
+EXPECTED = [
+    {
+        'question': 'How do you review code?',
+        'follow_up_questions': ['What do you look for first?', 'How do you handle disagreement?'],
+        'context': 'Collaboration',
+    },
+    {'question': 'Describe a production incident you handled.', 'follow_up_questions': [], 'context': 'Operations'},
+    {'question': 'What are you learning now?', 'follow_up_questions': ['Why that?'], 'context': ''},
+]
+
+
+class FakeCompletionServer(ThreadingHTTPServer):
+    """Chat-completion endpoint that answers after ``delay`` and records peak concurrency."""
+
+    daemon_threads = True
+
+    def __init__(self, delay: float):
+        super().__init__(('127.0.0.1', 0), FakeCompletionHandler)
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f'http://127.0.0.1:{self.server_address[1]}/v1/chat/completions'
+
+
+class FakeCompletionHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        server = self.server
+        self.rfile.read(int(self.headers['Content-Length']))
+        with server.lock:
+            server.requests += 1
+            server.active += 1
+            server.peak = max(server.peak, server.active)
+        try:
+            time.sleep(server.delay)
+            body = json.dumps({'choices': [{'message': {'content': 'Q: Tell me about yourself.\n'}}]}).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = FakeCompletionServer(delay=0.6)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def http_completion(url: str):
+    def completion(**request) -> str:
+        post = urllib.request.Request(url, data=json.dumps(request).encode(), headers={'Content-Type': 'application/json'})
+        with urllib.request.urlopen(post, timeout=5) as response:
+            return json.load(response)['choices'][0]['message']['content']
+
+    return completion
+
+
+def test_timed_out_thread_calls_keep_their_slots(server):
+    generator = QuestionGenerator(
+        completion_fn=http_completion(server.url), cache=QuestionCache(),
+        max_concurrency=2, latency_budget=0.2, hedge=False,
+    )
+
+    async def wave(first: int):
+        profiles = [{'role': f'role {i}'} for i in range(first, first + 2)]
+        return await asyncio.gather(*(generator.agenerate_questions(p, STATE) for p in profiles))
+
+    async def scenario():
+        # The first wave times out while its calls are still upstream; the
+        # second must wait for those calls instead of starting two more
+        first = await wave(0)
+        second = await wave(2)
+        await asyncio.sleep(server.delay + 0.2)
+        return first + second
+
+    results = asyncio.run(scenario())
+    assert all(result == generator._get_fallback_questions({}) for result in results)
+    assert server.peak <= 2
+    assert server.requests == 2
+
+
+def test_slots_are_reused_after_calls_finish(server):
+    server.delay = 0.05
+    generator = QuestionGenerator(completion_fn=http_completion(server.url), cache=QuestionCache(), max_concurrency=2)
+
+    async def scenario():
+        profiles = [{'role': f'role {i}'} for i in range(5)]
+        return await asyncio.gather(*(generator.agenerate_questions(p, STATE) for p in profiles))
+
+    results = asyncio.run(scenario())
+    assert all(result[0]['question'] == 'Tell me about yourself.' for result in results)
+    assert server.peak <= 2
+    assert server.requests == 5
+
+
+def parse_in_pieces(text: str, size: int):
+    parser = QuestionStreamParser()
+    completed = []
+    for start in range(0, len(text), size):
+        completed.append(parser.feed(text[start:start + size]))
+    return completed, parser.close()
+
+
+@pytest.mark.parametrize('size', [1, 2, 3, 7, 16, len(COMPLETION)])
+def test_parser_is_independent_of_chunk_boundaries(size):
+    completed, closed = parse_in_pieces(COMPLETION, size)
+    assert [q for batch in completed for q in batch] + closed == EXPECTED
+
+
+def test_parser_holds_a_question_until_the_next_one_starts():
+    completed, closed = parse_in_pieces(COMPLETION, 1)
+    emitted = [q for batch in completed for q in batch]
+    # The last question and its follow-up only arrive on close
+    assert emitted == EXPECTED[:2]
+    assert closed == EXPECTED[2:]
+
+
+def test_parser_flushes_an_unterminated_final_line():
+    parser = QuestionStreamParser()
+    assert parser.feed('Q: First?\nQ: Sec') == []
+    assert parser.close() == [
+        {'question': 'First?', 'follow_up_questions': [], 'context': ''},
+        {'question': 'Sec', 'follow_up_questions': [], 'context': ''},
+    ]
+    assert parser.close() == []
+
+
+def test_parser_ignores_details_before_the_first_question():
+    parser = QuestionStreamParser()
+    assert parser.feed('Context: orphan\nFollow-up: orphan\n') == []
+    assert parser.close() == []
+
+
+def pieces_of(text: str, size: int):
+    return [text[start:start + size] for start in range(0, len(text), size)]
+
+
+async def collect(stream):
+    return [question async for question in stream]
+
+
+def test_stream_questions_from_a_thread_stream():
+    generator = QuestionGenerator(stream_fn=lambda **request: iter(pieces_of(COMPLETION, 5)), cache=QuestionCache())
+    assert asyncio.run(collect(generator.stream_questions(PROFILE, STATE))) == EXPECTED
+    # The finished stream is cached for the next caller
+    generator.stream_fn = None
+    assert asyncio.run(collect(generator.stream_questions(PROFILE, STATE))) == EXPECTED
+
+
+def test_stream_questions_from_an_async_stream():
+    async def astream(**request):
+        for piece in pieces_of(COMPLETION, 4):
+            await asyncio.sleep(0)
+            yield piece
+
+    generator = QuestionGenerator(astream_fn=astream, cache=QuestionCache())
+    assert asyncio.run(collect(generator.stream_questions(PROFILE, STATE))) == EXPECTED
+
+
+def test_stream_questions_falls_back_when_upstream_fails_first():
+    def failing(**request):
+        yield 'Q: never fini'
+        raise ConnectionError('upstream reset')
+
+    cache = QuestionCache()
+    generator = QuestionGenerator(stream_fn=failing, cache=cache)
+    results = asyncio.run(collect(generator.stream_questions(PROFILE, STATE)))
+    assert results == generator._get_fallback_questions(PROFILE)
+    assert cache.stats()['entries'] == 0
+
+
+def test_abandoned_stream_stops_reading_upstream():
+    produced = []
+    closed = threading.Event()
+
+    def slow_stream(**request):
+        try:
+            for i in range(1000):
+                produced.append(i)
+                yield f'Q: Question {i}?\n'
+                time.sleep(0.01)
+        finally:
+            closed.set()
+
+    generator = QuestionGenerator(stream_fn=slow_stream, cache=QuestionCache())
+
+    async def scenario():
+        stream = generator.stream_questions(PROFILE, STATE)
+        first = await stream.__anext__()
+        # What a client disconnect does to the response body iterator
+        await stream.aclose()
+        return first
+
+    assert asyncio.run(scenario())['question'] == 'Question 0?'
+    assert closed.wait(2)
+    assert len(produced) < 50
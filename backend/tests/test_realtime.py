@@ -0,0 +1,37 @@
+import asyncio
+
+from emotion_analysis import EMOTIONS
+from realtime import RealtimeRegistry
+
+SAMPLE = {emotion: 1.0 / len(EMOTIONS) for emotion in EMOTIONS}
+
+
+def test_finish_ends_the_stream():
+    async def scenario():
+        registry = RealtimeRegistry()
+        registry.record(7, SAMPLE)
+        buffer = registry.get('7')
+        waiter = asyncio.ensure_future(buffer.wait_for_update(buffer.version, timeout=5))
+        await asyncio.sleep(0)
+        registry.finish(7)
+        assert await waiter
+        assert buffer.finished
+        assert registry.get('7') is None
+
+    asyncio.run(scenario())
+
+
+def test_run_eviction_ends_idle_interviews_without_new_samples():
+    async def scenario():
+        registry = RealtimeRegistry(idle_timeout=0.05)
+        registry.record('quiet', SAMPLE)
+        buffer = registry.get('quiet')
+        task = asyncio.ensure_future(registry.run_eviction())
+        try:
+            await asyncio.sleep(0.2)
+        finally:
+            task.cancel()
+        assert buffer.finished
+        assert len(registry) == 0
+
+    asyncio.run(scenario())
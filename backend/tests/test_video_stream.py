@@ -0,0 +1,89 @@
+import threading
+
+import cv2
+import numpy as np
+import pytest
+
+from emotion_analysis import EmotionAnalyzer
+from video_stream import FrameReader
+
+FPS = 10
+FRAMES = 30
+
+
+@pytest.fixture(scope='module')
+def clip(tmp_path_factory):
+    """A 3s MJPEG clip whose frame brightness encodes the frame index."""
+    path = str(tmp_path_factory.mktemp('video') / 'clip.avi')
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), FPS, (64, 48))
+    assert writer.isOpened()
+    for index in range(FRAMES):
+        writer.write(np.full((48, 64, 3), index * 8, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+def brightness_index(frame: np.ndarray) -> int:
+    return int(round(frame.mean() / 8))
+
+
+def reader_threads():
+    return [t for t in threading.enumerate() if t.name == 'frame-reader']
+
+
+def test_reads_every_frame_in_order(clip):
+    with FrameReader(clip) as reader:
+        frames = list(reader)
+    assert [index for _, index, _ in frames] == list(range(FRAMES))
+    assert [brightness_index(frame) for _, _, frame in frames] == list(range(FRAMES))
+    assert [timestamp for timestamp, _, _ in frames] == pytest.approx([i / FPS for i in range(FRAMES)])
+    assert reader.frames_decoded == FRAMES
+    assert reader.frames_skipped == 0
+
+
+def test_target_fps_decodes_only_sampled_frames(clip):
+    with FrameReader(clip, target_fps=2.5) as reader:
+        frames = list(reader)
+    assert [index for _, index, _ in frames] == list(range(0, FRAMES, 4))
+    assert [brightness_index(frame) for _, _, frame in frames] == list(range(0, FRAMES, 4))
+    assert reader.frames_decoded == len(frames)
+    assert reader.frames_skipped == FRAMES - len(frames)
+
+
+def test_file_reader_blocks_instead_of_dropping(clip):
+    reader = FrameReader(clip, max_queue=4).start()
+    try:
+        first = reader.get_batch(max_items=2, timeout=5)
+        rest = list(reader)
+    finally:
+        reader.stop()
+    assert [index for _, index, _ in first + rest] == list(range(FRAMES))
+    assert reader.frames_dropped == 0
+
+
+def test_stop_releases_a_blocked_decoder(clip):
+    reader = FrameReader(clip, max_queue=2).start()
+    assert reader.get_batch(timeout=5)
+    thread = reader._thread
+    reader.stop()
+    assert not thread.is_alive()
+    assert reader.frames_decoded < FRAMES
+    assert reader.get_batch(timeout=0.1) == []
+
+
+def test_stream_video_yields_records_in_order_and_closes_the_reader(clip):
+    analyzer = EmotionAnalyzer()
+    analyzer.model = object()  # Blank frames have no face, so the model is never called
+    records = list(analyzer.stream_video(clip, target_fps=5, batch_size=3))
+    assert [record['frame_index'] for record in records] == list(range(0, FRAMES, 2))
+    assert all(record['emotions'].get('error') == 'No face detected' for record in records)
+
+    stream = analyzer.stream_video(clip, max_queue=2)
+    assert next(stream)['frame_index'] == 0
+    stream.close()
+    assert reader_threads() == []
+
+
+def test_unopenable_source_raises(tmp_path):
+    with pytest.raises(ValueError):
+        FrameReader(str(tmp_path / 'missing.avi')).start()
@@ -0,0 +1,154 @@
+import collections
+import threading
+import time
+from typing import Deque, List, Optional, Tuple, Union
+
+import cv2
+import numpy as np
+
+# (timestamp in seconds, frame index, BGR frame)
+TimedFrame = Tuple[float, int, np.ndarray]
+
+
+class FrameReader:
+    """Decodes a video source on a background thread into a bounded queue.
+
+    Live sources (camera indexes and network streams) drop the oldest queued
+    frame when the consumer falls behind, so analysis always works on recent
+    frames. Recorded files block the decoder instead, so every sampled frame
+    is analyzed and a file is processed as fast as the consumer allows.
+    Either way at most ``max_queue`` frames are held in memory.
+
+    With ``target_fps`` set, frames between samples are only grabbed and never
+    decoded.
+    """
+
+    def __init__(
+        self,
+        source: Union[int, str] = 0,
+        target_fps: Optional[float] = None,
+        max_queue: int = 32,
+        drop_oldest: Optional[bool] = None,
+    ):
+        if max_queue < 1:
+            raise ValueError("max_queue must be at least 1")
+        if target_fps is not None and target_fps <= 0:
+            raise ValueError("target_fps must be positive")
+        self.source = source
+        self.is_live = isinstance(source, int) or str(source).startswith(("rtsp://", "http://", "https://"))
+        self.drop_oldest = self.is_live if drop_oldest is None else drop_oldest
+        self.interval = 1.0 / target_fps if target_fps else 0.0
+        self.max_queue = max_queue
+
+        self._frames: Deque[TimedFrame] = collections.deque()
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._done = False
+        self._thread: Optional[threading.Thread] = None
+        self._cap = None
+
+        self.frames_decoded = 0
+        self.frames_skipped = 0
+        self.frames_dropped = 0
+
+    def start(self) -> "FrameReader":
+        self._cap = cv2.VideoCapture(self.source)
+        if not self._cap.isOpened():
+            self._cap.release()
+            raise ValueError("Could not open video source")
+        self._thread = threading.Thread(target=self._run, name="frame-reader", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        with self._cond:
+            self._frames.clear()
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "FrameReader":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _timestamp(self, index: int, fps: float, started: float) -> float:
+        if self.is_live:
+            return time.monotonic() - started
+        if fps > 0:
+            return index / fps
+        return self._cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+
+    def _put(self, item: TimedFrame) -> bool:
+        with self._cond:
+            # stop() may have cleared the queue while this frame was decoding
+            if self._stop.is_set():
+                return False
+            while len(self._frames) >= self.max_queue:
+                if self.drop_oldest:
+                    self._frames.popleft()
+                    self.frames_dropped += 1
+                    break
+                self._cond.wait()
+                if self._stop.is_set():
+                    return False
+            self._frames.append(item)
+            self._cond.notify_all()
+        return True
+
+    def _run(self):
+        cap = self._cap
+        fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+        started = time.monotonic()
+        next_sample = 0.0
+        index = -1
+        try:
+            while not self._stop.is_set():
+                if not cap.grab():
+                    break
+                index += 1
+                timestamp = self._timestamp(index, fps, started)
+
+                if self.interval:
+                    if timestamp + 1e-6 < next_sample:
+                        self.frames_skipped += 1
+                        continue
+                    next_sample += self.interval
+                    if next_sample <= timestamp:
+                        next_sample = timestamp + self.interval
+
+                ret, frame = cap.retrieve()
+                if not ret:
+                    break
+                self.frames_decoded += 1
+                if not self._put((timestamp, index, frame)):
+                    break
+        finally:
+            cap.release()
+            with self._cond:
+                self._done = True
+                self._cond.notify_all()
+
+    def get_batch(self, max_items: int = 1, timeout: Optional[float] = None) -> List[TimedFrame]:
+        """Wait for at least one frame and return up to ``max_items`` queued frames.
+
+        Returns an empty list once the source is exhausted or ``timeout`` expires.
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._frames or self._done, timeout):
+                return []
+            batch = []
+            while self._frames and len(batch) < max_items:
+                batch.append(self._frames.popleft())
+            self._cond.notify_all()
+            return batch
+
+    def __iter__(self):
+        while True:
+            batch = self.get_batch()
+            if not batch:
+                return
+            yield batch[0]
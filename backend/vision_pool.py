@@ -0,0 +1,300 @@
+import asyncio
+import itertools
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_SLOT_SIZE = 4 * 1024 * 1024
+MAX_WORKER_SESSIONS = 256
+# Seconds before respawning a worker that died before it was ready, doubling per failure
+RESTART_BACKOFF = 1.0
+MAX_RESTART_BACKOFF = 60.0
+
+
+class PoolSaturated(Exception):
+    """Raised when every shared-memory slot is already in flight."""
+
+
+class WorkerCrashed(Exception):
+    """Raised for tasks that were running on a worker process that died."""
+
+
+class WorkerError(Exception):
+    """Raised when analysis failed inside a worker for a reason other than a bad frame."""
+
+
+def _worker_main(worker_id: int, tasks, results, slot_names: List[str]):
+    # Heavy imports and model loading happen once per worker process
+    import cv2
+    from emotion_analysis import EmotionAnalyzer, FaceTracker
+
+    analyzer = EmotionAnalyzer()
+    analyzer.warm_up()
+    slots = {name: shared_memory.SharedMemory(name=name) for name in slot_names}
+    trackers: "OrderedDict[str, FaceTracker]" = OrderedDict()
+    results.put(('ready', worker_id, None, None))
+
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            task_id, slot_name, nbytes, session_key = task
+            try:
+                encoded = np.ndarray((nbytes,), dtype=np.uint8, buffer=slots[slot_name].buf)
+                frame = cv2.imdecode(encoded, cv2.IMREAD_COLOR)
+                del encoded
+                if frame is None:
+                    results.put(('invalid', worker_id, task_id, "Could not decode image"))
+                    continue
+
+                tracker = None
+                if session_key is not None:
+                    tracker = trackers.pop(session_key, None) or FaceTracker()
+                    trackers[session_key] = tracker
+                    while len(trackers) > MAX_WORKER_SESSIONS:
+                        trackers.popitem(last=False)
+
+                results.put(('done', worker_id, task_id, analyzer.analyze_emotion_reusing(frame, tracker)))
+            except Exception as e:
+                results.put(('error', worker_id, task_id, f"{type(e).__name__}: {e}"))
+    finally:
+        for shm in slots.values():
+            shm.close()
+
+
+class _Worker:
+    def __init__(self, worker_id: int):
+        self.worker_id = worker_id
+        self.process = None
+        self.tasks = None
+        self.inflight = 0
+        self.ready = False
+        self.startup_failures = 0
+        # Set once the monitor has seen the process die; cleared by the respawn
+        self.respawn_at: Optional[float] = None
+
+
+class VisionWorkerPool:
+    """Pool of warm worker processes for OpenCV/TensorFlow emotion analysis.
+
+    Each worker builds and warms up its own ``EmotionAnalyzer`` once at
+    startup, before it reports ready. Encoded frames are copied into a fixed
+    set of shared-memory slots and only the slot name travels through the
+    task queue, so frame bytes are never pickled. The number of slots bounds
+    how many frames can be in flight; ``submit`` raises ``PoolSaturated``
+    instead of queueing without limit.
+
+    Frames that can't be decoded fail with ``ValueError`` and any other
+    failure inside a worker with ``WorkerError``. Workers that die are
+    restarted and their in-flight tasks fail with ``WorkerCrashed``. A
+    worker that dies before it is ready (a model that fails to load, say)
+    is restarted with exponential backoff instead of on every monitor tick.
+    """
+
+    def __init__(
+        self,
+        num_workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        slot_size: int = DEFAULT_SLOT_SIZE,
+        monitor_interval: float = 1.0,
+    ):
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.num_workers * 4
+        self.slot_size = slot_size
+        self.monitor_interval = monitor_interval
+
+        self._ctx = mp.get_context("spawn")
+        self._results = None
+        self._workers: List[_Worker] = []
+        self._slots: Dict[str, shared_memory.SharedMemory] = {}
+        self._free_slots: "queue.Queue[str]" = queue.Queue()
+        self._pending: Dict[int, tuple] = {}
+        self._lock = threading.Lock()
+        self._task_ids = itertools.count()
+        self._stopping = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.restarts = 0
+
+    def start(self):
+        self._stopping.clear()
+        self._results = self._ctx.Queue()
+        for _ in range(self.max_pending):
+            shm = shared_memory.SharedMemory(create=True, size=self.slot_size)
+            self._slots[shm.name] = shm
+            self._free_slots.put(shm.name)
+        for worker_id in range(self.num_workers):
+            worker = _Worker(worker_id)
+            self._workers.append(worker)
+            self._spawn(worker)
+
+        for target, name in ((self._collect, "vision-results"), (self._monitor, "vision-monitor")):
+            thread = threading.Thread(target=target, name=name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _spawn(self, worker: _Worker):
+        worker.tasks = self._ctx.Queue()
+        worker.inflight = 0
+        worker.ready = False
+        worker.respawn_at = None
+        worker.process = self._ctx.Process(
+            target=_worker_main,
+            args=(worker.worker_id, worker.tasks, self._results, list(self._slots)),
+            name=f"vision-worker-{worker.worker_id}",
+            daemon=True,
+        )
+        worker.process.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stopping.set()
+        for worker in self._workers:
+            if worker.process is not None and worker.process.is_alive():
+                worker.tasks.put(None)
+        for worker in self._workers:
+            if worker.process is not None:
+                worker.process.join(timeout)
+                if worker.process.is_alive():
+                    worker.process.terminate()
+        if self._results is not None:
+            self._results.put(None)
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+        with self._lock:
+            for task_id in list(self._pending):
+                self._finish(task_id, exception=WorkerCrashed("Vision pool stopped"))
+        for shm in self._slots.values():
+            shm.close()
+            shm.unlink()
+        self._slots = {}
+        self._free_slots = queue.Queue()
+        self._workers = []
+
+    def submit(self, data, session_key: Optional[str] = None) -> Future:
+        """Copy an encoded frame into shared memory and dispatch it to a worker."""
+        nbytes = len(data)
+        if nbytes > self.slot_size:
+            raise ValueError(f"Frame of {nbytes} bytes exceeds slot size {self.slot_size}")
+        try:
+            slot_name = self._free_slots.get_nowait()
+        except queue.Empty:
+            self.rejected += 1
+            raise PoolSaturated("Too many frames in flight")
+
+        self._slots[slot_name].buf[:nbytes] = data
+        future: Future = Future()
+        with self._lock:
+            running = [w for w in self._workers if w.respawn_at is None]
+            if not running:
+                self._free_slots.put(slot_name)
+                raise WorkerCrashed("No vision worker is running")
+            worker = None
+            if session_key is not None:
+                # Keep a session on one worker so its face tracker stays warm
+                worker = self._workers[hash(session_key) % len(self._workers)]
+            if worker is None or worker.respawn_at is not None:
+                worker = min(running, key=lambda w: w.inflight)
+            task_id = next(self._task_ids)
+            self._pending[task_id] = (future, slot_name, worker.worker_id)
+            worker.inflight += 1
+            worker.tasks.put((task_id, slot_name, nbytes, session_key))
+        return future
+
+    async def analyze(self, data, session_key: Optional[str] = None) -> Tuple[Dict[str, float], bool]:
+        """Scores for the frame, and whether they were reused from the session's previous crop."""
+        return await asyncio.wrap_future(self.submit(data, session_key))
+
+    def _finish(self, task_id: int, result=None, exception: Optional[Exception] = None):
+        # Must be called with self._lock held
+        entry = self._pending.pop(task_id, None)
+        if entry is None:
+            return
+        future, slot_name, worker_id = entry
+        self._workers[worker_id].inflight -= 1
+        self._free_slots.put(slot_name)
+        if exception is not None:
+            self.failed += 1
+            future.set_exception(exception)
+        else:
+            self.completed += 1
+            future.set_result(result)
+
+    def _collect(self):
+        while True:
+            message = self._results.get()
+            if message is None:
+                return
+            kind, worker_id, task_id, payload = message
+            with self._lock:
+                if kind == 'ready':
+                    self._workers[worker_id].ready = True
+                    self._workers[worker_id].startup_failures = 0
+                elif kind == 'done':
+                    self._finish(task_id, result=payload)
+                elif kind == 'invalid':
+                    self._finish(task_id, exception=ValueError(payload))
+                else:
+                    self._finish(task_id, exception=WorkerError(payload))
+
+    def _fail_tasks(self, worker: _Worker):
+        # Must be called with self._lock held
+        for task_id, (_, _, worker_id) in list(self._pending.items()):
+            if worker_id == worker.worker_id:
+                self._finish(task_id, exception=WorkerCrashed(
+                    f"Vision worker {worker_id} exited with code {worker.process.exitcode}"
+                ))
+
+    def _monitor(self):
+        while not self._stopping.wait(self.monitor_interval):
+            for worker in self._workers:
+                if worker.process.is_alive():
+                    continue
+                with self._lock:
+                    if self._stopping.is_set():
+                        return
+                    now = time.monotonic()
+                    if worker.respawn_at is None:
+                        self._fail_tasks(worker)
+                        delay = 0.0
+                        if not worker.ready:
+                            worker.startup_failures += 1
+                            delay = min(RESTART_BACKOFF * 2 ** (worker.startup_failures - 1), MAX_RESTART_BACKOFF)
+                            print(f"Vision worker {worker.worker_id} exited with code {worker.process.exitcode} "
+                                  f"before it was ready; restarting in {delay:g}s")
+                        worker.respawn_at = now + delay
+                    if now < worker.respawn_at:
+                        continue
+                    self.restarts += 1
+                    self._spawn(worker)
+
+    def queue_depth(self) -> int:
+        return len(self._pending)
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                'workers': self.num_workers,
+                'workers_ready': sum(1 for w in self._workers if w.ready),
+                'queue_depth': len(self._pending),
+                'capacity': self.max_pending,
+                'inflight_per_worker': [w.inflight for w in self._workers],
+                'completed': self.completed,
+                'failed': self.failed,
+                'rejected': self.rejected,
+                'restarts': self.restarts,
+                'startup_failures': [w.startup_failures for w in self._workers],
+            }
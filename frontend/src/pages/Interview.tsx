@@ -31,11 +31,15 @@ import {
 } from '@mui/icons-material';
 import { useInterview } from '../contexts/InterviewContext';
 import emotionAnalysis from '../services/emotionAnalysis';
-import { useNavigate } from 'react-router-dom';
+import { useNavigate, useSearchParams } from 'react-router-dom';
 
 // Audio analysis configuration
 const AUDIO_ANALYSIS_INTERVAL = 1000; // 1 second
-const EMOTION_ANALYSIS_INTERVAL = 2000; // 2 seconds
+const EMOTION_ANALYSIS_INTERVAL = 2000; // 2 seconds, until the server suggests otherwise
+
+// Keys the server-side face tracker, crop cache and live buffer to this interview run
+const newAnalysisSessionId = () =>
+  `session-${Date.now().toString(36)}-${Math.random().toString(36).slice(2, 10)}`;
 
 // Add these interfaces at the top of the file
 interface EmotionScores {
@@ -492,6 +496,7 @@ const Interview: React.FC = () => {
   const audioContextRef = useRef<AudioContext | null>(null);
   const analyserRef = useRef<AnalyserNode | null>(null);
   const mediaRecorderRef = useRef<MediaRecorder | null>(null);
+  const analysisSessionRef = useRef<string>('');
   const [stream, setStream] = useState<MediaStream | null>(null);
   const [isVideoOn, setIsVideoOn] = useState(true);
   const [isAudioOn, setIsAudioOn] = useState(true);
@@ -499,6 +504,7 @@ const Interview: React.FC = () => {
   const [currentQuestion, setCurrentQuestion] = useState<string>('');
   const [showResults, setShowResults] = useState(false);
   const navigate = useNavigate();
+  const [searchParams] = useSearchParams();
 
   const {
     interviewData,
@@ -548,17 +554,21 @@ const Interview: React.FC = () => {
     });
   }, [updateAudioAnalysis]);
 
-  // Memoize the emotion analysis function
-  const analyzeEmotions = useCallback(async () => {
-    const frame = captureFrame();
+  // Memoize the emotion analysis function; resolves to the delay before the next frame
+  const analyzeEmotions = useCallback(async (): Promise<number> => {
+    const frame = await captureFrame();
     if (frame) {
       try {
-        const result = await emotionAnalysis.analyzeFrame(frame);
-        updateEmotions(result.scores);
+        const result = await emotionAnalysis.analyzeFrame(frame, analysisSessionRef.current || undefined);
+        if (!('busy' in result)) {
+          updateEmotions(result.scores);
+        }
+        return result.next_frame_ms ?? EMOTION_ANALYSIS_INTERVAL;
       } catch (error) {
         console.error('Error analyzing emotions:', error);
       }
     }
+    return EMOTION_ANALYSIS_INTERVAL;
   }, [updateEmotions]);
 
   // Optimize the setupAudioAnalysis function
@@ -577,9 +587,22 @@ const Interview: React.FC = () => {
   }, [analyzeAudio]);
 
   // Optimize the startEmotionAnalysis function
+  // Each frame is scheduled once the previous one is answered, after the interval the server
+  // suggests, so clients slow down together when the server falls behind
   const startEmotionAnalysis = useCallback(() => {
-    const intervalId = setInterval(analyzeEmotions, EMOTION_ANALYSIS_INTERVAL);
-    return () => clearInterval(intervalId);
+    let stopped = false;
+    let timeoutId: ReturnType<typeof setTimeout>;
+    const analyzeNext = async () => {
+      const delay = await analyzeEmotions();
+      if (!stopped) {
+        timeoutId = setTimeout(analyzeNext, delay);
+      }
+    };
+    timeoutId = setTimeout(analyzeNext, EMOTION_ANALYSIS_INTERVAL);
+    return () => {
+      stopped = true;
+      clearTimeout(timeoutId);
+    };
   }, [analyzeEmotions]);
 
   // Move startCamera and stopCamera before useEffect
@@ -760,7 +783,7 @@ const Interview: React.FC = () => {
     return Math.min(zeroCrossings / (dataArray.length / 2), 1);
   };
 
-  const captureFrame = (): string | null => {
+  const captureFrame = (): Promise<Blob | null> => {
     if (videoRef.current && canvasRef.current) {
       const video = videoRef.current;
       const canvas = canvasRef.current;
@@ -770,10 +793,10 @@ const Interview: React.FC = () => {
         canvas.width = video.videoWidth;
         canvas.height = video.videoHeight;
         context.drawImage(video, 0, 0, canvas.width, canvas.height);
-        return canvas.toDataURL('image/jpeg', 0.8);
+        return new Promise((resolve) => canvas.toBlob(resolve, 'image/jpeg', 0.8));
       }
     }
-    return null;
+    return Promise.resolve(null);
   };
 
   const toggleVideo = useCallback(async () => {
@@ -818,6 +841,9 @@ const Interview: React.FC = () => {
       setIsLoading(true);
       const hasAccess = await checkPermissions();
       if (hasAccess) {
+        // A real interview id from the link when there is one, otherwise one per run,
+        // so separate tabs and runs don't share tracking state on the server
+        analysisSessionRef.current = searchParams.get('interviewId') || newAnalysisSessionId();
         setIsInterviewStarted(true);
         setCurrentQuestion(questions[0]);
         startInterviewContext();
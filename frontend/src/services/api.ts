@@ -3,6 +3,7 @@ import {
   User,
   Interview,
   EmotionData,
+  EmotionSeries,
   Question,
   InterviewFeedback,
   Report,
@@ -15,10 +16,22 @@ interface AuthResponse {
   user: User;
 }
 
+// Keyset-paginated listing; pass next_cursor back to fetch the following page
+interface Page<T> {
+  items: T[];
+  next_cursor: string | null;
+}
+
 interface ErrorResponse {
   detail: string;
 }
 
+interface GeneratedQuestion {
+  question: string;
+  follow_up_questions: string[];
+  context: string;
+}
+
 // Create axios instance
 const api = axios.create({
   baseURL: 'http://localhost:8000',
@@ -60,6 +73,52 @@ api.interceptors.response.use(
   }
 );
 
+// Read a server-sent event stream with the auth header (EventSource cannot send one).
+// onEvent returns false to stop reading.
+const readEventStream = async (
+  path: string,
+  init: RequestInit,
+  onEvent: (event: string, data: string) => boolean
+): Promise<void> => {
+  const token = localStorage.getItem('token');
+  const response = await fetch(`${api.defaults.baseURL}${path}`, {
+    ...init,
+    headers: {
+      ...(init.headers as Record<string, string>),
+      Accept: 'text/event-stream',
+      ...(token ? { Authorization: `Bearer ${token}` } : {}),
+    },
+  });
+  if (!response.ok || !response.body) {
+    throw new Error(`Event stream failed with status ${response.status}`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) return;
+    buffer += decoder.decode(value, { stream: true });
+    const blocks = buffer.split('\n\n');
+    buffer = blocks.pop() || '';
+    for (const block of blocks) {
+      // Comment-only blocks are keep-alives
+      if (block.startsWith(':')) continue;
+      let event = 'message';
+      let data = '';
+      for (const line of block.split('\n')) {
+        if (line.startsWith('event: ')) event = line.slice('event: '.length);
+        if (line.startsWith('data: ')) data += line.slice('data: '.length);
+      }
+      if (!onEvent(event, data)) {
+        reader.cancel();
+        return;
+      }
+    }
+  }
+};
+
 // Auth API
 const auth = {
   async login(email: string, password: string): Promise<AuthResponse> {
@@ -106,7 +165,19 @@ const auth = {
 // Interview endpoints
 export const interviews = {
   getAll: async () => {
-    const response = await api.get<Interview[]>('/api/interviews');
+    const all: Interview[] = [];
+    let cursor: string | null = null;
+    do {
+      const page: Page<Interview> = await interviews.getPage(cursor);
+      all.push(...page.items);
+      cursor = page.next_cursor;
+    } while (cursor);
+    return all;
+  },
+  getPage: async (cursor?: string | null, limit?: number) => {
+    const response = await api.get<Page<Interview>>('/api/interviews', {
+      params: { cursor: cursor || undefined, limit },
+    });
     return response.data;
   },
   getById: async (id: string) => {
@@ -128,14 +199,38 @@ export const interviews = {
 
 // Emotion analysis endpoints
 export const emotionAnalysis = {
-  getEmotions: async (interviewId: string) => {
-    const response = await api.get<EmotionData[]>(`/api/emotions/${interviewId}`);
+  getEmotions: async (interviewId: string, cursor?: string | null, limit?: number) => {
+    const response = await api.get<Page<EmotionData>>(`/api/emotions/${interviewId}`, {
+      params: { cursor: cursor || undefined, limit },
+    });
+    return response.data;
+  },
+  // The full history in one columnar response, far smaller than paging through getEmotions
+  getEmotionSeries: async (interviewId: string) => {
+    const response = await api.get<EmotionSeries>(`/api/emotions/${interviewId}/series`, {
+      headers: { Accept: 'application/json' },
+    });
     return response.data;
   },
   getRealTimeEmotions: async (interviewId: string) => {
     const response = await api.get<EmotionData>(`/api/emotions/${interviewId}/realtime`);
     return response.data;
   },
+  // Server-sent updates instead of polling getRealTimeEmotions; returns an unsubscribe function
+  subscribeRealTimeEmotions: (interviewId: string, onUpdate: (data: EmotionData) => void) => {
+    const controller = new AbortController();
+    readEventStream(`/api/emotions/${interviewId}/realtime/stream`, { signal: controller.signal }, (event, data) => {
+      if (event === 'message') {
+        onUpdate(JSON.parse(data));
+      }
+      return event !== 'end';
+    }).catch((error) => {
+      if (error.name !== 'AbortError') {
+        console.error('Realtime emotion stream failed:', error);
+      }
+    });
+    return () => controller.abort();
+  },
 };
 
 // Questions endpoints
@@ -151,6 +246,27 @@ export const questions = {
     });
     return response.data;
   },
+  // Calls onQuestion for each question as soon as the server has parsed it
+  streamQuestions: async (
+    candidateProfile: any,
+    emotionalState: any,
+    onQuestion: (question: GeneratedQuestion) => void
+  ) => {
+    await readEventStream(
+      '/api/questions/generate?stream=true',
+      {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ candidateProfile, emotionalState }),
+      },
+      (event, data) => {
+        if (event === 'question') {
+          onQuestion(JSON.parse(data));
+        }
+        return event !== 'done';
+      }
+    );
+  },
 };
 
 // Feedback endpoints
@@ -166,20 +282,39 @@ export const feedback = {
 };
 
 // Reports endpoints
+// Reports are built by a background job; a 202 response carries the job to poll
+interface ReportJob {
+  job_id: string;
+  status: 'queued' | 'running' | 'done' | 'failed';
+  error?: string | null;
+  report?: Report;
+}
+
+const waitForReport = async (job: ReportJob, intervalMs = 1000): Promise<Report> => {
+  while (job.status === 'queued' || job.status === 'running') {
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+    job = (await api.get<ReportJob>(`/api/reports/jobs/${job.job_id}`)).data;
+  }
+  if (job.status !== 'done' || !job.report) {
+    throw new Error(job.error || 'Report generation failed');
+  }
+  return job.report;
+};
+
 export const reports = {
   getAll: async () => {
     const response = await api.get<Report[]>('/api/reports');
     return response.data;
   },
   getById: async (id: string) => {
-    const response = await api.get<Report>(`/api/reports/${id}`);
-    return response.data;
+    const response = await api.get<Report | ReportJob>(`/api/reports/${id}`);
+    return response.status === 202 ? waitForReport(response.data as ReportJob) : (response.data as Report);
   },
   generate: async (interviewId: string) => {
-    const response = await api.post<Report>(`/api/reports/generate/${interviewId}`);
-    return response.data;
+    const response = await api.post<Report | ReportJob>(`/api/reports/generate/${interviewId}`);
+    return response.status === 202 ? waitForReport(response.data as ReportJob) : (response.data as Report);
   },
-  export: async (id: string, format: 'pdf' | 'csv') => {
+  export: async (id: string, format: 'csv' | 'jsonl') => {
     const response = await api.get(`/api/reports/${id}/export`, {
       params: { format },
       responseType: 'blob',
@@ -190,4 +325,4 @@ export const reports = {
 
 // Export the API instance and auth methods
 export { api, auth };
-export type { User, AuthResponse, ErrorResponse }; 
\ No newline at end of file
+export type { User, AuthResponse, ErrorResponse, GeneratedQuestion }; 
\ No newline at end of file
@@ -11,14 +11,43 @@ export interface EmotionScores {
 export interface EmotionAnalysisResponse {
   scores: EmotionScores;
   timestamp: string;
+  emotions?: Record<string, number>;
+  insights?: Record<string, string>;
+  face_detected?: boolean;
+  // True when the scores were reused from a near-identical previous frame
+  reused?: boolean;
+  // Server-suggested delay before sending the next frame, based on its current load
+  next_frame_ms?: number;
+}
+
+// Returned instead of scores when the server turned the frame away (HTTP 429)
+export interface EmotionAnalysisBusy {
+  busy: true;
+  next_frame_ms: number;
+}
+
+export interface EmotionStream {
+  send: (frame: Blob) => void;
+  close: () => void;
 }
 
 const emotionAnalysis = {
-  async analyzeFrame(imageData: string): Promise<EmotionAnalysisResponse> {
+  async analyzeFrame(
+    frame: Blob,
+    interviewId?: string
+  ): Promise<EmotionAnalysisResponse | EmotionAnalysisBusy> {
     try {
-      const response = await api.post<EmotionAnalysisResponse>('/api/emotions/analyze', {
-        image: imageData,
+      // Send the JPEG bytes as-is instead of a base64 data URL inside JSON
+      const response = await api.post<EmotionAnalysisResponse>('/api/emotions/analyze', frame, {
+        headers: { 'Content-Type': 'application/octet-stream' },
+        params: interviewId ? { interview_id: interviewId } : undefined,
+        // Let 429 through so its Retry-After can pace the next frame
+        validateStatus: (status) => (status >= 200 && status < 300) || status === 429,
       });
+      if (response.status === 429) {
+        const retryAfter = Number(response.headers['retry-after']) || 1;
+        return { busy: true, next_frame_ms: retryAfter * 1000 };
+      }
       return response.data;
     } catch (error) {
       console.error('Error analyzing emotions:', error);
@@ -36,6 +65,37 @@ const emotionAnalysis = {
     }
   },
 
+  openStream(
+    interviewId: string,
+    onResult: (result: EmotionAnalysisResponse) => void
+  ): EmotionStream {
+    const token = localStorage.getItem('token') || '';
+    const baseURL = (api.defaults.baseURL || window.location.origin).replace(/^http/, 'ws');
+    const socket = new WebSocket(
+      `${baseURL}/ws/emotions/${interviewId}?token=${encodeURIComponent(token)}`
+    );
+    socket.binaryType = 'arraybuffer';
+    socket.onmessage = (event) => {
+      try {
+        onResult(JSON.parse(event.data));
+      } catch (error) {
+        console.error('Error reading emotion stream message:', error);
+      }
+    };
+    socket.onerror = (error) => {
+      console.error('Emotion stream error:', error);
+    };
+
+    return {
+      send: (frame: Blob) => {
+        if (socket.readyState === WebSocket.OPEN) {
+          socket.send(frame);
+        }
+      },
+      close: () => socket.close(),
+    };
+  },
+
   async saveInterviewEmotions(
     interviewId: string,
     emotions: EmotionAnalysisResponse[]
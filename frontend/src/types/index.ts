@@ -25,6 +25,14 @@ export interface EmotionData {
   nervousness: number;
 }
 
+// A whole interview's emotion history in columns: scores[emotion][i] belongs to timestamps[i]
+export interface EmotionSeries {
+  interview_id: number;
+  count: number;
+  timestamps: number[]; // Unix seconds
+  scores: Record<string, number[]>;
+}
+
 export interface Question {
   id: string;
   text: string;